@@ -6,7 +6,29 @@ from __future__ import absolute_import
 
 # Standard imports
 from argparse import ArgumentTypeError
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from collections import OrderedDict
+import heapq
+from itertools import islice
+from math import isinf
+import mmap
+import os
 import re
+import sys
+from threading import Lock
+
+
+try:
+    # Get Sequence ABC.
+    # May raise error.
+    from collections.abc import Sequence
+
+# If have error
+except ImportError:
+    # Use Python 2's Sequence ABC
+    from collections import Sequence
 
 
 __version__ = '0.3.0'
@@ -16,7 +38,12 @@ __all__ = (
     '__version__',
     'str_nonempty',
     'str_strip_nonempty',
+    'bool_converter',
     'bool_0or1',
+    'bool_yes_no',
+    'bool_true_false',
+    'bool_on_off',
+    'choice_of',
     'int_ge0',
     'int_gt0',
     'int_le0',
@@ -25,12 +52,35 @@ __all__ = (
     'float_gt0',
     'float_le0',
     'float_lt0',
+    'int_range',
+    'float_range',
+    'size_bytes_ge0',
+    'duration_seconds_gt0',
+    'RangeSet',
+    'int_ranges_ge0',
+    'list_of',
+    'int_list_ge0',
+    'float_list_gt0',
+    'str_list_strip_nonempty',
+    'cached_converter',
+    'chain',
     'SpecViolationError',
+    'SpecViolation',
+    'ArgIndex',
+    'NameTrie',
     'Argument',
     'Option',
     'OneOf',
     'AllOf',
     'ensure_spec',
+    'check_spec',
+    'iter_violations',
+    'validate',
+    'CompiledSpec',
+    'compile_spec',
+    'ensure_spec_many',
+    'name_cache_info',
+    'clear_caches',
 )
 
 
@@ -87,865 +137,5549 @@ def str_strip_nonempty(text):
         raise ArgumentTypeError(error_msg)
 
 
-def bool_0or1(text):
-    """
-    Convert given argument text '0' and '1' to False and True, respectively.
+# Fold case of given text for caseless matching. Python 2 not supports
+# `str.casefold` so use `str.lower`.
+if hasattr('', 'casefold'):
+    def _casefold(text):
+        # Return case-folded text
+        return text.casefold()
 
-    Used as `type` argument of `argparse.ArgumentParser.add_argument`.
+else:
+    def _casefold(text):
+        # Return lower-cased text
+        return text.lower()
 
-    :param text: Argument text.
 
-    :return: False for '0', True for '1'.
+def _choices_text(value_s):
     """
-    # If given argument text is '0'
-    if text == '0':
-        # Return False
-        return False
+    Get text listing given values, e.g. "'a', 'b' or 'c'".
 
-    # If given argument text is '1'
-    elif text == '1':
-        # Return True
-        return True
+    :param value_s: Value list.
 
-    # If given argument text is not '0' or '1'
-    else:
-        # Get error message
-        error_msg = "Expected '0' or '1'. Got: {0}.".format(repr(text))
-
-        # Raise error
-        raise ArgumentTypeError(error_msg)
-
-
-def int_lt0(text):
+    :return: Text.
     """
-    Convert given argument text to integer and ensure the integer is <0.
+    # Get quoted value list
+    quoted_value_s = [repr(value) for value in value_s]
 
-    Used as `type` argument of `argparse.ArgumentParser.add_argument`.
+    # If have at most one value
+    if len(quoted_value_s) <= 1:
+        # Return the value
+        return ''.join(quoted_value_s)
 
-    :param text: Argument text.
+    # Return values joined by comma and the last one by 'or'
+    return '{0} or {1}'.format(
+        ', '.join(quoted_value_s[:-1]), quoted_value_s[-1]
+    )
 
-    :return: Integer <0.
+
+def bool_converter(true_set, false_set, casefold=True):
     """
-    try:
-        # Convert given argument text to integer.
-        # May raise error.
-        value = int(text)
+    Create converter that converts given argument text in given true set \
+        and false set to True and False, respectively.
 
-        # Assert the value is <0.
-        # May raise error.
-        assert value < 0
+    Used as `type` argument of `argparse.ArgumentParser.add_argument`, e.g. \
+        `type=bool_converter(['yes', 'y'], ['no', 'n'])`.
 
-    # If have error
-    except Exception:
-        # Get error message
-        error_msg = 'Expected an integer <0. Got: {0}.'.format(repr(text))
+    The text to bool mapping is precomputed, so each call is one dict \
+        lookup, plus one more for case-folded text if `casefold` is on.
 
-        # Raise error
-        raise ArgumentTypeError(error_msg)
+    :param true_set: Texts converted to True.
 
-    # If not have error
-    else:
-        # Return the value
-        return value
+    :param false_set: Texts converted to False.
 
+    :param casefold: Whether to match texts caselessly.
 
-def int_le0(text):
+    :return: Converter function.
     """
-    Convert given argument text to integer and ensure the integer is <=0.
+    # Get true text tuple
+    true_text_s = tuple(true_set)
+
+    # Get false text tuple
+    false_text_s = tuple(false_set)
+
+    # Text to bool mapping
+    text_to_bool_d = {}
+
+    # For each text and the bool
+    for text, value in [(x, True) for x in true_text_s] + \
+            [(x, False) for x in false_text_s]:
+        # For each key of the text
+        for key in (text, _casefold(text)) if casefold else (text,):
+            # If the key is mapped to the opposite bool
+            if text_to_bool_d.get(key, value) is not value:
+                # Get error message
+                msg = 'Text {0} is in both true set and false set.'.format(
+                    repr(text)
+                )
 
-    Used as `type` argument of `argparse.ArgumentParser.add_argument`.
+                # Raise error
+                raise ValueError(msg)
 
-    :param text: Argument text.
+            # Map the key to the bool
+            text_to_bool_d[key] = value
 
-    :return: Integer <=0.
-    """
-    try:
-        # Convert given argument text to integer.
-        # May raise error.
-        value = int(text)
+    # Get error message prefix
+    error_msg_prefix = 'Expected {0}. Got: '.format(
+        _choices_text(sorted(set(true_text_s + false_text_s)))
+    )
 
-        # Assert the value is <=0.
-        # May raise error.
-        assert value <= 0
+    # Get dict lookup function
+    lookup = text_to_bool_d.get
 
-    # If have error
-    except Exception:
-        # Get error message
-        error_msg = 'Expected an integer <=0. Got: {0}.'.format(repr(text))
+    # If not casefold
+    if not casefold:
+        def converter(text):
+            # Get the bool
+            value = lookup(text)
 
-        # Raise error
-        raise ArgumentTypeError(error_msg)
+            # If the text is not valid
+            if value is None:
+                # Raise error
+                raise ArgumentTypeError(
+                    error_msg_prefix + repr(text) + '.'
+                )
+
+            # Return the bool
+            return value
 
-    # If not have error
+    # If casefold
     else:
-        # Return the value
-        return value
+        def converter(text):
+            # Get the bool
+            value = lookup(text)
+
+            # If the text is not matched exactly
+            if value is None:
+                try:
+                    # Get the bool of case-folded text.
+                    # May raise error.
+                    value = lookup(_casefold(text))
+
+                # If the text is not string
+                except AttributeError:
+                    # Use None
+                    value = None
+
+                # If the text is not valid
+                if value is None:
+                    # Raise error
+                    raise ArgumentTypeError(
+                        error_msg_prefix + repr(text) + '.'
+                    )
 
+            # Return the bool
+            return value
 
-def int_gt0(text):
-    """
-    Convert given argument text to integer and ensure the integer is >0.
+    # Set converter name
+    converter.__name__ = 'bool_converter'
 
-    Used as `type` argument of `argparse.ArgumentParser.add_argument`.
+    # Return converter
+    return converter
 
-    :param text: Argument text.
 
-    :return: Integer >0.
-    """
-    try:
-        # Convert given argument text to integer.
-        # May raise error.
-        value = int(text)
+# Convert given argument text '0' and '1' to False and True, respectively
+bool_0or1 = bool_converter(['1'], ['0'], casefold=False)
 
-        # Assert the value is >0.
-        # May raise error.
-        assert value > 0
+bool_0or1.__name__ = 'bool_0or1'
 
-    # If have error
-    except Exception:
-        # Get error message
-        error_msg = 'Expected an integer >0. Got: {0}.'.format(repr(text))
 
-        # Raise error
-        raise ArgumentTypeError(error_msg)
+# Convert given argument text 'yes' and 'no' to True and False,
+# respectively, caselessly
+bool_yes_no = bool_converter(['yes'], ['no'])
 
-    # If not have error
-    else:
-        # Return the value
-        return value
+bool_yes_no.__name__ = 'bool_yes_no'
 
 
-def int_ge0(text):
-    """
-    Convert given argument text to integer and ensure the integer is >=0.
+# Convert given argument text 'true' and 'false' to True and False,
+# respectively, caselessly
+bool_true_false = bool_converter(['true'], ['false'])
 
-    Used as `type` argument of `argparse.ArgumentParser.add_argument`.
+bool_true_false.__name__ = 'bool_true_false'
 
-    :param text: Argument text.
 
-    :return: Integer >=0.
-    """
-    try:
-        # Convert given argument text to integer.
-        # May raise error.
-        value = int(text)
+# Convert given argument text 'on' and 'off' to True and False,
+# respectively, caselessly
+bool_on_off = bool_converter(['on'], ['off'])
 
-        # Assert the value is >=0.
-        # May raise error.
-        assert value >= 0
+bool_on_off.__name__ = 'bool_on_off'
 
-    # If have error
-    except Exception:
-        # Get error message
-        error_msg = 'Expected an integer >=0. Got: {0}.'.format(repr(text))
 
-        # Raise error
-        raise ArgumentTypeError(error_msg)
+def _trigrams(text):
+    """
+    Get trigrams of given text, padded so that short texts and text ends \
+        have trigrams too.
 
-    # If not have error
-    else:
-        # Return the value
-        return value
+    :param text: Text.
+
+    :return: Trigram set.
+    """
+    # Get padded text
+    padded_text = '  ' + text + ' '
 
+    # Return trigram set
+    return set(
+        padded_text[index:index + 3]
+        for index in range(len(padded_text) - 2)
+    )
 
-def float_lt0(text):
+
+def _edit_distance(text_a, text_b):
     """
-    Convert given argument text to float and ensure the float is <0.
+    Get Levenshtein edit distance between given texts.
 
-    Used as `type` argument of `argparse.ArgumentParser.add_argument`.
+    :param text_a: Text A.
 
-    :param text: Argument text.
+    :param text_b: Text B.
 
-    :return: Float <0.
+    :return: Edit distance.
     """
-    try:
-        # Convert given argument text to float.
-        # May raise error.
-        value = float(text)
+    # Distances between text A's prefix and text B's each prefix
+    prev_row = list(range(len(text_b) + 1))
 
-        # Assert the value is <0.
-        # May raise error.
-        assert value < 0
+    # For text A's each character
+    for index_a, char_a in enumerate(text_a, 1):
+        # Distances for the next prefix of text A
+        row = [index_a]
 
-    # If have error
-    except Exception:
-        # Get error message
-        error_msg = 'Expected a float <0. Got: {0}.'.format(repr(text))
+        # For text B's each character
+        for index_b, char_b in enumerate(text_b, 1):
+            # Add the minimum of deletion, insertion, substitution cost
+            row.append(min(
+                prev_row[index_b] + 1,
+                row[index_b - 1] + 1,
+                prev_row[index_b - 1] + (char_a != char_b),
+            ))
 
-        # Raise error
-        raise ArgumentTypeError(error_msg)
+        # Use the row as previous row
+        prev_row = row
 
-    # If not have error
-    else:
-        # Return the value
-        return value
+    # Return edit distance
+    return prev_row[-1]
 
 
-def float_le0(text):
+class _TrigramIndex(object):
+    """
+    Trigram index of texts, for finding texts similar to given text without \
+        computing edit distance to every text.
     """
-    Convert given argument text to float and ensure the float is <=0.
 
-    Used as `type` argument of `argparse.ArgumentParser.add_argument`.
+    # Count of candidates ranked by edit distance
+    CANDIDATE_COUNT = 20
 
-    :param text: Argument text.
+    def __init__(self, texts):
+        """
+        Constructor.
 
-    :return: Float <=0.
-    """
-    try:
-        # Convert given argument text to float.
-        # May raise error.
-        value = float(text)
+        :param texts: Texts iterable.
 
-        # Assert the value is <=0.
-        # May raise error.
-        assert value <= 0
+        :return: None.
+        """
+        # Text tuple
+        self._text_s = tuple(texts)
 
-    # If have error
-    except Exception:
-        # Get error message
-        error_msg = 'Expected a float <=0. Got: {0}.'.format(repr(text))
+        # Trigram to text index list mapping
+        self._trigram_d = {}
 
-        # Raise error
-        raise ArgumentTypeError(error_msg)
+        # For each text index and the text
+        for text_index, text in enumerate(self._text_s):
+            # For each trigram of the text
+            for trigram in _trigrams(text):
+                # Add the text index to the trigram's list
+                self._trigram_d.setdefault(trigram, []).append(text_index)
 
-    # If not have error
-    else:
-        # Return the value
-        return value
+    def nearest(self, text, count):
+        """
+        Get texts nearest to given text.
 
+        Texts sharing the most trigrams with given text are shortlisted, \
+            then ranked by edit distance.
 
-def float_gt0(text):
-    """
-    Convert given argument text to float and ensure the float is >0.
+        :param text: Text.
 
-    Used as `type` argument of `argparse.ArgumentParser.add_argument`.
+        :param count: Maximum count of texts to return.
 
-    :param text: Argument text.
+        :return: Text list, nearest first.
+        """
+        # Text index to shared trigram count mapping
+        shared_count_d = {}
+
+        # For given text's each trigram
+        for trigram in _trigrams(text):
+            # For each text index having the trigram
+            for text_index in self._trigram_d.get(trigram, ()):
+                # Increment the shared trigram count
+                shared_count_d[text_index] = \
+                    shared_count_d.get(text_index, 0) + 1
+
+        # Get candidate text indexes sharing the most trigrams
+        candidate_index_s = heapq.nlargest(
+            self.CANDIDATE_COUNT,
+            shared_count_d,
+            key=lambda x: (shared_count_d[x], -x),
+        )
 
-    :return: Float >0.
-    """
-    try:
-        # Convert given argument text to float.
-        # May raise error.
-        value = float(text)
+        # Get candidate texts ranked by edit distance, then shared trigram
+        # count, then order in the index
+        ranked_index_s = sorted(
+            candidate_index_s,
+            key=lambda x: (
+                _edit_distance(text, self._text_s[x]),
+                -shared_count_d[x],
+                x,
+            ),
+        )
 
-        # Assert the value is >0.
-        # May raise error.
-        assert value > 0
+        # Return the nearest texts
+        return [self._text_s[x] for x in ranked_index_s[:count]]
 
-    # If have error
-    except Exception:
-        # Get error message
-        error_msg = 'Expected a float >0. Got: {0}.'.format(repr(text))
 
-        # Raise error
-        raise ArgumentTypeError(error_msg)
+# Maximum value count for listing all values in `choice_of` error message
+_CHOICE_LIST_ALL_MAX = 10
 
-    # If not have error
-    else:
-        # Return the value
-        return value
+# Maximum suggestion count in `choice_of` error message
+_CHOICE_SUGGESTION_COUNT = 3
 
 
-def float_ge0(text):
+def choice_of(values, casefold=False):
     """
-    Convert given argument text to float and ensure the float is >=0.
+    Create converter that ensures given argument text is one of given \
+        values.
 
-    Used as `type` argument of `argparse.ArgumentParser.add_argument`.
+    Used as `type` argument of `argparse.ArgumentParser.add_argument`, \
+        instead of `choices` argument, e.g. \
+        `type=choice_of(['us-east-1', 'eu-west-1'])`.
 
-    :param text: Argument text.
+    Acceptance is one set lookup. On rejection, the error message lists \
+        all values if there are few of them, otherwise suggests the nearest \
+        values, found using a trigram index built on first rejection.
 
-    :return: Float >=0.
-    """
-    try:
-        # Convert given argument text to float.
-        # May raise error.
-        value = float(text)
+    :param values: Valid values.
 
-        # Assert the value is >=0.
-        # May raise error.
-        assert value >= 0
+    :param casefold: Whether to match values caselessly. If on, the value \
+        is returned in its spelling in given values.
 
-    # If have error
-    except Exception:
-        # Get error message
-        error_msg = 'Expected a float >=0. Got: {0}.'.format(repr(text))
+    :return: Converter function.
+    """
+    # Get value tuple, without duplicates, in the original order
+    value_s = tuple(OrderedDict.fromkeys(values))
 
+    # If not have value
+    if not value_s:
         # Raise error
-        raise ArgumentTypeError(error_msg)
+        raise ValueError('Expected at least one value.')
 
-    # If not have error
-    else:
-        # Return the value
-        return value
+    # If not casefold
+    if not casefold:
+        # Get value set
+        value_set = frozenset(value_s)
 
+        def converter(text):
+            # If the text is valid
+            if text in value_set:
+                # Return the text
+                return text
 
-class BaseSpec(object):
-    """
-    Base class for spec.
-    """
-
-    def ensure_spec(self, args, depending):
-        """
-        Ensure this spec. Raise SpecViolationError if violated.
+            # Raise error
+            raise ArgumentTypeError(get_error_msg(text))
 
-        :param args: Argument list.
+    # If casefold
+    else:
+        # Case-folded value to value mapping.
+        #
+        # The first value wins if two values fold to the same.
+        value_d = OrderedDict()
 
-        :param depending: Depending argument name.
+        # For each value
+        for value in value_s:
+            # Map the case-folded value to the value
+            value_d.setdefault(_casefold(value), value)
 
-        :return: None.
-        """
-        # Implemented in subclass
-        raise NotImplementedError()
+        # Get dict lookup function
+        lookup = value_d.get
 
+        def converter(text):
+            try:
+                # Get the value.
+                # May raise error.
+                value = lookup(_casefold(text))
 
-class Argument(BaseSpec):
-    """
-    Argument spec that requires given argument name exists, and given sub \
-        spec is ensured.
-    """
+            # If the text is not string
+            except AttributeError:
+                # Use None
+                value = None
 
-    def __init__(self, arg_name, sub_spec=None):
-        """
-        Constructor.
+            # If the text is valid
+            if value is not None:
+                # Return the value
+                return value
 
-        :param arg_name: Argument name.
+            # Raise error
+            raise ArgumentTypeError(get_error_msg(text))
 
-        :param sub_spec: Sub spec.
+    # Trigram index, created on first rejection
+    index_holder = []
 
-        :return: None.
+    def get_error_msg(text):
         """
-        # Store argument name
-        self.arg_name = arg_name
+        Get error message for given invalid argument text.
 
-        # Store sub spec
-        self.sub_spec = sub_spec
+        :param text: Argument text.
 
-    def __repr__(self):
+        :return: Error message.
         """
-        Convert to string representation.
+        # If have few values
+        if len(value_s) <= _CHOICE_LIST_ALL_MAX:
+            # Return error message listing all values
+            return 'Expected {0}. Got: {1}.'.format(
+                _choices_text(value_s), repr(text)
+            )
 
-        :return: String.
-        """
-        # Return string representation
-        return 'Argument({0}, {1})'.format(
-            repr(self.arg_name),
-            repr(self.sub_spec),
+        # If the trigram index is not created
+        if not index_holder:
+            # Create the trigram index of case-folded values, or values
+            index_holder.append(
+                _TrigramIndex(value_d if casefold else value_s)
+            )
+
+        try:
+            # Get the nearest values.
+            # May raise error.
+            nearest_value_s = index_holder[0].nearest(
+                _casefold(text) if casefold else text,
+                _CHOICE_SUGGESTION_COUNT,
+            )
+
+        # If the text is not string
+        except (AttributeError, TypeError):
+            # Not suggest
+            nearest_value_s = []
+
+        # If casefold
+        if casefold:
+            # Get the nearest values in their original spelling
+            nearest_value_s = [value_d[x] for x in nearest_value_s]
+
+        # Get error message
+        msg = 'Expected one of {0} values. Got: {1}.'.format(
+            len(value_s), repr(text)
         )
 
-    def ensure_spec(self, args, depending):
-        """
-        Ensure this spec. Raise SpecViolationError if violated.
+        # If have suggestion
+        if nearest_value_s:
+            # Add suggestion
+            msg += ' Did you mean {0}?'.format(
+                _choices_text(nearest_value_s)
+            )
 
-        :param args: Argument list.
+        # Return error message
+        return msg
 
-        :param depending: Depending argument name.
+    # Set converter name
+    converter.__name__ = 'choice_of'
 
-        :return: None.
-        """
-        # Get argument name
-        arg_name = self.arg_name
+    # Return converter
+    return converter
 
-        # Ensure the argument name exists
-        ensure_argument_name(arg_name, args, depending=depending)
 
-        # Get sub spec
-        sub_spec = self.sub_spec
+# Array type code of 64-bit integer. Python 2 not supports 'q' so use 'l'.
+try:
+    # Create array of 64-bit integer.
+    # May raise error.
+    array('q')
 
-        # If have sub spec
-        if sub_spec is not None:
-            # Ensure the sub spec
-            ensure_spec(spec=sub_spec, args=args, depending=arg_name)
+# If have error
+except ValueError:
+    # Use 'l'
+    _INT_ARRAY_TYPECODE = 'l'
 
+# If not have error
+else:
+    # Use 'q'
+    _INT_ARRAY_TYPECODE = 'q'
 
-class Option(BaseSpec):
-    """
-    Argument spec that requires given sub spec is ensured only if given \
-        argument name exists.
+
+def _range_desc(lo, hi, lo_incl, hi_incl):
     """
+    Get description of given range, e.g. '>=0', '>0 and <=10'.
 
-    def __init__(self, arg_name, sub_spec=None):
-        """
-        Constructor.
+    :param lo: Lower bound. None means no lower bound.
 
-        :param arg_name: Argument name.
+    :param hi: Upper bound. None means no upper bound.
 
-        :param sub_spec: Sub spec.
+    :param lo_incl: Whether the lower bound is inclusive.
 
-        :return: None.
-        """
-        # Store argument name
-        self.arg_name = arg_name
+    :param hi_incl: Whether the upper bound is inclusive.
 
-        # Store sub spec
-        self.sub_spec = sub_spec
+    :return: Range description. Empty if no bounds.
+    """
+    # Bound description list
+    desc_s = []
 
-    def __repr__(self):
-        """
-        Convert to string representation.
+    # If have lower bound
+    if lo is not None:
+        # Add lower bound description
+        desc_s.append('{0}{1}'.format('>=' if lo_incl else '>', lo))
 
-        :return: String.
-        """
-        # Return string representation
-        return 'Option({0}, {1})'.format(
-            repr(self.arg_name),
-            repr(self.sub_spec),
-        )
+    # If have upper bound
+    if hi is not None:
+        # Add upper bound description
+        desc_s.append('{0}{1}'.format('<=' if hi_incl else '<', hi))
 
-    def ensure_spec(self, args, depending):
-        """
-        Ensure this spec. Raise SpecViolationError if violated.
+    # Return range description
+    return ' and '.join(desc_s)
 
-        :param args: Argument list.
 
-        :param depending: Depending argument name.
+def _range_converter_many(converter, convert, typecode, lo, hi, lo_incl,
+                          hi_incl):
+    """
+    Create bulk variant of given range converter, which converts all given \
+        argument texts in one call into an `array.array`.
 
-        :return: None.
-        """
-        # Get argument name
-        arg_name = self.arg_name
+    Values are converted straight into the array, without an intermediate \
+        list of Python numbers, and the range check runs over the array, \
+        in C loops where possible. Only if they fail, the argument texts \
+        are checked one by one with given range converter so the error \
+        names the first offending argument text.
 
-        # If the argument name exists
-        if argument_exists(arg_name, args):
-            # Get sub spec
-            sub_spec = self.sub_spec
+    :param converter: Range converter.
 
-            # If have sub spec
-            if sub_spec is not None:
-                # Ensure the sub spec
-                ensure_spec(spec=sub_spec, args=args, depending=arg_name)
+    :param convert: Conversion function, e.g. `int`, `float`.
 
+    :param typecode: Array type code, e.g. 'q', 'd'.
 
-class OneOf(BaseSpec):
-    """
-    Argument spec that requires exact one of given sub specs is ensured.
+    :param lo: Lower bound. None means no lower bound.
+
+    :param hi: Upper bound. None means no upper bound.
+
+    :param lo_incl: Whether the lower bound is inclusive.
+
+    :param hi_incl: Whether the upper bound is inclusive.
+
+    :return: Bulk converter function.
     """
+    # Whether NaN is possible and must be checked
+    check_nan = typecode == 'd' and (lo is not None or hi is not None)
 
-    def __init__(self, *sub_specs):
+    def raise_first_error(text_s):
         """
-        Constructor.
-
-        :param sub_specs: Sub spec list.
+        Raise error for the first offending argument text.
 
-        Each sub spec must be argument name string, or Argument object. \
-            Otherwise raise TypeError.
+        :param text_s: Argument text list.
 
         :return: None.
         """
-        # For each sub spec
-        for sub_spec in sub_specs:
-            # If the sub spec is not argument name string or Argument object
-            if not isinstance(sub_spec, (str, Argument)):
+        # For each argument text
+        for text in text_s:
+            # Convert the argument text.
+            # Raise error if the argument text is invalid or out of range.
+            value = converter(text)
+
+            try:
+                # Ensure the value fits in the array item type.
+                # May raise error.
+                array(typecode, (value,))
+
+            # If the value not fits
+            except OverflowError:
                 # Get error message
-                msg = 'Expected string or Argument object. Got {0}.'.format(
-                    repr(sub_spec)
+                error_msg = 'Expected {0}-bit {1}. Got: {2}.'.format(
+                    array(typecode).itemsize * 8,
+                    'integer' if typecode != 'd' else 'float',
+                    repr(text),
                 )
 
                 # Raise error
-                raise TypeError(msg)
-
-        # Store sub specs
-        self._sub_specs = list(sub_specs)
+                raise ArgumentTypeError(error_msg)
 
-    def __iter__(self):
+    def many(texts):
         """
-        Get sub spec iterator.
+        Convert given argument texts into an `array.array`, ensuring each \
+            value is in range.
 
-        :return: Sub spec iterator.
-        """
-        # Return sub spec iterator
-        return iter(self._sub_specs)
+        :param texts: Argument texts iterable.
 
-    def __repr__(self):
+        :return: `array.array` of the values.
+        """
+        # If given argument texts is not list, tuple, or delimited items,
+        # which can be iterated again
+        if not isinstance(texts, (list, tuple, _DelimitedItems)):
+            # Get argument text list.
+            #
+            # Needed to find the offending argument text on error.
+            texts = list(texts)
+
+        try:
+            # Convert all argument texts into array.
+            # May raise error, including OverflowError if a value not fits
+            # in the array item type.
+            value_s = array(typecode, map(convert, texts))
+
+        # If have error
+        except (TypeError, ValueError, OverflowError):
+            # Raise error for the first offending argument text
+            raise_first_error(texts)
+
+        # If have value and have bounds
+        if value_s and (lo is not None or hi is not None):
+            # Whether all values are in range
+            is_in_range = True
+
+            # If have lower bound
+            if lo is not None:
+                # Get the minimum value
+                min_value = min(value_s)
+
+                # Check the minimum value is in range
+                is_in_range = lo <= min_value if lo_incl else lo < min_value
+
+            # If have upper bound
+            if is_in_range and hi is not None:
+                # Get the maximum value
+                max_value = max(value_s)
+
+                # Check the maximum value is in range
+                is_in_range = max_value <= hi if hi_incl else max_value < hi
+
+            # If have NaN.
+            #
+            # `min` and `max` may skip NaN, but sum is NaN if any item is
+            # NaN.
+            if is_in_range and check_nan:
+                # Get sum
+                sum_value = sum(value_s)
+
+                # Check the sum is not NaN
+                is_in_range = sum_value == sum_value
+
+            # If not all values are in range
+            if not is_in_range:
+                # Raise error for the first offending argument text
+                raise_first_error(texts)
+
+        # Return the array
+        return value_s
+
+    # Return bulk converter function
+    return many
+
+
+def _range_converter(convert, typecode, type_name, lo, hi, lo_incl,
+                     hi_incl):
+    """
+    Create converter that converts given argument text using given \
+        conversion function and ensures the value is in given range.
+
+    The returned converter is specialized for the bounds given, so each \
+        call does at most two explicit comparisons. NaN is never in range.
+
+    The returned converter has attribute `many`, which converts many \
+        argument texts in one call into an `array.array`. See \
+        `_range_converter_many`.
+
+    :param convert: Conversion function, e.g. `int`, `float`.
+
+    :param typecode: Array type code for the bulk variant, e.g. 'q', 'd'.
+
+    :param type_name: Type name used in messages, e.g. 'integer'.
+
+    :param lo: Lower bound. None means no lower bound.
+
+    :param hi: Upper bound. None means no upper bound.
+
+    :param lo_incl: Whether the lower bound is inclusive.
+
+    :param hi_incl: Whether the upper bound is inclusive.
+
+    :return: Converter function.
+    """
+    # If both bounds are given and the range is reversed
+    if lo is not None and hi is not None and hi < lo:
+        # Get error message
+        msg = 'Expected lo <= hi. Got: lo={0}, hi={1}.'.format(
+            repr(lo), repr(hi)
+        )
+
+        # Raise error
+        raise ValueError(msg)
+
+    # Get range description
+    range_desc = _range_desc(lo, hi, lo_incl, hi_incl)
+
+    # Get type description, e.g. 'an integer'
+    type_desc = '{0} {1}'.format(
+        'an' if type_name[0] in 'aeiou' else 'a', type_name
+    )
+
+    # Get error message template.
+    #
+    # Braces in the range description are not possible because bounds are
+    # numbers.
+    error_msg_template = 'Expected {0}{1}. Got: {{0}}.'.format(
+        type_desc, ' ' + range_desc if range_desc else ''
+    )
+
+    # Errors raised by the conversion function for invalid text
+    convert_errors = (TypeError, ValueError, OverflowError)
+
+    def raise_error(text):
+        """
+        Raise error for given argument text.
+
+        :param text: Argument text.
+
+        :return: None.
+        """
+        # Raise error
+        raise ArgumentTypeError(error_msg_template.format(repr(text)))
+
+    # Create converter specialized for the bounds.
+    #
+    # Each range check is written as `in range` rather than `not out of
+    # range` so that NaN fails.
+    #
+    # If no bounds
+    if lo is None and hi is None:
+        def converter(text):
+            try:
+                # Convert given argument text.
+                # May raise error.
+                return convert(text)
+
+            # If have error
+            except convert_errors:
+                # Raise error
+                raise_error(text)
+
+    # If only the inclusive lower bound
+    elif hi is None and lo_incl:
+        def converter(text):
+            try:
+                # Convert given argument text.
+                # May raise error.
+                value = convert(text)
+
+            # If have error
+            except convert_errors:
+                # Raise error
+                raise_error(text)
+
+            # If the value is in range
+            if lo <= value:
+                # Return the value
+                return value
+
+            # Raise error
+            raise_error(text)
+
+    # If only the exclusive lower bound
+    elif hi is None:
+        def converter(text):
+            try:
+                # Convert given argument text.
+                # May raise error.
+                value = convert(text)
+
+            # If have error
+            except convert_errors:
+                # Raise error
+                raise_error(text)
+
+            # If the value is in range
+            if lo < value:
+                # Return the value
+                return value
+
+            # Raise error
+            raise_error(text)
+
+    # If only the inclusive upper bound
+    elif lo is None and hi_incl:
+        def converter(text):
+            try:
+                # Convert given argument text.
+                # May raise error.
+                value = convert(text)
+
+            # If have error
+            except convert_errors:
+                # Raise error
+                raise_error(text)
+
+            # If the value is in range
+            if value <= hi:
+                # Return the value
+                return value
+
+            # Raise error
+            raise_error(text)
+
+    # If only the exclusive upper bound
+    elif lo is None:
+        def converter(text):
+            try:
+                # Convert given argument text.
+                # May raise error.
+                value = convert(text)
+
+            # If have error
+            except convert_errors:
+                # Raise error
+                raise_error(text)
+
+            # If the value is in range
+            if value < hi:
+                # Return the value
+                return value
+
+            # Raise error
+            raise_error(text)
+
+    # If both bounds are inclusive
+    elif lo_incl and hi_incl:
+        def converter(text):
+            try:
+                # Convert given argument text.
+                # May raise error.
+                value = convert(text)
+
+            # If have error
+            except convert_errors:
+                # Raise error
+                raise_error(text)
+
+            # If the value is in range
+            if lo <= value <= hi:
+                # Return the value
+                return value
+
+            # Raise error
+            raise_error(text)
+
+    # If only the lower bound is inclusive
+    elif lo_incl:
+        def converter(text):
+            try:
+                # Convert given argument text.
+                # May raise error.
+                value = convert(text)
+
+            # If have error
+            except convert_errors:
+                # Raise error
+                raise_error(text)
+
+            # If the value is in range
+            if lo <= value < hi:
+                # Return the value
+                return value
+
+            # Raise error
+            raise_error(text)
+
+    # If only the upper bound is inclusive
+    elif hi_incl:
+        def converter(text):
+            try:
+                # Convert given argument text.
+                # May raise error.
+                value = convert(text)
+
+            # If have error
+            except convert_errors:
+                # Raise error
+                raise_error(text)
+
+            # If the value is in range
+            if lo < value <= hi:
+                # Return the value
+                return value
+
+            # Raise error
+            raise_error(text)
+
+    # If both bounds are exclusive
+    else:
+        def converter(text):
+            try:
+                # Convert given argument text.
+                # May raise error.
+                value = convert(text)
+
+            # If have error
+            except convert_errors:
+                # Raise error
+                raise_error(text)
+
+            # If the value is in range
+            if lo < value < hi:
+                # Return the value
+                return value
+
+            # Raise error
+            raise_error(text)
+
+    # Set converter docstring
+    converter.__doc__ = (
+        'Convert given argument text to {0}{1}.\n\n'
+        'Used as `type` argument of '
+        '`argparse.ArgumentParser.add_argument`.'
+    ).format(
+        type_name,
+        ' and ensure the {0} is {1}'.format(type_name, range_desc)
+        if range_desc else '',
+    )
+
+    # Create bulk variant
+    converter.many = _range_converter_many(
+        converter, convert, typecode, lo, hi, lo_incl, hi_incl
+    )
+
+    # Return converter
+    return converter
+
+
+def _range_converter_name(factory_name, lo, hi, lo_incl, hi_incl):
+    """
+    Get name of range converter, e.g. 'int_range(lo=0, lo_incl=False)'.
+
+    :param factory_name: Factory name.
+
+    :param lo: Lower bound.
+
+    :param hi: Upper bound.
+
+    :param lo_incl: Whether the lower bound is inclusive.
+
+    :param hi_incl: Whether the upper bound is inclusive.
+
+    :return: Converter name.
+    """
+    # Keyword argument text list
+    kwarg_s = []
+
+    # For each keyword argument name, value, and default value
+    for key, value, default in (
+        ('lo', lo, None),
+        ('hi', hi, None),
+        ('lo_incl', lo_incl, True),
+        ('hi_incl', hi_incl, True),
+    ):
+        # If the value is not default
+        if value != default:
+            # Add keyword argument text
+            kwarg_s.append('{0}={1}'.format(key, repr(value)))
+
+    # Return converter name
+    return '{0}({1})'.format(factory_name, ', '.join(kwarg_s))
+
+
+def int_range(lo=None, hi=None, lo_incl=True, hi_incl=True):
+    """
+    Create converter that converts given argument text to integer and \
+        ensures the integer is in given range.
+
+    Used as `type` argument of `argparse.ArgumentParser.add_argument`, e.g. \
+        `type=int_range(lo=1, hi=65535)`.
+
+    The returned converter's `many` attribute converts many argument texts \
+        in one call into `array.array` of 64-bit integers, e.g. \
+        `int_ge0.many(['1', '2'])`.
+
+    :param lo: Lower bound. None means no lower bound.
+
+    :param hi: Upper bound. None means no upper bound.
+
+    :param lo_incl: Whether the lower bound is inclusive.
+
+    :param hi_incl: Whether the upper bound is inclusive.
+
+    :return: Converter function.
+    """
+    # Create converter
+    converter = _range_converter(
+        int, _INT_ARRAY_TYPECODE, 'integer', lo, hi, lo_incl, hi_incl
+    )
+
+    # Set converter name
+    converter.__name__ = _range_converter_name(
+        'int_range', lo, hi, lo_incl, hi_incl
+    )
+
+    # Return converter
+    return converter
+
+
+def float_range(lo=None, hi=None, lo_incl=True, hi_incl=True):
+    """
+    Create converter that converts given argument text to float and \
+        ensures the float is in given range. NaN is never in range.
+
+    Used as `type` argument of `argparse.ArgumentParser.add_argument`, e.g. \
+        `type=float_range(lo=0, hi=1, hi_incl=False)`.
+
+    The returned converter's `many` attribute converts many argument texts \
+        in one call into `array.array` of doubles, e.g. \
+        `float_ge0.many(['0.5', '1'])`.
+
+    :param lo: Lower bound. None means no lower bound.
+
+    :param hi: Upper bound. None means no upper bound.
+
+    :param lo_incl: Whether the lower bound is inclusive.
+
+    :param hi_incl: Whether the upper bound is inclusive.
+
+    :return: Converter function.
+    """
+    # Create converter
+    converter = _range_converter(
+        float, 'd', 'float', lo, hi, lo_incl, hi_incl
+    )
+
+    # Set converter name
+    converter.__name__ = _range_converter_name(
+        'float_range', lo, hi, lo_incl, hi_incl
+    )
+
+    # Return converter
+    return converter
+
+
+# Convert given argument text to integer and ensure the integer is <0
+int_lt0 = int_range(hi=0, hi_incl=False)
+
+int_lt0.__name__ = 'int_lt0'
+
+
+# Convert given argument text to integer and ensure the integer is <=0
+int_le0 = int_range(hi=0)
+
+int_le0.__name__ = 'int_le0'
+
+
+# Convert given argument text to integer and ensure the integer is >0
+int_gt0 = int_range(lo=0, lo_incl=False)
+
+int_gt0.__name__ = 'int_gt0'
+
+
+# Convert given argument text to integer and ensure the integer is >=0
+int_ge0 = int_range(lo=0)
+
+int_ge0.__name__ = 'int_ge0'
+
+
+# Convert given argument text to float and ensure the float is <0
+float_lt0 = float_range(hi=0, hi_incl=False)
+
+float_lt0.__name__ = 'float_lt0'
+
+
+# Convert given argument text to float and ensure the float is <=0
+float_le0 = float_range(hi=0)
+
+float_le0.__name__ = 'float_le0'
+
+
+# Convert given argument text to float and ensure the float is >0
+float_gt0 = float_range(lo=0, lo_incl=False)
+
+float_gt0.__name__ = 'float_gt0'
+
+
+# Convert given argument text to float and ensure the float is >=0
+float_ge0 = float_range(lo=0)
+
+float_ge0.__name__ = 'float_ge0'
+
+
+# Size pattern, e.g. '512MiB', '1.5 G'. Groups are integer part, fraction
+# part, unit.
+_SIZE_RE = re.compile(r'\s*([0-9]+)(?:\.([0-9]+))?\s*([A-Za-z]*)\s*\Z')
+
+
+# Size unit to byte count mapping.
+#
+# Single-letter units are binary, as in `ls -h` and `dd`. 'KB' and 'kB' etc.
+# are decimal. 'KiB' etc. are binary.
+_SIZE_UNIT_D = {'': 1, 'B': 1}
+
+# For each unit prefix and the power
+for _power, _prefix in enumerate('KMGTPE', 1):
+    # Add binary unit, e.g. 'K'
+    _SIZE_UNIT_D[_prefix] = 1024 ** _power
+
+    # Add binary unit, e.g. 'k'
+    _SIZE_UNIT_D[_prefix.lower()] = 1024 ** _power
+
+    # Add decimal unit, e.g. 'KB'
+    _SIZE_UNIT_D[_prefix + 'B'] = 1000 ** _power
+
+    # Add binary unit, e.g. 'KiB'
+    _SIZE_UNIT_D[_prefix + 'iB'] = 1024 ** _power
+
+# Add decimal unit 'kB', the SI spelling
+_SIZE_UNIT_D['kB'] = 1000
+
+# Delete loop variables
+del _power, _prefix
+
+
+def size_bytes_ge0(text):
+    """
+    Convert given size argument text to byte count, e.g. '512MiB', '1.5G', \
+        '10KB'.
+
+    Units are 'B', binary 'K', 'M', 'G', 'T', 'P', 'E' (also lowercase) \
+        and 'KiB', 'MiB', etc., decimal 'KB', 'MB', etc. No unit means \
+        bytes. The result is computed with integer math and must be a \
+        whole number of bytes.
+
+    Used as `type` argument of `argparse.ArgumentParser.add_argument`.
+
+    :param text: Argument text.
+
+    :return: Byte count >=0.
+    """
+    try:
+        # Match given argument text.
+        # May raise error.
+        match = _SIZE_RE.match(text)
+
+    # If given argument text is not string
+    except TypeError:
+        # Use None
+        match = None
+
+    # If matched
+    if match is not None:
+        # Get integer part, fraction part, unit
+        int_text, frac_text, unit = match.groups()
+
+        # Get the unit's byte count.
+        # None if the unit is not valid.
+        multiplier = _SIZE_UNIT_D.get(unit)
+
+        # If the unit is valid
+        if multiplier is not None:
+            # Get fraction part
+            frac_text = frac_text or ''
+
+            try:
+                # Get byte count and remainder of the number without decimal
+                # point times the unit.
+                # May raise error.
+                byte_count, remainder = divmod(
+                    int(int_text + frac_text) * multiplier,
+                    10 ** len(frac_text),
+                )
+
+            # If the number has too many digits to convert, e.g. over
+            # `sys.get_int_max_str_digits()` since Python 3.11
+            except ValueError:
+                # Use remainder that rejects the number
+                remainder = 1
+
+            # If the byte count is whole
+            if not remainder:
+                # Return the byte count
+                return byte_count
+
+    # Get error message
+    error_msg = 'Expected a size in bytes >=0. Got: {0}.'.format(repr(text))
+
+    # Raise error
+    raise ArgumentTypeError(error_msg)
+
+
+# Duration component pattern, e.g. '1h', '1.5m', '500ms'. Groups are number,
+# unit.
+_DURATION_RE = re.compile(r'([0-9]+(?:\.[0-9]+)?)(us|ms|s|m|h|d|w)?')
+
+
+# Duration unit to second count mapping
+_DURATION_UNIT_D = {
+    'us': 1e-6,
+    'ms': 1e-3,
+    's': 1,
+    'm': 60,
+    'h': 3600,
+    'd': 86400,
+    'w': 604800,
+}
+
+
+def duration_seconds_gt0(text):
+    """
+    Convert given duration argument text to seconds and ensure the seconds \
+        is >0, e.g. '1h30m', '90s', '1.5d', '500ms'.
+
+    Units are 'us', 'ms', 's', 'm', 'h', 'd', 'w'. A number without unit \
+        means seconds, if it is the only component.
+
+    Used as `type` argument of `argparse.ArgumentParser.add_argument`.
+
+    :param text: Argument text.
+
+    :return: Float seconds >0 and finite.
+    """
+    try:
+        # Strip given argument text.
+        # May raise error.
+        stripped_text = text.strip()
+
+    # If given argument text is not string
+    except AttributeError:
+        # Use empty text
+        stripped_text = ''
+
+    # Get text length
+    text_len = len(stripped_text)
+
+    # Get match function
+    match_func = _DURATION_RE.match
+
+    # Seconds
+    seconds = 0.0
+
+    # Matching position
+    pos = 0
+
+    # While not reached the end
+    while pos < text_len:
+        # Match a component at the position
+        match = match_func(stripped_text, pos)
+
+        # If not matched
+        if match is None:
+            # Stop
+            break
+
+        # Get number and unit
+        number, unit = match.groups()
+
+        # If not have unit
+        if unit is None:
+            # If the component is not the only component
+            if pos != 0 or match.end() != text_len:
+                # Stop
+                break
+
+            # Use seconds
+            unit = 's'
+
+        # Add the component's seconds
+        seconds += float(number) * _DURATION_UNIT_D[unit]
+
+        # Move to the next component
+        pos = match.end()
+
+    # If all components are matched
+    else:
+        # If the text is not empty and the seconds is >0 and finite, i.e.
+        # not overflowed to infinity
+        if text_len and seconds > 0 and not isinf(seconds):
+            # Return the seconds
+            return seconds
+
+    # Get error message
+    error_msg = 'Expected a duration in seconds >0. Got: {0}.'.format(
+        repr(text)
+    )
+
+    # Raise error
+    raise ArgumentTypeError(error_msg)
+
+
+# Range type. Python 2's `range` returns list so use `xrange`.
+try:
+    # Get `xrange`.
+    # May raise error.
+    _range = xrange
+
+# If have error
+except NameError:
+    # Use `range`
+    _range = range
+
+
+class RangeSet(object):
+    """
+    Set of integers stored as sorted, merged ranges.
+
+    Supports membership test by bisect in O(log n) for n ranges, `len`, and \
+        iteration, without materializing the integers.
+    """
+
+    __slots__ = ('ranges', '_start_s', '_len')
+
+    def __init__(self, ranges):
+        """
+        Constructor.
+
+        :param ranges: Iterable of `range` objects with step 1. Overlapping \
+            and adjacent ranges are merged.
+
+        :return: None.
+        """
+        # Start and stop pair list
+        pair_s = []
+
+        # For each range, in start order
+        for range_obj in sorted(ranges, key=lambda x: x[0] if x else 0):
+            # If the range is empty
+            if not range_obj:
+                # Ignore
+                continue
+
+            # Get the range's start, stop, step.
+            #
+            # Python 2's `xrange` not has `start`, `stop`, `step`. `len` is
+            # not used because it raises OverflowError for ranges of more
+            # than `sys.maxsize` integers.
+            start = range_obj[0]
+
+            stop = range_obj[-1] + 1
+
+            # A range of one integer has no second integer to get the step
+            # from. Otherwise the first two integers give the step, which is
+            # negative for descending ranges.
+            step = range_obj[1] - start if range_obj[-1] != start else 1
+
+            # If the step is not 1
+            if step != 1:
+                # Get error message
+                msg = 'Expected range of step 1. Got: {0}.'.format(
+                    repr(range_obj)
+                )
+
+                # Raise error
+                raise ValueError(msg)
+
+            # If the range overlaps or adjoins the previous range
+            if pair_s and start <= pair_s[-1][1]:
+                # Extend the previous range
+                pair_s[-1][1] = max(pair_s[-1][1], stop)
+
+            # If the range is separate from the previous range
+            else:
+                # Add the range
+                pair_s.append([start, stop])
+
+        # Store merged ranges
+        self.ranges = tuple(_range(start, stop) for start, stop in pair_s)
+
+        # Store range starts for bisect
+        self._start_s = tuple(start for start, _ in pair_s)
+
+        # Store integer count
+        self._len = sum(stop - start for start, stop in pair_s)
+
+    def __contains__(self, value):
+        """
+        Test whether given value is in this set.
+
+        :param value: Value.
+
+        :return: Boolean.
+        """
+        try:
+            # Get index of the last range starting at or before the value.
+            # May raise error.
+            index = bisect_right(self._start_s, value) - 1
+
+        # If the value is not comparable with integer
+        except TypeError:
+            # Return False
+            return False
+
+        # Return whether the range contains the value
+        return index >= 0 and value in self.ranges[index]
+
+    def __len__(self):
+        """
+        Get integer count. Like `len` of `range`, raises OverflowError if \
+            the count is greater than `sys.maxsize`.
+
+        :return: Integer count.
+        """
+        # Return integer count
+        return self._len
+
+    def __iter__(self):
+        """
+        Iterate integers in ascending order.
+
+        :return: Iterator.
+        """
+        # For each range
+        for range_obj in self.ranges:
+            # For each integer in the range
+            for value in range_obj:
+                # Yield the integer
+                yield value
+
+    def __eq__(self, other):
+        """
+        Test whether this set equals given set.
+
+        :param other: Other object.
+
+        :return: Boolean.
+        """
+        # If the other object is not RangeSet
+        if not isinstance(other, RangeSet):
+            # Return NotImplemented
+            return NotImplemented
+
+        # Return whether the ranges are the same.
+        #
+        # Compare starts and stops because Python 2's `xrange` not supports
+        # equality.
+        return self._start_s == other._start_s and \
+            [x[-1] for x in self.ranges] == [x[-1] for x in other.ranges]
+
+    def __ne__(self, other):
+        """
+        Test whether this set not equals given set.
+
+        :param other: Other object.
+
+        :return: Boolean.
+        """
+        # Get equality
+        result = self.__eq__(other)
+
+        # Return the inverted equality
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        """
+        Convert to string representation.
+
+        :return: String.
+        """
+        # Return string representation, e.g. "RangeSet('0-9,20')"
+        return 'RangeSet({0})'.format(repr(','.join(
+            str(x[0]) if x[0] == x[-1] else '{0}-{1}'.format(x[0], x[-1])
+            for x in self.ranges
+        )))
+
+
+# Integer range pattern, e.g. '5', '0-1023'. Groups are start, end.
+_INT_RANGE_RE = re.compile(r'\s*([0-9]+)\s*(?:-\s*([0-9]+)\s*)?\Z')
+
+
+def int_ranges_ge0(text):
+    """
+    Convert given comma-delimited argument text of integer ranges to \
+        RangeSet, e.g. '0-1023,2048-4095', '0-63', '1,3,5-7'. Range ends are \
+        inclusive. Integers must be >=0.
+
+    Used as `type` argument of `argparse.ArgumentParser.add_argument`.
+
+    :param text: Argument text.
+
+    :return: RangeSet.
+    """
+    try:
+        # Split given argument text.
+        # May raise error.
+        item_s = text.split(',')
+
+    # If given argument text is not string
+    except AttributeError:
+        # Use the argument text as the only item
+        item_s = [text]
+
+    # Range list
+    range_s = []
+
+    # Get match function
+    match_func = _INT_RANGE_RE.match
+
+    # For each item
+    for item in item_s:
+        try:
+            # Match the item.
+            # May raise error.
+            match = match_func(item)
+
+        # If the item is not string
+        except TypeError:
+            # Use None
+            match = None
+
+        # If matched
+        if match is not None:
+            # Get start and end
+            start_text, end_text = match.groups()
+
+            try:
+                # Get start.
+                # May raise error.
+                start = int(start_text)
+
+                # Get end.
+                # May raise error.
+                end = start if end_text is None else int(end_text)
+
+            # If the integer has too many digits for `int`
+            except ValueError:
+                # Use reversed range, which is rejected below
+                start, end = 1, 0
+
+            # If the range is not reversed
+            if start <= end:
+                # Add the range
+                range_s.append(_range(start, end + 1))
+
+                # Continue to the next item
+                continue
+
+        # Get error message
+        error_msg = 'Expected an integer range >=0. Got: {0}.'.format(
+            repr(item)
+        )
+
+        # Raise error
+        raise ArgumentTypeError(error_msg)
+
+    # Create RangeSet
+    range_set = RangeSet(range_s)
+
+    # If the integer count is too large for `len`
+    if range_set._len > sys.maxsize:
+        # Get error message
+        error_msg = (
+            'Expected integer ranges of at most {0} integers. Got: {1}.'
+        ).format(sys.maxsize, repr(text))
+
+        # Raise error
+        raise ArgumentTypeError(error_msg)
+
+    # Return RangeSet
+    return range_set
+
+
+# Minimum text length of each chunk `_DelimitedItems` splits at once
+_SPLIT_CHUNK_SIZE = 8192
+
+
+class _DelimitedItems(object):
+    """
+    Items of a text split by a delimiter, as `str.split` splits them.
+
+    Each iteration splits the text in chunks of about `_SPLIT_CHUNK_SIZE` \
+        characters, cut at delimiters found with `str.find`, so only one \
+        chunk's items are in memory at a time, instead of a list of all \
+        items. Can be iterated again, e.g. to find the first offending item.
+    """
+
+    __slots__ = ('text', 'delimiter')
+
+    def __init__(self, text, delimiter):
+        """
+        Constructor.
+
+        :param text: Text.
+
+        :param delimiter: Non-empty delimiter.
+
+        :return: None.
+        """
+        # Store text
+        self.text = text
+
+        # Store delimiter
+        self.delimiter = delimiter
+
+    def __iter__(self):
+        """
+        Iterate the items.
+
+        :return: Item iterator.
+        """
+        # Get text
+        text = self.text
+
+        # Get delimiter
+        delimiter = self.delimiter
+
+        # Get delimiter length
+        delimiter_len = len(delimiter)
+
+        # Get find function
+        find = text.find
+
+        # Start position of the current chunk or item
+        start = 0
+
+        # If the delimiter's occurrences may overlap, i.e. a proper prefix
+        # of the delimiter is also its suffix, e.g. `,,` in `,,,`.
+        #
+        # A delimiter found after a chunk size may then not be where
+        # `str.split` splits. Find each delimiter from the previous one
+        # instead.
+        if any(
+            delimiter[:x] == delimiter[-x:] for x in range(1, delimiter_len)
+        ):
+            # While have delimiter after the current item
+            while True:
+                # Find the delimiter
+                end = find(delimiter, start)
+
+                # If not have delimiter
+                if end == -1:
+                    # Generate the last item
+                    yield text[start:]
+
+                    # Stop
+                    return
+
+                # Generate the item
+                yield text[start:end]
+
+                # Move to the next item
+                start = end + delimiter_len
+
+        # While have delimiter after the current chunk
+        while True:
+            # Find the delimiter that ends the chunk
+            end = find(delimiter, start + _SPLIT_CHUNK_SIZE)
+
+            # If not have delimiter
+            if end == -1:
+                # For the last chunk's each item
+                for item in text[start:].split(delimiter):
+                    # Generate the item
+                    yield item
+
+                # Stop
+                return
+
+            # For the chunk's each item
+            for item in text[start:end].split(delimiter):
+                # Generate the item
+                yield item
+
+            # Move to the next chunk
+            start = end + delimiter_len
+
+
+def list_of(converter, delimiter=',', dedupe=False):
+    """
+    Create converter that splits given argument text by given delimiter and \
+        converts each item using given converter.
+
+    Used as `type` argument of `argparse.ArgumentParser.add_argument`, e.g. \
+        `type=list_of(int_ge0)` for `--ids 1,2,3`.
+
+    If given converter has bulk variant `many`, e.g. converters created by \
+        `int_range` and `float_range`, all items are converted in one call \
+        into an `array.array`. Otherwise the result is a list.
+
+    The argument text is split in bounded chunks cut at delimiters found \
+        with `str.find`, and items are converted as they are split, \
+        without building an intermediate list of all item texts.
+
+    The error message is given converter's error message of the first \
+        offending item. Argument text that is not string is rejected with \
+        ArgumentTypeError.
+
+    :param converter: Item converter.
+
+    :param delimiter: Item delimiter.
+
+    :param dedupe: Whether to remove duplicate items, keeping the first \
+        occurrence of each.
+
+    :return: Converter function.
+    """
+    # If the delimiter is empty
+    if not delimiter:
+        # Raise error
+        raise ValueError('Expected a non-empty delimiter.')
+
+    def split_items(text):
+        """
+        Get items of given argument text.
+
+        :param text: Argument text.
+
+        :return: _DelimitedItems object.
+        """
+        try:
+            # Find the delimiter, to ensure the argument text is string.
+            # May raise error.
+            text.find(delimiter)
+
+        # If given argument text is not string
+        except (AttributeError, TypeError):
+            # Get error message
+            error_msg = 'Expected a list delimited by {0}. Got: {1}.'.format(
+                repr(delimiter), repr(text)
+            )
+
+            # Raise error
+            raise ArgumentTypeError(error_msg)
+
+        # Return items
+        return _DelimitedItems(text, delimiter)
+
+    # Get the item converter's bulk variant.
+    # None if not exists.
+    many = getattr(converter, 'many', None)
+
+    # If the item converter has bulk variant
+    if many is not None:
+        # If not dedupe
+        if not dedupe:
+            def list_converter(text):
+                # Convert all items
+                return many(split_items(text))
+
+        # If dedupe
+        else:
+            def list_converter(text):
+                # Convert all items
+                value_s = many(split_items(text))
+
+                # Return unique values in the original order
+                return array(
+                    value_s.typecode, OrderedDict.fromkeys(value_s)
+                )
+
+    # If the item converter not has bulk variant
+    else:
+        # If not dedupe
+        if not dedupe:
+            def list_converter(text):
+                # Convert all items
+                return [converter(item) for item in split_items(text)]
+
+        # If dedupe
+        else:
+            def list_converter(text):
+                # Return unique values in the original order
+                return list(OrderedDict.fromkeys(
+                    converter(item) for item in split_items(text)
+                ))
+
+    # Set converter name
+    list_converter.__name__ = 'list_of({0}{1}{2})'.format(
+        getattr(converter, '__name__', repr(converter)),
+        '' if delimiter == ',' else ', delimiter={0}'.format(
+            repr(delimiter)
+        ),
+        '' if not dedupe else ', dedupe=True',
+    )
+
+    # Return converter
+    return list_converter
+
+
+# Convert given comma-delimited argument text to `array.array` of integers
+# >=0
+int_list_ge0 = list_of(int_ge0)
+
+int_list_ge0.__name__ = 'int_list_ge0'
+
+
+# Convert given comma-delimited argument text to `array.array` of floats >0
+float_list_gt0 = list_of(float_gt0)
+
+float_list_gt0.__name__ = 'float_list_gt0'
+
+
+# Convert given comma-delimited argument text to list of stripped non-empty
+# strings
+str_list_strip_nonempty = list_of(str_strip_nonempty)
+
+str_list_strip_nonempty.__name__ = 'str_list_strip_nonempty'
+
+
+def cached_converter(func, maxsize=1024):
+    """
+    Create converter that caches results of given converter, keyed by \
+        argument text, with least recently used eviction.
+
+    Both converted values and errors are cached. A cached error is raised \
+        again as a new `ArgumentTypeError` with the same message.
+
+    Cached values are shared between calls, so given converter should \
+        return immutable values.
+
+    A cache hit costs a lock and a dict update, about a microsecond, so \
+        caching pays for slower converters, e.g. list converters, not for \
+        trivial converters like `bool_0or1`.
+
+    The returned converter has given converter's `__name__`, which \
+        `argparse` uses in error messages, and has attributes:
+    - `cache_info()`: Get CacheInfo namedtuple of hits, misses, maxsize, \
+        currsize.
+    - `cache_clear()`: Clear cached results and statistics.
+
+    :param func: Converter function.
+
+    :param maxsize: Maximum cached argument text count. Must be >0.
+
+    :return: Converter function.
+    """
+    # Create cache.
+    #
+    # Each value is a tuple of whether the conversion succeeded, and the
+    # converted value or the error arguments.
+    cache = _LruCache(maxsize)
+
+    def converter(text):
+        # Get cached result
+        result = cache.get(text)
+
+        # If the result is not cached
+        if result is _MISSING:
+            try:
+                # Convert given argument text.
+                # May raise error.
+                value = func(text)
+
+            # If have error
+            except ArgumentTypeError as e:
+                # Cache the error arguments
+                cache.set(text, (False, e.args))
+
+                # Raise the error
+                raise
+
+            # Cache the value
+            cache.set(text, (True, value))
+
+            # Return the value
+            return value
+
+        # If the cached result is a value
+        if result[0]:
+            # Return the value
+            return result[1]
+
+        # Raise error
+        raise ArgumentTypeError(*result[1])
+
+    # Copy given converter's name and docstring.
+    #
+    # `argparse` uses the name in error messages.
+    converter.__name__ = getattr(func, '__name__', repr(func))
+
+    converter.__doc__ = getattr(func, '__doc__', None)
+
+    # Store given converter
+    converter.__wrapped__ = func
+
+    # Store cache functions
+    converter.cache_info = cache.info
+
+    converter.cache_clear = cache.clear
+
+    # Return converter
+    return converter
+
+
+def chain(*funcs):
+    """
+    Create converter that passes given argument text through given \
+        converters in order, e.g. `chain(str_strip_nonempty, int_gt0)`.
+
+    The converter is generated as one function calling the converters \
+        directly, so chaining adds no wrapper call frames. Errors raised by \
+        any converter propagate as is.
+
+    Chained converters given are flattened, so `chain(chain(a, b), c)` is \
+        the same as `chain(a, b, c)`.
+
+    The converter's `__name__` lists the converters' names, e.g. \
+        'chain(str_strip_nonempty, int_gt0)', which `argparse` uses in error \
+        messages.
+
+    :param funcs: Converter functions.
+
+    :return: Converter function.
+    """
+    # If not have converter
+    if not funcs:
+        # Raise error
+        raise ValueError('Expected at least one converter.')
+
+    # Flattened converter list
+    func_s = []
+
+    # For each converter
+    for func in funcs:
+        # Add the converter's chained converters, or the converter
+        func_s.extend(getattr(func, '_chain_funcs', (func,)))
+
+    # Get parameter names of the generated factory, e.g. '_f0, _f1'
+    param_names = ', '.join('_f{0}'.format(x) for x in range(len(func_s)))
+
+    # Get nested call expression, e.g. '_f1(_f0(text))'
+    call_expr = 'text'
+
+    # For each converter index
+    for index in range(len(func_s)):
+        # Wrap the expression in the converter's call
+        call_expr = '_f{0}({1})'.format(index, call_expr)
+
+    # Get source of the factory that creates the converter.
+    #
+    # The converters are closure variables of the converter, which are
+    # faster to access than globals.
+    source = (
+        'def factory({0}):\n'
+        '    def converter(text):\n'
+        '        return {1}\n'
+        '    return converter\n'
+    ).format(param_names, call_expr)
+
+    # Namespace of the generated code
+    namespace = {}
+
+    # Execute the source
+    exec(source, namespace)
+
+    # Create converter
+    converter = namespace['factory'](*func_s)
+
+    # Set converter name
+    converter.__name__ = 'chain({0})'.format(', '.join(
+        getattr(func, '__name__', repr(func)) for func in func_s
+    ))
+
+    # Store chained converters for flattening
+    converter._chain_funcs = tuple(func_s)
+
+    # Return converter
+    return converter
+
+
+class BaseSpec(object):
+    """
+    Base class for spec.
+    """
+
+    def ensure_spec(self, args, depending):
+        """
+        Ensure this spec. Raise SpecViolationError if violated.
+
+        :param args: Argument list given to `ensure_spec`, or ArgIndex \
+            object. An argument iterable that is not a sequence, e.g. a \
+            generator, is collected into a list first, so it can be \
+            iterated again.
+
+        :param depending: Depending argument name.
+
+        :return: None.
+        """
+        # Implemented in subclass
+        raise NotImplementedError()
+
+
+class Argument(BaseSpec):
+    """
+    Argument spec that requires given argument name exists, and given sub \
+        spec is ensured.
+    """
+
+    def __init__(self, arg_name, sub_spec=None):
+        """
+        Constructor.
+
+        :param arg_name: Argument name.
+
+        :param sub_spec: Sub spec.
+
+        :return: None.
+        """
+        # Store argument name
+        self.arg_name = arg_name
+
+        # Store sub spec
+        self.sub_spec = sub_spec
+
+    def __repr__(self):
+        """
+        Convert to string representation.
+
+        :return: String.
+        """
+        # Return string representation
+        return 'Argument({0}, {1})'.format(
+            repr(self.arg_name),
+            repr(self.sub_spec),
+        )
+
+    def ensure_spec(self, args, depending):
+        """
+        Ensure this spec. Raise SpecViolationError if violated.
+
+        :param args: Iterable of arguments, or ArgIndex object.
+
+        :param depending: Depending argument name.
+
+        :return: None.
+        """
+        # Ensure this spec as Argument spec, even if called by subclass
+        _walk_spec(self, args, depending, Argument)
+
+
+class Option(BaseSpec):
+    """
+    Argument spec that requires given sub spec is ensured only if given \
+        argument name exists.
+    """
+
+    def __init__(self, arg_name, sub_spec=None):
+        """
+        Constructor.
+
+        :param arg_name: Argument name.
+
+        :param sub_spec: Sub spec.
+
+        :return: None.
+        """
+        # Store argument name
+        self.arg_name = arg_name
+
+        # Store sub spec
+        self.sub_spec = sub_spec
+
+    def __repr__(self):
+        """
+        Convert to string representation.
+
+        :return: String.
+        """
+        # Return string representation
+        return 'Option({0}, {1})'.format(
+            repr(self.arg_name),
+            repr(self.sub_spec),
+        )
+
+    def ensure_spec(self, args, depending):
+        """
+        Ensure this spec. Raise SpecViolationError if violated.
+
+        :param args: Iterable of arguments, or ArgIndex object.
+
+        :param depending: Depending argument name.
+
+        :return: None.
+        """
+        # Ensure this spec as Option spec, even if called by subclass
+        _walk_spec(self, args, depending, Option)
+
+
+class OneOf(BaseSpec):
+    """
+    Argument spec that requires exact one of given sub specs is ensured.
+    """
+
+    def __init__(self, *sub_specs):
+        """
+        Constructor.
+
+        :param sub_specs: Sub spec list.
+
+        Each sub spec must be argument name string, or Argument object. \
+            Otherwise raise TypeError.
+
+        The sub specs' argument names are resolved once here. Argument \
+            objects' argument names must not be modified afterwards.
+
+        :return: None.
+        """
+        # Argument name list
+        arg_name_s = []
+
+        # For each sub spec
+        for sub_spec in sub_specs:
+            # If the sub spec is string
+            if isinstance(sub_spec, str):
+                # Use the string as argument name
+                arg_name_s.append(sub_spec)
+
+            # If the sub spec is Argument spec
+            elif isinstance(sub_spec, Argument):
+                # Use the Argument spec's argument name
+                arg_name_s.append(sub_spec.arg_name)
+
+            # If the sub spec is not argument name string or Argument object
+            else:
+                # Get error message
+                msg = 'Expected string or Argument object. Got {0}.'.format(
+                    repr(sub_spec)
+                )
+
+                # Raise error
+                raise TypeError(msg)
+
+        # Store sub specs
+        self._sub_specs = tuple(sub_specs)
+
+        # Store argument names
+        self._arg_names = tuple(arg_name_s)
+
+        # Whether any argument name contains `=`, which ArgIndex can not
+        # answer by its name set alone
+        self._has_eq_names = any('=' in x for x in arg_name_s)
+
+    def __iter__(self):
+        """
+        Get sub spec iterator.
+
+        :return: Sub spec iterator.
+        """
+        # Return sub spec iterator
+        return iter(self._sub_specs)
+
+    def __repr__(self):
+        """
+        Convert to string representation.
+
+        :return: String.
+        """
+        # Return string representation
+        return 'OneOf({0})'.format(', '.join(repr(x) for x in self))
+
+    def ensure_spec(self, args, depending):
+        """
+        Ensure this spec. Raise SpecViolationError if violated.
+
+        :param args: Iterable of arguments, or ArgIndex object.
+
+        :param depending: Depending argument name.
+
+        :return: None.
+        """
+        # Ensure this spec as OneOf spec, even if called by subclass
+        _walk_spec(self, args, depending, OneOf)
+
+
+class AllOf(BaseSpec):
+    """
+    Argument spec that requires all given sub specs are ensured.
+    """
+
+    def __init__(self, *sub_specs):
+        """
+        Constructor.
+
+        :param sub_specs: Sub spec list.
+
+        :return: None.
+        """
+        # Store sub specs
+        self._sub_specs = list(sub_specs)
+
+    def __iter__(self):
+        """
+        Get sub spec iterator.
+
+        :return: Sub spec iterator.
+        """
+        # Return sub spec iterator
+        return iter(self._sub_specs)
+
+    def __repr__(self):
+        """
+        Convert to string representation.
+
+        :return: String.
+        """
+        # Return string representation
+        return 'AllOf({0})'.format(', '.join(repr(x) for x in self))
+
+    def ensure_spec(self, args, depending):
+        """
+        Ensure this spec. Raise SpecViolationError if violated.
+
+        :param args: Iterable of arguments, or ArgIndex object.
+
+        :param depending: Depending argument name.
+
+        :return: None.
+        """
+        # Ensure this spec as AllOf spec, even if called by subclass
+        _walk_spec(self, args, depending, AllOf)
+
+
+class SpecViolationError(Exception):
+    """
+    Error raised when an argument spec violation is detected.
+
+    `args` is a tuple of error message and violated spec. For errors raised \
+        by this module, `args` is rendered from the structured fields on \
+        first access, so handlers that catch the error and try another spec \
+        do not pay for formatting the message.
+    """
+
+    def __init__(self, *args):
+        """
+        Constructor.
+
+        :param args: Error message and violated spec.
+
+        :return: None.
+        """
+        # Call super constructor
+        Exception.__init__(self, *args)
+
+        # Violation record. None if not created from violation record.
+        self._violation = None
+
+    @classmethod
+    def from_violation(cls, violation):
+        """
+        Create error of given violation record, without formatting the \
+            error message.
+
+        :param violation: SpecViolation object.
+
+        :return: SpecViolationError.
+        """
+        # Create error without args
+        error = cls()
+
+        # Store violation record
+        error._violation = violation
+
+        # Return error
+        return error
+
+    @property
+    def args(self):
+        """
+        Error arguments, i.e. error message and violated spec. Rendered on \
+            first access if the error is created from violation record.
+
+        :return: Error arguments tuple.
+        """
+        # Get error arguments
+        args = BaseException.args.__get__(self)
+
+        # If error arguments are not rendered
+        if not args and self._violation is not None:
+            # Render error arguments
+            args = (self._violation.msg, self._violation.spec)
+
+            # Store error arguments
+            BaseException.args.__set__(self, args)
+
+        # Return error arguments
+        return args
+
+    @args.setter
+    def args(self, args):
+        """
+        Set error arguments.
+
+        :param args: Error arguments tuple.
+
+        :return: None.
+        """
+        # Store error arguments
+        BaseException.args.__set__(self, args)
+
+    @property
+    def violation(self):
+        """
+        Violation record.
+
+        For error not created from violation record, a `CUSTOM` kind record \
+            is created from `args`.
+
+        :return: SpecViolation object.
+        """
+        # If not have violation record
+        if self._violation is None:
+            # Get error arguments
+            args = self.args
+
+            # Create violation record
+            self._violation = SpecViolation(
+                SpecViolation.CUSTOM,
+                args[1] if len(args) > 1 else None,
+                None,
+                msg=args[0] if args else '',
+            )
+
+        # Return violation record
+        return self._violation
+
+    @property
+    def kind(self):
+        """
+        Violation kind. See `SpecViolation`.
+
+        :return: Violation kind.
+        """
+        # Return violation kind
+        return self.violation.kind
+
+    @property
+    def spec(self):
+        """
+        Violated spec. Same as `args[1]`.
+
+        :return: Violated spec.
+        """
+        # Return violated spec
+        return self.violation.spec
+
+    @property
+    def depending(self):
+        """
+        Depending argument name.
+
+        :return: Depending argument name.
+        """
+        # Return depending argument name
+        return self.violation.depending
+
+    @property
+    def arg_names(self):
+        """
+        Argument names of the violated spec.
+
+        :return: Argument name tuple.
+        """
+        # Return argument names
+        return self.violation.arg_names
+
+    @property
+    def found_arg_names(self):
+        """
+        For OneOf spec, the first two found argument names if more than one \
+            are found, otherwise empty.
+
+        :return: Found argument name tuple.
+        """
+        # Return found argument names
+        return self.violation.found_arg_names
+
+    def __str__(self):
+        """
+        Convert to string.
+
+        :return: String.
+        """
+        # Render error arguments
+        self.args
+
+        # Return string
+        return Exception.__str__(self)
+
+    def __repr__(self):
+        """
+        Convert to string representation.
+
+        :return: String.
+        """
+        # Render error arguments
+        self.args
+
+        # Return string representation
+        return Exception.__repr__(self)
+
+    def __reduce__(self):
+        """
+        Get pickling info. The error is pickled with rendered arguments.
+
+        :return: Pickling info.
+        """
+        # Return pickling info
+        return (type(self), tuple(self.args))
+
+
+class SpecViolation(object):
+    """
+    Lightweight record of an argument spec violation.
+
+    The error message is formatted only when `msg` is first accessed.
+    """
+
+    # Violation kind of missing argument name
+    ARGUMENT = 'argument'
+
+    # Violation kind of OneOf spec
+    ONE_OF = 'one_of'
+
+    # Violation kind of AllOf spec
+    ALL_OF = 'all_of'
+
+    # Violation kind of custom BaseSpec instance
+    CUSTOM = 'custom'
+
+    __slots__ = ('kind', 'spec', 'depending', 'found_arg_names', '_msg')
+
+    def __init__(self, kind, spec, depending, found_arg_names=(), msg=None):
+        """
+        Constructor.
+
+        :param kind: Violation kind. One of `ARGUMENT`, `ONE_OF`, `ALL_OF`, \
+            and `CUSTOM`.
+
+        :param spec: Violated spec. Argument name string for missing \
+            argument name, otherwise the violated spec object. Same as \
+            SpecViolationError's second argument.
+
+        :param depending: Depending argument name.
+
+        :param found_arg_names: For OneOf spec, the first two found \
+            argument names if more than one are found, otherwise empty.
+
+        :param msg: Error message. Required for `CUSTOM` kind, otherwise \
+            formatted when accessed.
+
+        :return: None.
+        """
+        # Store violation kind
+        self.kind = kind
+
+        # Store violated spec
+        self.spec = spec
+
+        # Store depending argument name
+        self.depending = depending
+
+        # Store found argument names
+        self.found_arg_names = found_arg_names
+
+        # Store error message
+        self._msg = msg
+
+    @property
+    def arg_names(self):
+        """
+        Argument names of the violated spec.
+
+        :return: Argument name tuple.
+        """
+        # If the violation kind is missing argument name
+        if self.kind == SpecViolation.ARGUMENT:
+            # Return the argument name
+            return (self.spec,)
+
+        # If the violation kind is OneOf spec
+        elif self.kind == SpecViolation.ONE_OF:
+            # Return the OneOf spec's argument names
+            return self.spec._arg_names
+
+        # If the violation kind is AllOf spec
+        elif self.kind == SpecViolation.ALL_OF:
+            # Return the AllOf spec's argument names
+            return tuple(_spec_arg_names(self.spec))
+
+        # If the violation kind is custom BaseSpec instance
+        else:
+            # Return empty tuple
+            return ()
+
+    @property
+    def msg(self):
+        """
+        Error message, formatted on first access.
+
+        :return: Error message.
+        """
+        # Get error message
+        msg = self._msg
+
+        # If error message is not formatted
+        if msg is None:
+            # If the violation kind is missing argument name
+            if self.kind == SpecViolation.ARGUMENT:
+                # Get error message
+                msg = _argument_error_msg(self.spec, self.depending)
+
+            # If the violation kind is OneOf spec
+            elif self.kind == SpecViolation.ONE_OF:
+                # Get error message
+                msg = _one_of_error_msg(
+                    list(self.arg_names), self.depending, self.found_arg_names
+                )
+
+            # If the violation kind is AllOf spec
+            else:
+                # Get error message
+                msg = _all_of_error_msg(
+                    list(self.arg_names), self.depending
+                )
+
+            # Store error message
+            self._msg = msg
+
+        # Return error message
+        return msg
+
+    def __repr__(self):
+        """
+        Convert to string representation.
+
+        :return: String.
+        """
+        # Return string representation
+        return 'SpecViolation({0}, {1}, {2})'.format(
+            repr(self.kind), repr(self.spec), repr(self.depending)
+        )
+
+    def to_error(self):
+        """
+        Create SpecViolationError of this violation. The error message is \
+            not formatted until accessed.
+
+        :return: SpecViolationError.
+        """
+        # Return error
+        return SpecViolationError.from_violation(self)
+
+
+class ArgIndex(object):
+    """
+    Argument index that tokenizes an argument list once into a set of \
+        argument names, so that each existence test is a set lookup.
+
+    Argument `--name` and argument `--name=value` both index name `--name`.
+
+    The argument list is iterated once, so it can be any iterable, e.g. a \
+        generator reading arguments from a socket.
+    """
+
+    def __init__(self, args):
+        """
+        Constructor.
+
+        :param args: Iterable of arguments. Iterated once.
+
+        :return: None.
+        """
+        # Argument name set
+        names = set()
+
+        # Distinct arguments containing `=`.
+        # Kept for the rare argument names that themselves contain `=`.
+        eq_args = set()
+
+        # For given argument list's each argument
+        for arg in args:
+            # Find the first `=`
+            eq_pos = arg.find('=')
+
+            # If the argument has no `=`
+            if eq_pos == -1:
+                # Use the argument as argument name
+                names.add(arg)
+
+            # If the argument has `=`
+            else:
+                # Use the part before the first `=` as argument name
+                names.add(arg[:eq_pos])
+
+                # Keep the argument
+                eq_args.add(arg)
+
+        # Store argument name set
+        self._names = frozenset(names)
+
+        # Store arguments containing `=`
+        self._eq_args = frozenset(eq_args)
+
+    @classmethod
+    def from_args(
+        cls,
+        args,
+        fromfile_prefix_chars='@',
+        encoding=None,
+        max_name_len=1024,
+    ):
+        """
+        Create ArgIndex object of given argument list, reading arguments of \
+            response files given as `@path`, like `argparse`'s \
+            `fromfile_prefix_chars`.
+
+        Each line of a response file is an argument. Lines are split at \
+            the line breaks of Python 3's `str.splitlines`, as `argparse` \
+            splits them, e.g. `\\n`, `\\r\\n`, `\\r`. Response files are \
+            mapped into memory and scanned without being loaded. Only the \
+            part before the first `=` of each argument is stored, and only \
+            if it is at most given maximum length, so memory use does not \
+            depend on the size of argument values. Testing a longer argument \
+            name, or an argument name containing `=`, raises ValueError.
+
+        Each distinct argument is still stored, e.g. each line of a file of \
+            IDs. `ensure_spec` with `fromfile_prefix_chars` stores only the \
+            spec's argument names instead.
+
+        :param args: Iterable of arguments. Iterated once.
+
+        :param fromfile_prefix_chars: Characters that prefix response file \
+            path.
+
+        :param encoding: Response file encoding. Must be ASCII-compatible. \
+            Default is file system encoding, as used by `argparse`.
+
+        :param max_name_len: Maximum argument name length, in characters.
+
+        :return: ArgIndex object.
+        """
+        # Return ArgIndex object
+        return _index_response_file_args(
+            args, fromfile_prefix_chars, encoding, max_name_len, None
+        )
+
+    def __contains__(self, arg_name):
+        """
+        Test whether given argument name exists.
+
+        :param arg_name: Argument name.
+
+        :return: Whether given argument name exists.
+        """
+        # If the argument name is in the argument name set
+        if arg_name in self._names:
+            # Return True
+            return True
+
+        # If the argument name has no `=`
+        if '=' not in arg_name:
+            # Return False
+            return False
+
+        # Get the argument name followed by `=`
+        prefix = arg_name + '='
+
+        # For each argument containing `=`
+        for arg in self._eq_args:
+            # If the argument is the argument name, or starts with the
+            # argument name followed by `=`
+            if arg == arg_name or arg.startswith(prefix):
+                # Return True
+                return True
+
+        # If none of the arguments matches
+        else:
+            # Return False
+            return False
+
+    def __repr__(self):
+        """
+        Convert to string representation.
+
+        :return: String.
+        """
+        # Return string representation
+        return 'ArgIndex({0})'.format(repr(sorted(self._names)))
+
+
+class _KnownNameArgIndex(ArgIndex):
+    """
+    Argument index that stores only which of a set of known argument names \
+        exist, so that its size does not depend on the argument list.
+    """
+
+    # Error message of unknown argument name
+    _UNKNOWN_NAME_MSG = 'Argument name {0} is not a known argument name.'
+
+    def __init__(self, names, known_names):
+        """
+        Constructor.
+
+        :param names: Existing argument names.
+
+        :param known_names: Known argument names set.
+
+        :return: None.
+        """
+        # Store existing argument name set
+        self._names = frozenset(names)
+
+        # Not have arguments kept
+        self._eq_args = ()
+
+        # Store known argument name set
+        self._known_names = known_names
+
+    def __contains__(self, arg_name):
+        """
+        Test whether given argument name exists.
+
+        :param arg_name: Argument name. Must be one of the known argument \
+            names.
+
+        :return: Whether given argument name exists.
+        """
+        # If the argument name is not one of the known argument names
+        if arg_name not in self._known_names:
+            # Get error message
+            msg = self._UNKNOWN_NAME_MSG.format(repr(arg_name))
+
+            # Raise error
+            raise ValueError(msg)
+
+        # Return whether the argument name exists
+        return arg_name in self._names
+
+
+class _NameTrieArgIndex(_KnownNameArgIndex):
+    """
+    Argument index created by NameTrie, which knows only the trie's \
+        argument names.
+    """
+
+    # Error message of unknown argument name
+    _UNKNOWN_NAME_MSG = 'Argument name {0} is not in the name trie.'
+
+
+class NameTrie(object):
+    """
+    Compressed prefix trie of argument names, for finding all of the names \
+        that exist in an argument list in one pass.
+
+    Each argument is matched from the trie root, following edges by \
+        `startswith` comparison, so the time is linear in the total length \
+        of the arguments. A name exists if an argument is `_ARG_` or starts \
+        with `_ARG_=`, as in `argument_exists`.
+
+    `index(args)` creates ArgIndex object that can be passed to \
+        `ensure_spec` and the spec classes as argument list. Unlike \
+        `ArgIndex(args)`, it records only the trie's argument names, so \
+        its memory depends on the spec, not on the argument list, and \
+        argument names containing `=` need no second scan.
+    """
+
+    def __init__(self, names):
+        """
+        Constructor.
+
+        :param names: Argument names.
+
+        :return: None.
+        """
+        # Store argument names, without duplicates, in the original order
+        self.names = tuple(OrderedDict.fromkeys(names))
+
+        # Store argument name set
+        self._name_set = frozenset(self.names)
+
+        # Uncompressed trie root.
+        #
+        # Each node is a list of argument name ending at the node, or None,
+        # and character to child node mapping.
+        root = [None, {}]
+
+        # For each argument name
+        for name in self.names:
+            # Start from the root
+            node = root
+
+            # For the argument name's each character
+            for char in name:
+                # Get or create the child node
+                node = node[1].setdefault(char, [None, {}])
+
+            # Mark the argument name ending at the node
+            node[0] = name
+
+        # Compressed trie root.
+        #
+        # Each node is a list of argument name ending at the node, or None,
+        # and edge first character to edge label and child node mapping.
+        compressed_root = [root[0], {}]
+
+        # Stack of uncompressed node and its compressed node
+        stack = [(root, compressed_root)]
+
+        # While have node to compress.
+        #
+        # Use explicit stack instead of recursion so that long argument
+        # names not exceed recursion limit.
+        while stack:
+            # Pop a node
+            node, compressed_node = stack.pop()
+
+            # For each child node's first character and the child node
+            for char, child in node[1].items():
+                # Edge label characters
+                label_char_s = [char]
+
+                # While the child node has no argument name ending at it and
+                # has only one child node
+                while child[0] is None and len(child[1]) == 1:
+                    # Get the only child node's character and the node
+                    next_char, child = next(iter(child[1].items()))
+
+                    # Add the character to the edge label
+                    label_char_s.append(next_char)
+
+                # Create compressed child node
+                compressed_child = [child[0], {}]
+
+                # Add edge
+                compressed_node[1][char] = (
+                    ''.join(label_char_s), compressed_child
+                )
+
+                # Push the child node
+                stack.append((child, compressed_child))
+
+        # Store compressed trie root
+        self._root = compressed_root
+
+    @classmethod
+    def from_spec(cls, spec):
+        """
+        Create NameTrie of argument names in given spec tree.
+
+        :param spec: Spec. Must not contain custom BaseSpec instance, whose \
+            argument names are unknown.
+
+        :return: NameTrie object.
+        """
+        # Collect the spec tree's argument names, without recursion
+        arg_name_s = _spec_tree_arg_names(spec)
+
+        # If the spec tree contains custom spec or object that is not a spec
+        if arg_name_s is None:
+            # Compile the spec, which raises error for object that is not a
+            # spec
+            CompiledSpec(spec)
+
+            # Raise error
+            raise ValueError(
+                'Can not collect argument names of spec containing custom'
+                ' spec.'
+            )
+
+        # Return NameTrie object
+        return cls(arg_name_s)
+
+    def find(self, args):
+        """
+        Find argument names that exist in given argument list.
+
+        :param args: Iterable of arguments.
+
+        :return: Set of existing argument names.
+        """
+        # Existing argument name set
+        found_name_s = set()
+
+        # Get trie root
+        root = self._root
+
+        # Get argument name count
+        name_count = len(self.names)
+
+        # For given argument list's each argument
+        for arg in args:
+            # Start from the root
+            node = root
+
+            # Matching position
+            pos = 0
+
+            # Get argument length
+            arg_len = len(arg)
+
+            # While matching
+            while True:
+                # Get argument name ending at the node
+                name = node[0]
+
+                # If have argument name ending at the node, and the argument
+                # ends here or is followed by `=`
+                if name is not None and (pos == arg_len or arg[pos] == '='):
+                    # Add the argument name
+                    found_name_s.add(name)
+
+                # If reached the argument's end
+                if pos == arg_len:
+                    # Stop
+                    break
+
+                # Get edge of the next character
+                edge = node[1].get(arg[pos])
+
+                # If not have the edge, or the edge label not matches
+                if edge is None or not arg.startswith(edge[0], pos):
+                    # Stop
+                    break
+
+                # Move past the edge label
+                pos += len(edge[0])
+
+                # Move to the child node
+                node = edge[1]
+
+            # If all argument names are found
+            if len(found_name_s) == name_count:
+                # Stop
+                break
+
+        # Return existing argument name set
+        return found_name_s
+
+    def index(self, args):
+        """
+        Create ArgIndex object of given argument list, which answers \
+            existence tests of this trie's argument names. Testing other \
+            argument names raises ValueError.
+
+        :param args: Iterable of arguments.
+
+        :return: ArgIndex object.
+        """
+        # Return ArgIndex object
+        return _NameTrieArgIndex(self.find(args), self._name_set)
+
+    def __repr__(self):
+        """
+        Convert to string representation.
+
+        :return: String.
+        """
+        # Return string representation
+        return 'NameTrie({0})'.format(repr(list(self.names)))
+
+
+def _index_response_file_args(
+    args, fromfile_prefix_chars, encoding, max_name_len, known_names
+):
+    """
+    Index given arguments, reading arguments of response files given as \
+        `@path`.
+
+    :param args: Iterable of arguments.
+
+    :param fromfile_prefix_chars: Characters that prefix response file path.
+
+    :param encoding: Response file encoding. None means file system \
+        encoding.
+
+    :param max_name_len: Maximum argument name length, in characters. \
+        Ignored if known argument names are given.
+
+    :param known_names: Known argument names set. If given, only known \
+        argument names are stored. If None, only the part before the first \
+        `=` of each argument is stored.
+
+    :return: ArgIndex object.
+    """
+    # If encoding is not given
+    if encoding is None:
+        # Use file system encoding
+        encoding = sys.getfilesystemencoding()
+
+    # If known argument names are given
+    if known_names is not None:
+        # Use the longest known argument name's length as maximum length
+        max_name_len = max([len(x) for x in known_names] or [0])
+
+        # Whether search argument names in parts before later `=`s too
+        all_prefixes = any('=' in x for x in known_names)
+
+    # If known argument names are not given
+    else:
+        # Search only the part before the first `=`
+        all_prefixes = False
+
+    # Argument name set
+    names = set()
+
+    # For given argument list's each argument
+    for arg in args:
+        # If the argument is a response file path
+        if arg[:1] and arg[:1] in fromfile_prefix_chars:
+            # Add the response file's argument names
+            _add_response_file_names(
+                names, arg[1:], fromfile_prefix_chars, encoding,
+                max_name_len, known_names, all_prefixes,
+            )
+
+        # If the argument is not a response file path
+        else:
+            # Add the argument's argument names
+            _add_arg_names(
+                names, arg, max_name_len, known_names, all_prefixes
+            )
+
+    # If known argument names are not given
+    if known_names is None:
+        # Return ArgIndex object
+        return _NameSetArgIndex(names, max_name_len)
+
+    # Return ArgIndex object
+    return _KnownNameArgIndex(names, known_names)
+
+
+def _add_arg_names(names, arg, max_name_len, known_names, all_prefixes):
+    """
+    Add argument names indexed by given argument to given set.
+
+    The part before the first `=` is an argument name the argument \
+        matches. If `all_prefixes` is true, each part before a later `=`, \
+        and the argument itself, are too, e.g. `-a=b=c` matches `-a`, \
+        `-a=b`, and `-a=b=c`. Names longer than given maximum length, or \
+        not known, are not added.
+
+    :param names: Argument name set.
+
+    :param arg: Argument.
+
+    :param max_name_len: Maximum argument name length.
+
+    :param known_names: Known argument names set, or None.
+
+    :param all_prefixes: Whether add parts before later `=`s too.
+
+    :return: None.
+    """
+    # Get end of the part where argument names are searched
+    limit = min(len(arg), max_name_len + 1)
+
+    # Get position of the first `=`
+    eq_pos = arg.find('=', 0, limit)
+
+    # While have argument name to add
+    while True:
+        # Get the argument name's end, i.e. the `=`, or the argument's end
+        name_end = len(arg) if eq_pos == -1 else eq_pos
+
+        # If the argument name is too long.
+        # Later argument names are longer.
+        if name_end > max_name_len:
+            # Stop
+            break
+
+        # Get the argument name
+        arg_name = arg[:name_end]
+
+        # If argument names are not known, or the argument name is known
+        if known_names is None or arg_name in known_names:
+            # Add the argument name
+            names.add(arg_name)
+
+        # If reached the argument's end, or not search later `=`s
+        if eq_pos == -1 or not all_prefixes:
+            # Stop
+            break
+
+        # Find the next `=`
+        eq_pos = arg.find('=', eq_pos + 1, limit)
+
+
+# Maximum bytes per character of supported response file encodings, e.g.
+# UTF-8
+_MAX_CHAR_BYTES = 4
+
+
+# Line break characters of Python 3's `str.splitlines`, which `argparse` uses
+# to split response files into arguments. `\r\n` is one line break.
+_LINE_BREAK_CHARS = u'\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029'
+
+
+def _line_break_groups(encoding):
+    """
+    Get line breaks of `str.splitlines` as bytes of given encoding, grouped \
+        by their first bytes.
+
+    Line break characters that can not be encoded can not appear in the \
+        decoded text, and are not included.
+
+    :param encoding: Encoding, ASCII-compatible, e.g. UTF-8.
+
+    :return: List of tuples of first byte, and the line breaks starting \
+        with it, longest first so that `\\r\\n` is preferred over `\\r`.
+    """
+    # First byte to line break list mapping
+    group_d = OrderedDict()
+
+    # For each line break
+    for line_break in [u'\r\n'] + list(_LINE_BREAK_CHARS):
+        try:
+            # Encode the line break.
+            # May raise error.
+            break_bytes = line_break.encode(encoding)
+
+        # If the line break can not be encoded
+        except UnicodeError:
+            # Ignore
+            continue
+
+        # Add the encoded line break to its first byte's group
+        group_d.setdefault(break_bytes[:1], []).append(break_bytes)
+
+    # Return groups, with each group's line breaks longest first
+    return [
+        (first_byte, tuple(sorted(break_s, key=len, reverse=True)))
+        for first_byte, break_s in group_d.items()
+    ]
+
+
+def _find_line_break(data, pos, first_byte, break_s):
+    """
+    Find the first of given line breaks sharing given first byte, from \
+        given position.
+
+    The first byte is searched, because `find` is fastest for single \
+        bytes, and the line breaks are compared where it is found.
+
+    :param data: Bytes or memory map.
+
+    :param pos: Start position.
+
+    :param first_byte: The line breaks' first byte.
+
+    :param break_s: The line breaks, longest first.
+
+    :return: Tuple of the line break's position and length. Position is -1 \
+        if not found.
+    """
+    # Find the first byte
+    break_pos = data.find(first_byte, pos)
+
+    # While the first byte is found
+    while break_pos != -1:
+        # For each line break, longest first
+        for line_break in break_s:
+            # If the line break is at the position
+            if data[break_pos:break_pos + len(line_break)] == line_break:
+                # Return the line break's position and length
+                return break_pos, len(line_break)
+
+        # Find the first byte after the position
+        break_pos = data.find(first_byte, break_pos + 1)
+
+    # Return not found
+    return -1, 0
+
+
+def _add_response_file_names(
+    names, path, fromfile_prefix_chars, encoding, max_name_len, known_names,
+    all_prefixes,
+):
+    """
+    Add argument names indexed by given response file's arguments to given \
+        set. Nested response files are read too.
+
+    Each line of the file is an argument, as in `argparse`, with lines \
+        split at the line breaks of Python 3's `str.splitlines`. The file \
+        is mapped into memory and scanned, and only argument name parts of \
+        at most given maximum length are copied, so memory use does not \
+        depend on the size of argument values. Argument names are added as \
+        `_add_arg_names` adds them.
+
+    :param names: Argument name set.
+
+    :param path: Response file path.
+
+    :param fromfile_prefix_chars: Characters that prefix response file path.
+
+    :param encoding: Response file encoding, ASCII-compatible, e.g. UTF-8.
+
+    :param max_name_len: Maximum argument name length, in characters.
+
+    :param known_names: Known argument names set, or None.
+
+    :param all_prefixes: Whether add parts before later `=`s too.
+
+    :return: None.
+    """
+    # Get maximum argument name length in bytes
+    max_name_bytes = max_name_len * _MAX_CHAR_BYTES
+
+    # Get encoded line breaks grouped by their first bytes
+    break_group_s = _line_break_groups(encoding)
+
+    # Get prefix characters as bytes
+    prefix_bytes = fromfile_prefix_chars.encode(encoding)
+
+    # Stack of opened file, memory map, scanning position, real path, and
+    # list of each line break group's next position and line break length
+    # in the file
+    stack = []
+
+    # Real paths of the files in the stack
+    real_path_s = set()
+
+    try:
+        # Path of the file to open
+        open_path = path
+
+        # While have file to open or to scan
+        while open_path is not None or stack:
+            # If have file to open
+            if open_path is not None:
+                # Get real path
+                real_path = os.path.realpath(open_path)
+
+                # If the file is already being read
+                if real_path in real_path_s:
+                    # Get error message
+                    msg = 'Response file {0} includes itself.'.format(
+                        repr(open_path)
+                    )
+
+                    # Raise error
+                    raise ValueError(msg)
+
+                # Open the file
+                file_obj = open(open_path, 'rb')
+
+                # Push the file, before mapping it so that it is closed if
+                # mapping raises error. Use empty bytes until mapped.
+                #
+                # Each line break group's next position is unknown, which is
+                # indicated by position before the scanning position.
+                item = [
+                    file_obj, b'', 0, real_path,
+                    [[first_byte, break_s, -1, 0]
+                     for first_byte, break_s in break_group_s],
+                ]
+
+                stack.append(item)
+
+                # Add the real path
+                real_path_s.add(real_path)
+
+                # If the file is not empty.
+                #
+                # Empty file can not be mapped.
+                if os.fstat(file_obj.fileno()).st_size:
+                    # Map the file
+                    item[1] = mmap.mmap(
+                        file_obj.fileno(), 0, access=mmap.ACCESS_READ
+                    )
+
+                # Clear the path to open
+                open_path = None
+
+            # Get the top file
+            item = stack[-1]
+
+            # Get the memory map and scanning position
+            mm = item[1]
+
+            pos = item[2]
+
+            # Get file size
+            size = len(mm)
+
+            # If reached the end of the file
+            if pos >= size:
+                # Pop the file
+                stack.pop()
+
+                # Remove the real path
+                real_path_s.discard(item[3])
+
+                # If the memory map is not empty bytes
+                if size:
+                    # Close the memory map
+                    mm.close()
+
+                # Close the file
+                item[0].close()
+
+                # Continue to the next file
+                continue
+
+            # Line end, and the next line's position. The file end if the
+            # line is the last line without line break.
+            line_end = size
+
+            next_pos = size
+
+            # Get the file's line break group list
+            break_item_s = item[4]
+
+            # Line break group index
+            break_index = 0
+
+            # For each line break group.
+            #
+            # Each group is searched only after the scanning position passes
+            # its last found position, so the file is scanned once per
+            # group, instead of once per line for each group.
+            while break_index < len(break_item_s):
+                # Get the line break group
+                break_item = break_item_s[break_index]
+
+                # Get the group's next position
+                break_pos = break_item[2]
+
+                # If the next position is before the scanning position
+                if break_pos < pos:
+                    # Find the group's next line break
+                    break_pos, break_item[3] = _find_line_break(
+                        mm, pos, break_item[0], break_item[1]
+                    )
+
+                    # If the group's line breaks are not found
+                    if break_pos == -1:
+                        # Not search the group again
+                        del break_item_s[break_index]
+
+                        # Continue to the next group
+                        continue
+
+                    # Store the group's next position
+                    break_item[2] = break_pos
+
+                # If the line break is the first line break found so far
+                if break_pos < line_end:
+                    # Use the line break's start as the line end
+                    line_end = break_pos
+
+                    # Use the line break's end as the next line's position
+                    next_pos = break_pos + break_item[3]
+
+                # Go to the next line break group
+                break_index += 1
+
+            # Store the next line's position
+            item[2] = next_pos
+
+            # If the line is a nested response file path
+            if mm[pos:pos + 1] and mm[pos:pos + 1] in prefix_bytes:
+                # Open the nested response file next
+                open_path = mm[pos + 1:line_end].decode(encoding)
+
+                # Continue
+                continue
+
+            # Get end of the part where argument names are searched
+            limit = min(line_end, pos + max_name_bytes + 1)
+
+            # Get position of the first `=`
+            eq_pos = mm.find(b'=', pos, limit)
+
+            # While have argument name to add
+            while True:
+                # Get the argument name's end, i.e. the `=`, or the line end
+                name_end = line_end if eq_pos == -1 else eq_pos
+
+                # If the argument name is too long in bytes.
+                # Later argument names are longer.
+                if name_end - pos > max_name_bytes:
+                    # Stop
+                    break
+
+                # Get the argument name
+                arg_name = mm[pos:name_end].decode(encoding)
+
+                # If the argument name is not too long in characters, and
+                # argument names are not known or the argument name is known
+                if len(arg_name) <= max_name_len and (
+                    known_names is None or arg_name in known_names
+                ):
+                    # Add the argument name
+                    names.add(arg_name)
+
+                # If reached the line end, or not search later `=`s
+                if eq_pos == -1 or not all_prefixes:
+                    # Stop
+                    break
+
+                # Find the next `=`
+                eq_pos = mm.find(b'=', eq_pos + 1, limit)
+
+    # Close the files left open by error
+    finally:
+        # For each file in the stack
+        for file_obj, mm, _, _, _ in stack:
+            # If the memory map is not empty bytes
+            if len(mm):
+                # Close the memory map
+                mm.close()
+
+            # Close the file
+            file_obj.close()
+
+
+class _NameSetArgIndex(ArgIndex):
+    """
+    Argument index created by `ArgIndex.from_args`, which stores only the \
+        part before the first `=` of each argument, of at most a maximum \
+        length.
+    """
+
+    def __init__(self, names, max_name_len):
+        """
+        Constructor.
+
+        :param names: Argument name set.
+
+        :param max_name_len: Maximum argument name length.
+
+        :return: None.
+        """
+        # Store argument name set
+        self._names = frozenset(names)
+
+        # Not have arguments kept
+        self._eq_args = ()
+
+        # Store maximum argument name length
+        self._max_name_len = max_name_len
+
+    def __contains__(self, arg_name):
+        """
+        Test whether given argument name exists.
+
+        :param arg_name: Argument name. Must not be longer than the maximum \
+            argument name length, and must not contain `=`.
+
+        :return: Whether given argument name exists.
+        """
+        # If the argument name contains `=`
+        if '=' in arg_name:
+            # Get error message
+            msg = 'Expected argument name without `=`. Got {0}.'.format(
+                repr(arg_name)
+            )
+
+            # Raise error
+            raise ValueError(msg)
+
+        # If the argument name is too long
+        if len(arg_name) > self._max_name_len:
+            # Get error message
+            msg = (
+                'Expected argument name of length <={0}. Got length {1}.'
+            ).format(self._max_name_len, len(arg_name))
+
+            # Raise error
+            raise ValueError(msg)
+
+        # Return whether the argument name exists
+        return arg_name in self._names
+
+
+def _index_known_names(args, known_names):
+    """
+    Index which of given known argument names exist in given arguments.
+
+    The arguments are iterated once, and only known argument names are \
+        stored, so memory use depends on the number of known argument \
+        names, not on the number or size of the arguments.
+
+    :param args: Iterable of arguments.
+
+    :param known_names: Known argument names set.
+
+    :return: ArgIndex object that knows only given argument names.
+    """
+    # Existing argument name set
+    names = set()
+
+    # Whether any known argument name contains `=`
+    has_eq_names = any('=' in x for x in known_names)
+
+    # For given arguments' each argument
+    for arg in args:
+        # Find the first `=`
+        eq_pos = arg.find('=')
+
+        # Get the argument's name, i.e. the part before the first `=`
+        arg_name = arg if eq_pos == -1 else arg[:eq_pos]
+
+        # If the argument name is known
+        if arg_name in known_names:
+            # Add the argument name
+            names.add(arg_name)
+
+        # If any known argument name contains `=`
+        if has_eq_names:
+            # While have `=`.
+            #
+            # The argument also matches each part before a later `=`, and
+            # the whole argument, e.g. `-a=b=c` matches `-a=b` and `-a=b=c`.
+            while eq_pos != -1:
+                # Find the next `=`
+                eq_pos = arg.find('=', eq_pos + 1)
+
+                # Get the part before the `=`, or the whole argument
+                arg_name = arg if eq_pos == -1 else arg[:eq_pos]
+
+                # If the argument name is known
+                if arg_name in known_names:
+                    # Add the argument name
+                    names.add(arg_name)
+
+    # Return ArgIndex object
+    return _KnownNameArgIndex(names, known_names)
+
+
+def argument_exists(arg_name, args):
+    """
+    Test whether given argument name exists in given argument list.
+
+    :param arg_name: Argument name.
+
+    :param args: Iterable of arguments, or ArgIndex object.
+
+    :return: Whether given argument name exists in given argument list.
+    """
+    # If given argument list is ArgIndex object
+    if isinstance(args, ArgIndex):
+        # Return whether the argument name is indexed
+        return arg_name in args
+
+    # Get the argument name followed by `=`.
+    #
+    # The argument name is compared literally, so regular expression
+    # metacharacters in it have no special meaning, and each argument is
+    # compared in time linear in the argument name's length.
+    prefix = arg_name + '='
+
+    # For given argument list's each argument
+    for arg in args:
+        # If the argument is `_ARG_`, or starts with `_ARG_=`
+        if arg == arg_name or arg.startswith(prefix):
+            # Return True
+            return True
+
+    # If none of the arguments matches
+    else:
+        # Return False
+        return False
+
+
+def ensure_argument_name(arg_name, args, depending=None):
+    """
+    Ensure given argument name exists in given argument list. Raise \
+        SpecViolationError if violated.
+
+    :param arg_name: Argument name.
+
+    :param args: Iterable of arguments, or ArgIndex object.
+
+    :param depending: Depending argument name.
+
+    :return: None.
+    """
+    # If given argument name not exists in given argument list
+    if not argument_exists(arg_name, args):
+        # Raise error
+        raise SpecViolation(
+            SpecViolation.ARGUMENT, arg_name, depending
+        ).to_error()
+
+
+def ensure_spec(
+    spec, args, depending=None, engine=None, fromfile_prefix_chars=None
+):
+    """
+    Ensure given spec. Raise SpecViolationError if violated.
+
+    :param spec: Spec.
+
+    Can be:
+        - String
+        - Argument spec
+        - Option spec
+        - OneOf spec
+        - AllOf spec
+
+    :param args: Iterable of arguments, or ArgIndex object.
+
+    The arguments are iterated once, so they can come from a generator, \
+        e.g. one reading `/proc/<pid>/cmdline`. Unless the spec contains \
+        custom spec, only the spec's argument names are stored, so memory \
+        use does not grow with the arguments.
+
+    :param depending: Depending argument name.
+
+    :param engine: Evaluation engine.
+
+    Can be:
+        - None or 'walk': Walk the spec tree.
+        - 'bitmask': Use the spec's cached CompiledSpec object, which maps \
+            the argument list to a bitmask and evaluates the spec with \
+            integer operations. The spec must not be modified afterwards.
+
+    Both engines raise the same errors.
+
+    :param fromfile_prefix_chars: Characters that prefix response file \
+        path, e.g. '@', like `argparse`'s `fromfile_prefix_chars`. If given, \
+        arguments of response files are read, and only the spec's argument \
+        names are stored. If the spec contains custom spec, argument names \
+        are stored as `ArgIndex.from_args` stores them.
+
+    :return: None.
+    """
+    # If response file prefix characters are given, and given spec is not
+    # None, and given argument list is not ArgIndex object
+    if fromfile_prefix_chars and spec is not None and args is not None and \
+            not isinstance(args, ArgIndex):
+        # Get the spec tree's argument names
+        arg_name_s = _spec_tree_arg_names(spec)
+
+        # Index the argument list, reading response files, and storing only
+        # the spec tree's argument names if they are known
+        args = _index_response_file_args(
+            args, fromfile_prefix_chars, None, 1024,
+            None if arg_name_s is None else frozenset(arg_name_s),
+        )
+
+    # If given engine is bitmask engine
+    if engine == 'bitmask':
+        # Ensure the spec using compiled spec
+        _get_compiled_spec(spec, depending)(args)
+
+        # Return
+        return
+
+    # If given engine is not walk engine
+    elif engine is not None and engine != 'walk':
+        # Get error message
+        msg = "Expected engine 'walk' or 'bitmask'. Got {0}.".format(
+            repr(engine)
+        )
+
+        # Raise error
+        raise ValueError(msg)
+
+    # If given spec is None
+    if spec is None:
+        # Return
+        return
+
+    # If given argument list is None
+    if args is None:
+        # Get error message
+        msg = 'Expected argument list. Got None.'
+
+        # Raise error
+        raise TypeError(msg)
+
+    # If given spec is string
+    if isinstance(spec, str):
+        # Ensure the argument name in one pass over the argument list,
+        # without indexing it
+        ensure_argument_name(spec, args, depending=depending)
+
+    # If given spec is Argument spec without sub spec
+    elif type(spec) is Argument and spec.sub_spec is None:
+        # Ensure the argument name in one pass over the argument list,
+        # without indexing it
+        ensure_argument_name(spec.arg_name, args, depending=depending)
+
+    # If given spec is BaseSpec instance
+    elif isinstance(spec, BaseSpec):
+        # Ensure the spec
+        _walk_spec(spec, args, depending)
+
+    # If given spec is none of above
+    else:
+        # Raise error
+        raise _spec_type_error(spec)
+
+
+def _argument_error_msg(arg_name, depending):
+    """
+    Get error message for missing argument name.
+
+    :param arg_name: Argument name.
+
+    :param depending: Depending argument name.
+
+    :return: Error message.
+    """
+    # If depending argument name is given
+    if depending:
+        # Return error message
+        return 'Argument {0} requires argument {1}.'.format(
+            repr(depending), repr(arg_name)
+        )
+
+    # If depending argument name is not given
+    else:
+        # Return error message
+        return 'Require argument {0}.'.format(repr(arg_name))
+
+
+def _one_of_error_msg(arg_name_s, depending, found_arg_name_s):
+    """
+    Get error message for violated OneOf spec.
+
+    :param arg_name_s: OneOf spec's argument names.
+
+    :param depending: Depending argument name.
+
+    :param found_arg_name_s: Found argument names. Either empty, or the \
+        first two found.
+
+    :return: Error message.
+    """
+    # If have found argument names
+    if found_arg_name_s:
+        # Get the found part
+        found_part = '{0} and {1}'.format(
+            repr(found_arg_name_s[0]), repr(found_arg_name_s[1])
+        )
+
+    # If not have found argument names
+    else:
+        # Get the found part
+        found_part = 'none'
+
+    # If depending argument name is given
+    if depending:
+        # Return error message
+        return (
+            'Argument {0} requires exact one of arguments {1}. Got {2}.'
+        ).format(repr(depending), repr(arg_name_s), found_part)
+
+    # If depending argument name is not given
+    else:
+        # Return error message
+        return (
+            'Require exact one of arguments {0}. Got {1}.'
+        ).format(repr(arg_name_s), found_part)
+
+
+def _all_of_error_msg(arg_name_s, depending):
+    """
+    Get error message for violated AllOf spec.
+
+    :param arg_name_s: AllOf spec's argument names.
+
+    :param depending: Depending argument name.
+
+    :return: Error message.
+    """
+    # If depending argument name is given
+    if depending:
+        # Return error message
+        return 'Argument {0} requires all of arguments {1}.'.format(
+            repr(depending), repr(arg_name_s)
+        )
+
+    # If depending argument name is not given
+    else:
+        # Return error message
+        return 'Require all of arguments {0}.'.format(repr(arg_name_s))
+
+
+def _spec_type_error(spec):
+    """
+    Create TypeError for given unsupported spec.
+
+    :param spec: Spec.
+
+    :return: TypeError.
+    """
+    # Get error message
+    msg = (
+        'Expected string, Argument, Option, OneOf, or AllOf.'
+        ' Got {0}.'
+    ).format(repr(spec))
+
+    # Return error
+    return TypeError(msg)
+
+
+def _spec_arg_names(spec):
+    """
+    Get argument names of given AllOf spec's sub specs.
+
+    :param spec: AllOf spec.
+
+    :return: Argument name list.
+    """
+    # Argument name list
+    arg_name_s = []
+
+    # For the spec's each sub spec
+    for sub_spec in spec:
+        # If the sub spec is string
+        if isinstance(sub_spec, str):
+            # Use the string as argument name
+            arg_name = sub_spec
+
+        # If the sub spec is Argument spec
+        elif isinstance(sub_spec, Argument):
+            # Get the Argument spec's argument name
+            arg_name = sub_spec.arg_name
+
+        # If the sub spec is not string or Argument spec
+        else:
+            # Get error message
+            msg = 'Expected string or Argument object. Got {0}.'.format(
+                repr(sub_spec)
+            )
+
+            # Raise error
+            raise TypeError(msg)
+
+        # Add the argument name to the argument name list
+        arg_name_s.append(arg_name)
+
+    # Return the argument name list
+    return arg_name_s
+
+
+def _spec_tree_arg_names(spec, spec_type=None):
+    """
+    Get argument names in given spec tree.
+
+    :param spec: String or BaseSpec instance.
+
+    :param spec_type: Type to treat given spec as. Default is its own type.
+
+    :return: Argument name list, in the order `CompiledSpec` assigns \
+        their bits. May contain duplicates. None if the spec tree contains \
+        custom BaseSpec instance, which may test any argument name, or \
+        object that is not a spec.
+    """
+    # Argument name list
+    arg_name_s = []
+
+    # Stack of spec and type to treat it as
+    stack = [(spec, spec_type)]
+
+    # While have spec
+    while stack:
+        # Pop a spec
+        spec, spec_type = stack.pop()
+
+        # Get the type to treat the spec as
+        spec_type = spec_type or type(spec)
+
+        # If the spec is string
+        if isinstance(spec, str):
+            # Add the string as argument name
+            arg_name_s.append(spec)
+
+        # If the spec is Argument spec or Option spec
+        elif spec_type is Argument or spec_type is Option:
+            # Add the spec's argument name
+            arg_name_s.append(spec.arg_name)
+
+            # If have sub spec
+            if spec.sub_spec is not None:
+                # Add the sub spec's argument names
+                stack.append((spec.sub_spec, None))
+
+        # If the spec is OneOf spec or AllOf spec
+        elif spec_type is OneOf or spec_type is AllOf:
+            # If the spec is OneOf spec
+            if spec_type is OneOf:
+                # Add the sub specs' argument names first, as `CompiledSpec`
+                # does
+                arg_name_s.extend(spec._arg_names)
+
+            # Add the sub specs' argument names, in reverse order so that
+            # they are added in spec order
+            stack.extend(
+                (sub_spec, None) for sub_spec in reversed(spec._sub_specs)
+            )
+
+        # If the spec is none of above
+        else:
+            # Return None
+            return None
+
+    # Return the argument name set
+    return arg_name_s
+
+
+def _find_rewriting_all_of(arg_name, all_of_info):
+    """
+    Find the enclosing AllOf spec that reports a missing argument name as \
+        its own violation.
+
+    An AllOf spec whose string sub spec is missing reports itself as \
+        violated, and enclosing AllOf specs keep the report as is. Otherwise \
+        the missing argument name is reported.
+
+    :param arg_name: Missing argument name.
+
+    :param all_of_info: Enclosing AllOf specs info, innermost first. Each \
+        item is a tuple of the AllOf spec, its depending argument name, and \
+        the next item.
+
+    :return: The rewriting AllOf spec's info item, or None.
+    """
+    # While have enclosing AllOf spec
+    while all_of_info is not None:
+        # For the AllOf spec's each sub spec
+        for sub_spec in all_of_info[0]:
+            # If the sub spec is the missing argument name
+            if isinstance(sub_spec, str) and sub_spec == arg_name:
+                # Return the AllOf spec's info item
+                return all_of_info
+
+        # Go to next enclosing AllOf spec
+        all_of_info = all_of_info[2]
+
+    # Return None
+    return None
+
+
+def _reiterable_args(args):
+    """
+    Get given argument list in a form that can be iterated again, for \
+        custom specs, which receive the caller's argument list.
+
+    :param args: Iterable of arguments, or ArgIndex object.
+
+    :return: Given argument list if it is sequence or ArgIndex object, \
+        otherwise list of its arguments.
+    """
+    # If given argument list is list, tuple, ArgIndex object, or other
+    # sequence
+    if isinstance(args, (list, tuple, ArgIndex)) or \
+            isinstance(args, Sequence):
+        # Return given argument list
+        return args
+
+    # Collect the arguments into a list
+    return list(args)
+
+
+def _ensure_custom_spec(spec, args, depending, all_of_info):
+    """
+    Ensure given custom BaseSpec instance. Raise SpecViolationError if \
+        violated.
+
+    :param spec: Custom BaseSpec instance.
+
+    :param args: Argument list given by the caller, or ArgIndex object.
+
+    :param depending: Depending argument name.
+
+    :param all_of_info: Enclosing AllOf specs info.
+
+    :return: None.
+    """
+    try:
+        # Ensure the spec
+        spec.ensure_spec(args=args, depending=depending)
+
+    # If have error
+    except SpecViolationError as exc:
+        # Get violated spec
+        violated_spec = exc.args[1] if len(exc.args) > 1 else None
+
+        # If the violated spec is an argument name
+        if isinstance(violated_spec, str):
+            # Find the rewriting AllOf spec's info item
+            violated_info = _find_rewriting_all_of(violated_spec, all_of_info)
+
+            # If enclosing AllOf spec rewrites the violation
+            if violated_info is not None:
+                # Raise error
+                raise SpecViolation(
+                    SpecViolation.ALL_OF, violated_info[0], violated_info[1]
+                ).to_error()
+
+        # Raise original error
+        raise
+
+
+def _iter_walk_violations(
+    spec, args, depending, spec_type=None, catch_custom=False
+):
+    """
+    Walk given spec tree with an explicit stack instead of recursion, so \
+        that deeply nested specs cost no Python stack frames. Generate \
+        violations as they are found.
+
+    After a violation, the violated spec's sub specs are skipped, and the \
+        walk goes on with the remaining specs. An AllOf spec reporting \
+        several missing string sub specs generates one violation.
+
+    :param spec: String or BaseSpec instance.
+
+    :param args: Iterable of arguments, or ArgIndex object.
+
+    :param depending: Depending argument name.
+
+    :param spec_type: Type to ensure given spec as. Default is its own type.
+
+    :param catch_custom: Whether catch SpecViolationError raised by custom \
+        BaseSpec instances and generate it as violation. If false, the \
+        error propagates.
+
+    :return: Generator of SpecViolation objects.
+    """
+    # Argument list given to custom specs, which receive the caller's
+    # argument list
+    custom_args = args
+
+    # If given argument list is list, tuple, or other sequence
+    if isinstance(args, (list, tuple)) or (
+        not isinstance(args, ArgIndex) and isinstance(args, Sequence)
+    ):
+        # Tokenize the argument list once so that each existence test of the
+        # spec tree is a set lookup
+        args = ArgIndex(args)
+
+    # If given argument list is other iterable, e.g. a generator
+    elif not isinstance(args, ArgIndex):
+        # Get the spec tree's argument names
+        arg_name_s = _spec_tree_arg_names(spec, spec_type)
+
+        # If the spec tree contains custom spec, which may test any
+        # argument name, and may iterate the argument list
+        if arg_name_s is None:
+            # Collect the arguments into a list for the custom specs
+            custom_args = list(args)
+
+            # Tokenize the arguments once
+            args = ArgIndex(custom_args)
+
+        # If the spec tree's argument names are known
+        else:
+            # Iterate the arguments once, storing only the spec tree's
+            # argument names, so that memory use does not grow with the
+            # arguments
+            args = _index_known_names(args, frozenset(arg_name_s))
+
+    # Stack of spec, depending argument name, and enclosing AllOf specs info
+    stack = [(spec, depending, None)]
+
+    # Type to ensure given spec as
+    root_spec_type = spec_type
+
+    # IDs of AllOf specs info that have generated violation
+    violated_all_of_id_s = set()
+
+    # While have spec to ensure
+    while stack:
+        # Pop a spec to ensure
+        spec, depending, all_of_info = stack.pop()
+
+        # Get the type to ensure the spec as.
+        #
+        # Subclasses are dispatched to their `ensure_spec` method below, in
+        # case they override it.
+        spec_type = root_spec_type or type(spec)
+
+        # Clear given type, which is for given spec only
+        root_spec_type = None
+
+        # If the spec is string or Argument spec
+        if spec_type is Argument or isinstance(spec, str):
+            # Get argument name
+            arg_name = spec.arg_name if spec_type is Argument else spec
+
+            # If the argument name not exists
+            if arg_name not in args:
+                # Find the rewriting AllOf spec's info item
+                violated_info = _find_rewriting_all_of(arg_name, all_of_info)
+
+                # If the violation is not rewritten by enclosing AllOf spec
+                if violated_info is None:
+                    # Generate violation
+                    yield SpecViolation(
+                        SpecViolation.ARGUMENT, arg_name, depending
+                    )
+
+                # If the enclosing AllOf spec has not generated violation
+                elif id(violated_info) not in violated_all_of_id_s:
+                    # Mark the AllOf spec has generated violation
+                    violated_all_of_id_s.add(id(violated_info))
+
+                    # Generate violation
+                    yield SpecViolation(
+                        SpecViolation.ALL_OF,
+                        violated_info[0],
+                        violated_info[1],
+                    )
+
+            # If the spec is Argument spec with sub spec
+            elif spec_type is Argument and spec.sub_spec is not None:
+                # Ensure the sub spec, depending on the argument name
+                stack.append((spec.sub_spec, arg_name, all_of_info))
+
+        # If the spec is Option spec
+        elif spec_type is Option:
+            # If have sub spec and the argument name exists
+            if spec.sub_spec is not None and spec.arg_name in args:
+                # Ensure the sub spec, depending on the argument name
+                stack.append((spec.sub_spec, spec.arg_name, all_of_info))
+
+        # If the spec is OneOf spec
+        elif spec_type is OneOf:
+            # Get argument names resolved at construction
+            arg_name_s = spec._arg_names
+
+            # If no argument name contains `=`, and the ArgIndex object is
+            # not a subclass instance, whose existence tests may check the
+            # argument name
+            if not spec._has_eq_names and type(args) is ArgIndex:
+                # Use the ArgIndex object's name set for existence tests
+                present = args._names
+
+            # If any argument name contains `=`, or the ArgIndex object is a
+            # subclass instance
+            else:
+                # Use the ArgIndex object for existence tests
+                present = args
+
+            # Found argument's index
+            found_index = -1
+
+            # Second found argument's index
+            second_found_index = -1
+
+            # For the OneOf spec's each argument name, in one pass that stops
+            # at the second found argument
+            for index, arg_name in enumerate(arg_name_s):
+                # If the argument name exists
+                if arg_name in present:
+                    # If have not found argument before
+                    if found_index == -1:
+                        # Store the found argument's index
+                        found_index = index
+
+                    # If have found argument before.
+                    # This means the OneOf spec is violated.
+                    else:
+                        # Store the second found argument's index
+                        second_found_index = index
+
+                        # Stop
+                        break
+
+            # If given OneOf spec has no sub specs
+            if not arg_name_s:
+                # Nothing to ensure
+                pass
+
+            # If have not found argument name.
+            # This means the OneOf spec is violated.
+            elif found_index == -1:
+                # Generate violation
+                yield SpecViolation(SpecViolation.ONE_OF, spec, depending)
+
+            # If have found two argument names.
+            # This means the OneOf spec is violated.
+            elif second_found_index != -1:
+                # Generate violation
+                yield SpecViolation(
+                    SpecViolation.ONE_OF,
+                    spec,
+                    depending,
+                    found_arg_names=(
+                        arg_name_s[found_index],
+                        arg_name_s[second_found_index],
+                    ),
+                )
+
+            # If have found exact one argument name
+            else:
+                # Ensure the found argument's spec
+                stack.append(
+                    (spec._sub_specs[found_index], depending, all_of_info)
+                )
+
+        # If the spec is AllOf spec
+        elif spec_type is AllOf:
+            # Ensure the sub specs are string or Argument spec.
+            # May raise error.
+            _spec_arg_names(spec)
+
+            # Get the AllOf spec's info for the sub specs
+            sub_all_of_info = (spec, depending, all_of_info)
+
+            # For the AllOf spec's each sub spec, in reverse order so that
+            # they are popped in order
+            for sub_spec in reversed(spec._sub_specs):
+                # Ensure the sub spec
+                stack.append((sub_spec, depending, sub_all_of_info))
+
+        # If the spec is other BaseSpec instance
+        elif isinstance(spec, BaseSpec):
+            # If not catch custom spec's error
+            if not catch_custom:
+                # Ensure the spec.
+                # May raise error.
+                _ensure_custom_spec(spec, custom_args, depending, all_of_info)
+
+                # Go to next spec
+                continue
+
+            try:
+                # Ensure the spec
+                _ensure_custom_spec(spec, custom_args, depending, all_of_info)
+
+            # If have error
+            except SpecViolationError as exc:
+                # Generate violation
+                yield SpecViolation(
+                    SpecViolation.CUSTOM,
+                    exc.args[1] if len(exc.args) > 1 else spec,
+                    depending,
+                    msg=exc.args[0] if exc.args else '',
+                )
+
+        # If the spec is none of above
+        else:
+            # Raise error
+            raise _spec_type_error(spec)
+
+
+def _walk_spec(spec, args, depending, spec_type=None):
+    """
+    Ensure given spec by walking the spec tree. Raise SpecViolationError if \
+        violated.
+
+    :param spec: String or BaseSpec instance.
+
+    :param args: Iterable of arguments, or ArgIndex object.
+
+    :param depending: Depending argument name.
+
+    :param spec_type: Type to ensure given spec as. Default is its own type.
+
+    :return: None.
+    """
+    # For the first violation
+    for violation in _iter_walk_violations(
+        spec, args, depending, spec_type=spec_type
+    ):
+        # Raise error
+        raise violation.to_error()
+
+
+def iter_violations(spec, args, depending=None, limit=None):
+    """
+    Get iterator of given spec's violations, generated lazily as the spec \
+        tree is walked.
+
+    The walk stops when the caller stops iterating, or after `limit` \
+        violations, so getting the first few violations of a large spec does \
+        not pay for the whole walk. Violations are found the same way \
+        `ensure_spec` finds its first one.
+
+    A violated spec's sub specs are skipped, and the walk goes on with the \
+        remaining specs.
+
+    :param spec: Spec. Same as `ensure_spec`'s `spec` argument.
+
+    :param args: Iterable of arguments, or ArgIndex object.
+
+    :param depending: Depending argument name.
+
+    :param limit: Maximum violation count. None means no limit.
+
+    :return: Iterator of SpecViolation objects.
+    """
+    # If given spec is None
+    if spec is None:
+        # Return empty iterator
+        return iter(())
+
+    # If given argument list is None
+    if args is None:
+        # Get error message
+        msg = 'Expected argument list. Got None.'
+
+        # Raise error
+        raise TypeError(msg)
+
+    # If given spec is not string or BaseSpec instance
+    if not isinstance(spec, (str, BaseSpec)):
+        # Raise error
+        raise _spec_type_error(spec)
+
+    # Get violation generator
+    violation_iter = _iter_walk_violations(
+        spec, args, depending, catch_custom=True
+    )
+
+    # If have limit
+    if limit is not None:
+        # Stop after the limit
+        violation_iter = islice(violation_iter, limit)
+
+    # Return the violation iterator
+    return violation_iter
+
+
+def check_spec(spec, args, depending=None):
+    """
+    Check given spec and get all violations, instead of raising \
+        SpecViolationError on the first one.
+
+    The spec tree is walked once. A violated spec's sub specs are skipped, \
+        and the walk goes on with the remaining specs.
+
+    :param spec: Spec. Same as `ensure_spec`'s `spec` argument.
+
+    :param args: Iterable of arguments, or ArgIndex object.
+
+    :param depending: Depending argument name.
+
+    :return: List of SpecViolation objects, in the order `ensure_spec` \
+        would find them. Empty if the spec is not violated.
+    """
+    # Return all violations
+    return list(iter_violations(spec, args, depending=depending))
+
+
+def validate(spec, args, depending=None):
+    """
+    Validate given spec without raising SpecViolationError.
+
+    Shares the evaluation with `ensure_spec`, but returns a SpecViolation \
+        record instead of raising, and the record's error message is not \
+        formatted unless accessed. This suits paths where most validations \
+        fail and the failures are only counted or discarded.
+
+    :param spec: Spec. Same as `ensure_spec`'s `spec` argument.
+
+    :param args: Iterable of arguments, or ArgIndex object.
+
+    :param depending: Depending argument name.
+
+    :return: None if the spec is not violated, otherwise SpecViolation \
+        object of the first violation `ensure_spec` would raise.
+    """
+    # For the first violation
+    for violation in iter_violations(spec, args, depending=depending):
+        # Return the violation
+        return violation
+
+    # Return None
+    return None
+
+
+# Cache statistics
+_CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+# Marker object for cache miss
+_MISSING = object()
+
+
+class _LruCache(object):
+    """
+    Bounded cache that evicts the least recently used item, with hit and \
+        miss counters.
+    """
+
+    def __init__(self, maxsize):
+        """
+        Constructor.
+
+        :param maxsize: Maximum item count. Must be >0.
+
+        :return: None.
+        """
+        # If given maximum item count is not >0
+        if maxsize <= 0:
+            # Get error message
+            msg = 'Expected cache size >0. Got {0}.'.format(repr(maxsize))
+
+            # Raise error
+            raise ValueError(msg)
+
+        # Store maximum item count
+        self._maxsize = maxsize
+
+        # Key to value mapping, ordered from least to most recently used
+        self._item_d = OrderedDict()
+
+        # Lock
+        self._lock = Lock()
+
+        # Hit count
+        self._hits = 0
+
+        # Miss count
+        self._misses = 0
+
+    def get(self, key, default=_MISSING):
+        """
+        Get given key's value, and mark the key most recently used.
+
+        :param key: Key.
+
+        :param default: Value returned if the key is not cached.
+
+        :return: Value.
+        """
+        # Get item dict
+        item_d = self._item_d
+
+        # With lock
+        with self._lock:
+            # Pop the key's value
+            value = item_d.pop(key, _MISSING)
+
+            # If the key is not cached
+            if value is _MISSING:
+                # Increment miss count
+                self._misses += 1
+
+                # Return default value
+                return default
+
+            # Re-add the key as the most recently used
+            item_d[key] = value
+
+            # Increment hit count
+            self._hits += 1
+
+            # Return the value
+            return value
+
+    def set(self, key, value):
+        """
+        Set given key's value. Evict the least recently used key if full.
+
+        :param key: Key.
+
+        :param value: Value.
+
+        :return: None.
+        """
+        # Get item dict
+        item_d = self._item_d
+
+        # With lock
+        with self._lock:
+            # Remove the key's old value
+            item_d.pop(key, None)
+
+            # If the cache is full
+            if len(item_d) >= self._maxsize:
+                # Evict the least recently used key
+                item_d.popitem(last=False)
+
+            # Add the key as the most recently used
+            item_d[key] = value
+
+    def info(self):
+        """
+        Get cache statistics.
+
+        :return: CacheInfo namedtuple of hits, misses, maxsize, currsize.
+        """
+        # With lock
+        with self._lock:
+            # Return cache statistics
+            return _CacheInfo(
+                self._hits, self._misses, self._maxsize, len(self._item_d)
+            )
+
+    def clear(self):
+        """
+        Clear cached items and statistics.
+
+        :return: None.
+        """
+        # With lock
+        with self._lock:
+            # Clear cached items
+            self._item_d.clear()
+
+            # Reset hit count
+            self._hits = 0
+
+            # Reset miss count
+            self._misses = 0
+
+
+# Compiled spec instruction that requires argument names exist.
+#
+# Operands: bits of the argument names, requirement entries in spec order.
+# Each entry is a tuple of bit and violation record.
+_OP_REQUIRE = 0
+
+# Compiled spec instruction that jumps over an Option spec's sub spec if the
+# Option spec's argument name not exists.
+#
+# Operands: bit of the argument name, jump target.
+_OP_SKIP_IF_ABSENT = 1
+
+# Compiled spec instruction that requires exact one of argument names exists,
+# then jumps to the found argument's sub spec.
+#
+# Operands: bits of the argument names, bits of duplicate argument names, bit
+# to jump target mapping, bit list, argument name list, depending argument
+# name, violation record for none found, violated spec.
+_OP_ONE_OF = 2
+
+# Compiled spec instruction that jumps unconditionally.
+#
+# Operands: jump target.
+_OP_JUMP = 3
+
+# Compiled spec instruction that calls a custom spec's `ensure_spec` method.
+#
+# Operands: custom spec, depending argument name, enclosing AllOf specs info.
+_OP_CALL = 4
+
+
+# Compile task that compiles a spec.
+#
+# Operands: spec, depending argument name, enclosing AllOf specs info.
+_TASK_SPEC = 0
+
+# Compile task that emits an Option spec's skip instruction after its sub
+# spec.
+#
+# Operands: skip instruction's index, bit of the argument name.
+_TASK_OPTION_END = 1
+
+# Compile task that marks the start of a OneOf spec's sub spec branch.
+#
+# Operands: bit to jump target mapping, bit of the branch's argument name.
+_TASK_BRANCH_START = 2
+
+# Compile task that emits placeholder of the jump instruction ending a OneOf
+# spec's sub spec branch.
+#
+# Operands: jump instruction index list.
+_TASK_BRANCH_END = 3
+
+# Compile task that emits a OneOf spec's instructions after its branches.
+#
+# Operands: OneOf instruction's index, bit to jump target mapping, jump
+# instruction index list, OneOf instruction's other operands.
+_TASK_ONE_OF_END = 4
+
+# Compile task that ends an AllOf spec's scope after its sub specs.
+#
+# Operands: AllOf spec.
+_TASK_ALL_OF_END = 5
+
+
+class CompiledSpec(object):
+    """
+    Spec compiled into a flat instruction sequence with precomputed argument \
+        name tables and error messages.
+
+    Each distinct argument name is given a bit position. An argument list is \
+        mapped to an integer bitmask in one pass, then the instructions are \
+        evaluated with integer operations.
+
+    Calling the object ensures the spec against given argument list, the \
+        same way `ensure_spec` does.
+    """
+
+    def __init__(self, spec, depending=None, cache_size=None):
+        """
+        Constructor.
+
+        :param spec: Spec. Same as `ensure_spec`'s `spec` argument.
+
+        :param depending: Depending argument name.
+
+        :param cache_size: If given, cache up to this many verdicts, keyed \
+            by the bitmask of existing argument names. A verdict is either \
+            passing or the violation record, raised as a new \
+            SpecViolationError on each hit. The least recently used \
+            verdict is evicted when full. Not supported for specs \
+            containing custom BaseSpec instances, whose verdicts may depend \
+            on more than the argument names.
+
+        :return: None.
+        """
+        # Store spec
+        self.spec = spec
+
+        # Store depending argument name
+        self.depending = depending
+
+        # Instruction list
+        self._code = []
+
+        # Indexes that are jump targets. Instructions must not be merged
+        # across them.
+        self._target_index_s = set()
+
+        # Argument name to list of enclosing AllOf specs' info items whose
+        # string sub specs are the argument name, innermost last
+        self._all_of_info_d = {}
+
+        # Argument name to bit mapping
+        self._bit_d = {}
+
+        # Argument name list, ordered by bit position
+        self._arg_name_s = []
+
+        # Whether have custom spec instruction
+        self._has_call = False
+
+        # If given spec is not None
+        if spec is not None:
+            # Compile the spec
+            self._compile(spec, depending, None)
+
+        # Freeze instruction list
+        self._code = tuple(self._code)
+
+        # Freeze argument name list
+        self.arg_names = tuple(self._arg_name_s)
+
+        # Whether any argument name contains `=`, which can not be found by
+        # looking up the part before an argument's first `=`
+        self._has_eq_names = any('=' in x for x in self.arg_names)
+
+        # Delete temporary set
+        del self._target_index_s
+
+        # Delete temporary mapping
+        del self._all_of_info_d
+
+        # If verdict cache is not enabled
+        if cache_size is None:
+            # Set no verdict cache
+            self._cache = None
+
+        # If have custom spec instruction
+        elif self._has_call:
+            # Get error message
+            msg = 'Can not cache verdicts of spec containing custom spec.'
+
+            # Raise error
+            raise ValueError(msg)
+
+        # If verdict cache is enabled
+        else:
+            # Create verdict cache
+            self._cache = _LruCache(cache_size)
+
+        # Delete temporary list
+        del self._arg_name_s
+
+    def __repr__(self):
         """
         Convert to string representation.
 
-        :return: String.
+        :return: String.
+        """
+        # Return string representation
+        return 'CompiledSpec({0})'.format(repr(self.spec))
+
+    def _get_bit(self, arg_name):
+        """
+        Get given argument name's bit. Assign a new bit if not assigned before.
+
+        :param arg_name: Argument name.
+
+        :return: Bit.
+        """
+        # Get the argument name's bit
+        bit = self._bit_d.get(arg_name)
+
+        # If the argument name has no bit
+        if bit is None:
+            # Assign the next bit
+            bit = self._bit_d[arg_name] = 1 << len(self._arg_name_s)
+
+            # Add the argument name
+            self._arg_name_s.append(arg_name)
+
+        # Return the bit
+        return bit
+
+    def _mark_target(self):
+        """
+        Mark the current instruction index as jump target.
+
+        :return: Current instruction index.
+        """
+        # Get current instruction index
+        index = len(self._code)
+
+        # Mark the index as jump target
+        self._target_index_s.add(index)
+
+        # Return the index
+        return index
+
+    def _emit_require(self, arg_name, depending):
+        """
+        Emit instruction that requires given argument name exists.
+
+        Consecutive requirements are merged into one instruction so that \
+            they are tested by one integer comparison.
+
+        :param arg_name: Argument name.
+
+        :param depending: Depending argument name.
+
+        :return: None.
         """
-        # Return string representation
-        return 'OneOf({0})'.format(', '.join(repr(x) for x in self))
+        # Get the argument name's bit
+        bit = self._get_bit(arg_name)
 
-    def ensure_spec(self, args, depending):
+        # Get enclosing AllOf specs' info items whose string sub specs are
+        # the argument name.
+        #
+        # Same as `_find_rewriting_all_of` but without walking the enclosing
+        # AllOf specs, which would cost quadratic time for deeply nested
+        # specs.
+        info_s = self._all_of_info_d.get(arg_name)
+
+        # Get the rewriting AllOf spec's info item, i.e. the innermost one
+        violated_info = info_s[-1] if info_s else None
+
+        # If the violation is not rewritten by enclosing AllOf spec
+        if violated_info is None:
+            # Create violation record
+            violation = SpecViolation(
+                SpecViolation.ARGUMENT, arg_name, depending
+            )
+
+        # If the violation is rewritten by enclosing AllOf spec
+        else:
+            # Create violation record
+            violation = SpecViolation(
+                SpecViolation.ALL_OF, violated_info[0], violated_info[1]
+            )
+
+        # Format the error message now, once
+        violation.msg
+
+        # Get instruction list
+        code = self._code
+
+        # Get the requirement entry
+        entry = (bit, violation)
+
+        # If last instruction is a requirement, and the current index is not
+        # jump target
+        if code and code[-1] is not None and code[-1][0] == _OP_REQUIRE \
+                and len(code) not in self._target_index_s:
+            # Get last instruction
+            _, mask, entries = code[-1]
+
+            # Merge the requirement into last instruction
+            code[-1] = (_OP_REQUIRE, mask | bit, entries + (entry,))
+
+        # If not able to merge
+        else:
+            # Emit instruction
+            code.append((_OP_REQUIRE, bit, (entry,)))
+
+    def _compile(self, spec, depending, all_of_info):
         """
-        Ensure this spec. Raise SpecViolationError if violated.
+        Compile given spec into the instruction list.
+
+        The spec tree is walked with an explicit stack of compile tasks \
+            instead of recursion, so that deeply nested specs cost no Python \
+            stack frames. Instructions are emitted in the same order as a \
+            depth-first recursive walk.
 
-        :param args: Argument list.
+        :param spec: Spec.
 
         :param depending: Depending argument name.
 
+        :param all_of_info: Enclosing AllOf specs info.
+
         :return: None.
         """
-        # Found argument's name
-        found_arg_name = None
-
-        # Found argument's spec
-        found_sub_spec = None
+        # Get instruction list
+        code = self._code
 
-        # Argument name list
-        arg_name_s = []
+        # Stack of compile tasks
+        stack = [(_TASK_SPEC, spec, depending, all_of_info)]
 
-        # This loop aims to collect given OneOf spec's all argument names.
-        #
-        # For this OneOf spec's each sub spec.
-        for sub_spec in self._sub_specs:
-            # If the sub spec is string
-            if isinstance(sub_spec, str):
-                # Use the string as argument name
-                arg_name = sub_spec
+        # While have compile task
+        while stack:
+            # Pop a compile task
+            task = stack.pop()
 
-            # If the sub spec is Argument spec
-            elif isinstance(sub_spec, Argument):
-                # Get the Argument spec's argument name
-                arg_name = sub_spec.arg_name
+            # Get task kind
+            kind = task[0]
 
-            # If the sub spec is not string or Argument spec
-            else:
-                # Get error message
-                msg = 'Expected string or Argument object. Got {0}.'.format(
-                    repr(sub_spec)
+            # If the task emits an Option spec's skip instruction
+            if kind == _TASK_OPTION_END:
+                # Emit the skip instruction that jumps over the sub spec
+                code[task[1]] = (
+                    _OP_SKIP_IF_ABSENT, task[2], self._mark_target()
                 )
 
-                # Raise error
-                raise TypeError(msg)
+                # Go to next task
+                continue
+
+            # If the task marks the start of a OneOf spec's branch
+            if kind == _TASK_BRANCH_START:
+                # Use the current index as jump target
+                task[1][task[2]] = self._mark_target()
+
+                # Go to next task
+                continue
+
+            # If the task ends a OneOf spec's branch
+            if kind == _TASK_BRANCH_END:
+                # Store the jump instruction's index
+                task[1].append(len(code))
+
+                # Emit placeholder of the jump instruction
+                code.append(None)
+
+                # Go to next task
+                continue
+
+            # If the task ends an AllOf spec's scope
+            if kind == _TASK_ALL_OF_END:
+                # For the AllOf spec's each sub spec
+                for sub_spec in task[1]._sub_specs:
+                    # If the sub spec is string
+                    if isinstance(sub_spec, str):
+                        # Remove the AllOf spec's info item
+                        self._all_of_info_d[sub_spec].pop()
+
+                # Go to next task
+                continue
+
+            # If the task emits a OneOf spec's instructions
+            if kind == _TASK_ONE_OF_END:
+                # Get operands
+                _, one_of_index, target_d, jump_index_s, operands = task
+
+                # Get the OneOf spec's end index
+                end_index = self._mark_target()
+
+                # For each jump instruction's index
+                for jump_index in jump_index_s:
+                    # Emit the jump instruction that jumps to the end
+                    code[jump_index] = (_OP_JUMP, end_index)
+
+                # For each bit
+                for bit, target in list(target_d.items()):
+                    # If the jump target is placeholder
+                    if target is None:
+                        # Jump to the end
+                        target_d[bit] = end_index
+
+                # Emit the OneOf instruction
+                code[one_of_index] = (
+                    _OP_ONE_OF, operands[0], operands[1], target_d
+                ) + operands[2:]
+
+                # Go to next task
+                continue
+
+            # Get the spec to compile
+            _, spec, depending, all_of_info = task
+
+            # If the spec is string
+            if isinstance(spec, str):
+                # Emit instruction that requires the argument name
+                self._emit_require(spec, depending)
+
+            # If the spec is Argument spec.
+            #
+            # Subclasses are compiled as custom specs below, in case they
+            # override `ensure_spec`.
+            elif type(spec) is Argument:
+                # Emit instruction that requires the argument name
+                self._emit_require(spec.arg_name, depending)
+
+                # If have sub spec
+                if spec.sub_spec is not None:
+                    # Compile the sub spec
+                    stack.append(
+                        (_TASK_SPEC, spec.sub_spec, spec.arg_name, all_of_info)
+                    )
 
-            # Add the argument name to the argument name list
-            arg_name_s.append(arg_name)
+            # If the spec is Option spec
+            elif type(spec) is Option:
+                # Get the argument name's bit
+                bit = self._get_bit(spec.arg_name)
 
-        # For this OneOf spec's each sub spec
-        for sub_spec in self._sub_specs:
-            # If the sub spec is string
-            if isinstance(sub_spec, str):
-                # Use the string as argument name
-                arg_name = sub_spec
+                # If have sub spec
+                if spec.sub_spec is not None:
+                    # Get the skip instruction's index
+                    skip_index = len(code)
 
-            # If the sub spec is Argument spec
-            elif isinstance(sub_spec, Argument):
-                # Get the Argument spec's argument name
-                arg_name = sub_spec.arg_name
+                    # Emit placeholder of the skip instruction
+                    code.append(None)
 
-            # If the sub spec is not string or Argument spec
-            else:
-                # Get error message
-                msg = 'Expected string or Argument object. Got {0}.'.format(
-                    repr(sub_spec)
+                    # Emit the skip instruction after the sub spec
+                    stack.append((_TASK_OPTION_END, skip_index, bit))
+
+                    # Compile the sub spec
+                    stack.append(
+                        (_TASK_SPEC, spec.sub_spec, spec.arg_name, all_of_info)
+                    )
+
+            # If the spec is OneOf spec
+            elif type(spec) is OneOf:
+                # Get argument names resolved at construction
+                arg_name_s = list(spec._arg_names)
+
+                # If the OneOf spec has no sub specs
+                if not arg_name_s:
+                    # Nothing to ensure
+                    continue
+
+                # Get the argument names' bits
+                bit_s = tuple(self._get_bit(x) for x in arg_name_s)
+
+                # Bits of the OneOf spec's argument names
+                one_of_mask = 0
+
+                # Bits of argument names that appear more than once. Such an
+                # argument name counts as two found arguments.
+                dup_mask = 0
+
+                # For each bit
+                for bit in bit_s:
+                    # If the bit is seen before
+                    if one_of_mask & bit:
+                        # Add the bit to duplicate bits
+                        dup_mask |= bit
+
+                    # Add the bit
+                    one_of_mask |= bit
+
+                # Get error message for none found
+                none_violation = SpecViolation(
+                    SpecViolation.ONE_OF, spec, depending
                 )
 
-                # Raise error
-                raise TypeError(msg)
+                # Format the error message now, once
+                none_violation.msg
 
-            # If the argument name exists
-            if argument_exists(arg_name, args=args):
-                # If have not found argument before
-                if found_arg_name is None:
-                    # Store the found argument's name
-                    found_arg_name = arg_name
+                # Get the OneOf instruction's index
+                one_of_index = len(code)
 
-                    # Store the found argument's spec
-                    found_sub_spec = sub_spec
+                # Emit placeholder of the OneOf instruction
+                code.append(None)
 
-                # If have found argument before.
-                # This means the OneOf spec is violated.
-                else:
-                    # If depending argument name is given
-                    if depending:
-                        # Get error message
-                        msg = (
-                            'Argument {0} requires exact one of arguments {1}.'
-                            ' Got {2} and {3}.'
-                        ).format(
-                            repr(depending),
-                            repr(arg_name_s),
-                            repr(found_arg_name),
-                            repr(arg_name),
+                # Bit to jump target mapping
+                target_d = {}
+
+                # Jump instruction index list
+                jump_index_s = []
+
+                # Compile tasks of the branches, in spec order
+                branch_task_s = []
+
+                # For the OneOf spec's each sub spec
+                for bit, sub_spec in zip(bit_s, spec):
+                    # If the bit is seen before
+                    if bit in target_d:
+                        # Only the first sub spec with the argument name can
+                        # be the single found one
+                        continue
+
+                    # Use placeholder jump target, resolved when the branch
+                    # starts, or at the end
+                    target_d[bit] = None
+
+                    # Whether the sub spec is Argument subclass instance
+                    is_subclass = type(sub_spec) is not Argument
+
+                    # If the sub spec is Argument spec with sub spec, or
+                    # Argument subclass instance
+                    if isinstance(sub_spec, Argument) and (
+                        is_subclass or sub_spec.sub_spec is not None
+                    ):
+                        # Mark the branch's start
+                        branch_task_s.append(
+                            (_TASK_BRANCH_START, target_d, bit)
                         )
-                    # If depending argument name is not given
-                    else:
-                        # Get error message
-                        msg = (
-                            'Require exact one of arguments {0}. Got {1} and'
-                            ' {2}.'
-                        ).format(
-                            repr(arg_name_s),
-                            repr(found_arg_name),
-                            repr(arg_name),
+
+                        # If the sub spec is Argument spec
+                        if not is_subclass:
+                            # Compile the Argument spec's sub spec.
+                            #
+                            # The found argument's own name is known to
+                            # exist, so only its sub spec needs ensuring.
+                            branch_task_s.append((
+                                _TASK_SPEC, sub_spec.sub_spec,
+                                sub_spec.arg_name, all_of_info,
+                            ))
+
+                        # If the sub spec is Argument subclass instance
+                        else:
+                            # Compile the sub spec as custom spec
+                            branch_task_s.append(
+                                (_TASK_SPEC, sub_spec, depending, all_of_info)
+                            )
+
+                        # End the branch
+                        branch_task_s.append(
+                            (_TASK_BRANCH_END, jump_index_s)
                         )
 
-                    # Raise error
-                    raise SpecViolationError(msg, self)
+                # Emit the OneOf instruction after the branches
+                stack.append((
+                    _TASK_ONE_OF_END, one_of_index, target_d, jump_index_s,
+                    (
+                        one_of_mask, dup_mask, bit_s, arg_name_s, depending,
+                        none_violation, spec,
+                    ),
+                ))
+
+                # Run the branches' tasks in spec order
+                stack.extend(reversed(branch_task_s))
+
+            # If the spec is AllOf spec
+            elif type(spec) is AllOf:
+                # Ensure the sub specs are string or Argument spec.
+                # May raise error.
+                _spec_arg_names(spec)
+
+                # Get the AllOf spec's info for the sub specs
+                sub_all_of_info = (spec, depending, all_of_info)
+
+                # For the AllOf spec's each sub spec
+                for sub_spec in spec._sub_specs:
+                    # If the sub spec is string
+                    if isinstance(sub_spec, str):
+                        # Add the AllOf spec's info item for the argument
+                        # name
+                        self._all_of_info_d.setdefault(sub_spec, []).append(
+                            sub_all_of_info
+                        )
 
-        # If given OneOf spec has sub specs
-        if arg_name_s:
-            # If have not found argument name.
-            # This means the OneOf spec is violated.
-            if found_arg_name is None:
-                # If depending argument name is given
-                if depending:
-                    # Get error message
-                    msg = (
-                        'Argument {0} requires exact one of arguments {1}.'
-                        ' Got none.'
-                    ).format(
-                        repr(depending),
-                        repr(arg_name_s),
-                        repr(found_arg_name),
-                        repr(arg_name),
+                # End the AllOf spec's scope after the sub specs
+                stack.append((_TASK_ALL_OF_END, spec))
+
+                # For the AllOf spec's each sub spec, in reverse order so
+                # that they are compiled in spec order.
+                #
+                # Consecutive argument names are merged into one
+                # instruction, so an AllOf spec of argument names is tested
+                # as "all masked bits set".
+                for sub_spec in reversed(spec._sub_specs):
+                    # Compile the sub spec
+                    stack.append(
+                        (_TASK_SPEC, sub_spec, depending, sub_all_of_info)
                     )
 
-                # If depending argument name is not given
-                else:
-                    # Get error message
-                    msg = (
-                        'Require exact one of arguments {0}. Got none.'
-                    ).format(
-                        repr(arg_name_s),
-                        repr(found_arg_name),
-                        repr(arg_name),
-                    )
+            # If the spec is custom BaseSpec instance
+            elif isinstance(spec, BaseSpec):
+                # Set have custom spec instruction
+                self._has_call = True
 
-                # Raise error
-                raise SpecViolationError(msg, self)
+                # Emit instruction that calls the spec's `ensure_spec` method
+                code.append((_OP_CALL, spec, depending, all_of_info))
 
-            # If have found argument name
+            # If the spec is none of above
             else:
-                # Assert the found argument's spec is not None
-                assert found_sub_spec is not None
+                # Raise error
+                raise _spec_type_error(spec)
 
-                # Ensure the found argument's spec
-                ensure_spec(
-                    spec=found_sub_spec, args=args, depending=depending
-                )
+    def mask_of(self, args):
+        """
+        Map given argument list to bitmask of the spec's argument names that \
+            exist in the argument list.
 
+        The argument list is iterated once, and nothing but the bitmask is \
+            stored.
 
-class AllOf(BaseSpec):
-    """
-    Argument spec that requires all given sub specs are ensured.
-    """
+        :param args: Iterable of arguments, or ArgIndex object.
 
-    def __init__(self, *sub_specs):
+        :return: Bitmask.
         """
-        Constructor.
+        # Bitmask
+        mask = 0
+
+        # Get argument name to bit mapping
+        bit_d = self._bit_d
+
+        # If given argument list is ArgIndex object
+        if isinstance(args, ArgIndex):
+            # For each argument name
+            for arg_name, bit in bit_d.items():
+                # If the argument name exists
+                if arg_name in args:
+                    # Set the bit
+                    mask |= bit
+
+            # Return the bitmask
+            return mask
+
+        # Get the mapping's get function
+        get_bit = bit_d.get
+
+        # If any argument name contains `=`
+        if self._has_eq_names:
+            # For given argument list's each argument
+            for arg in args:
+                # Find the first `=`
+                eq_pos = arg.find('=')
+
+                # Set the bit of the argument's name, i.e. the part before
+                # the first `=`
+                mask |= get_bit(arg if eq_pos == -1 else arg[:eq_pos], 0)
+
+                # While have `=`.
+                #
+                # The argument also matches each part before a later `=`,
+                # and the whole argument, e.g. `-a=b=c` matches `-a=b` and
+                # `-a=b=c`.
+                while eq_pos != -1:
+                    # Find the next `=`
+                    eq_pos = arg.find('=', eq_pos + 1)
+
+                    # Set the bit of the part before the `=`, or the whole
+                    # argument
+                    mask |= get_bit(arg if eq_pos == -1 else arg[:eq_pos], 0)
+
+            # Return the bitmask
+            return mask
+
+        # For given argument list's each argument
+        for arg in args:
+            # Find the first `=`
+            eq_pos = arg.find('=')
+
+            # Set the bit of the argument's name, i.e. the part before the
+            # first `=`
+            mask |= get_bit(arg if eq_pos == -1 else arg[:eq_pos], 0)
+
+        # Return the bitmask
+        return mask
+
+    def __call__(self, args):
+        """
+        Ensure this spec. Raise SpecViolationError if violated.
 
-        :param sub_specs: Sub spec list.
+        :param args: Iterable of arguments, or ArgIndex object.
 
         :return: None.
         """
-        # Store sub specs
-        self._sub_specs = list(sub_specs)
+        # If the spec is None
+        if self.spec is None:
+            # Return
+            return
 
-    def __iter__(self):
+        # If given argument list is None
+        if args is None:
+            # Get error message
+            msg = 'Expected argument list. Got None.'
+
+            # Raise error
+            raise TypeError(msg)
+
+        # If have custom spec instruction
+        if self._has_call:
+            # Get argument list that the custom specs can iterate again
+            args = _reiterable_args(args)
+
+        # Get verdict cache
+        cache = self._cache
+
+        # If verdict cache is not enabled
+        if cache is None:
+            # Map the argument list to bitmask, and ensure this spec
+            self._run(self.mask_of(args), args)
+
+            # Return
+            return
+
+        # Map the argument list to bitmask
+        mask = self.mask_of(args)
+
+        # Get cached verdict
+        violation = cache.get(mask)
+
+        # If the verdict is not cached
+        if violation is _MISSING:
+            try:
+                # Ensure this spec
+                self._run(mask, args)
+
+            # If have error
+            except SpecViolationError as exc:
+                # Cache the error's violation record.
+                #
+                # The error itself is not cached, because raising one error
+                # object again overwrites its context and traceback, which
+                # belong to the caller that raised it.
+                cache.set(mask, exc.violation)
+
+                # Raise the error
+                raise
+
+            # If not have error
+            else:
+                # Cache passing verdict
+                cache.set(mask, None)
+
+        # If the cached verdict is violation
+        elif violation is not None:
+            # Raise new error of the violation record
+            raise violation.to_error()
+
+    def cache_info(self):
         """
-        Get sub spec iterator.
+        Get verdict cache statistics.
 
-        :return: Sub spec iterator.
+        :return: CacheInfo namedtuple of hits, misses, maxsize, currsize. \
+            None if verdict cache is not enabled.
         """
-        # Return sub spec iterator
-        return iter(self._sub_specs)
+        # If verdict cache is not enabled
+        if self._cache is None:
+            # Return None
+            return None
 
-    def __repr__(self):
+        # Return verdict cache statistics
+        return self._cache.info()
+
+    def cache_clear(self):
         """
-        Convert to string representation.
+        Clear verdict cache and its statistics.
 
-        :return: String.
+        :return: None.
         """
-        # Return string representation
-        return 'AllOf({0})'.format(', '.join(repr(x) for x in self))
+        # If verdict cache is enabled
+        if self._cache is not None:
+            # Clear verdict cache
+            self._cache.clear()
 
-    def ensure_spec(self, args, depending):
+    def _run(self, mask, args):
         """
-        Ensure this spec. Raise SpecViolationError if violated.
+        Run the instructions. Raise SpecViolationError if violated.
 
-        :param args: Argument list.
+        :param mask: Bitmask of argument names that exist.
 
-        :param depending: Depending argument name.
+        :param args: ArgIndex object for custom spec instructions.
 
         :return: None.
         """
-        # Argument name list
-        arg_name_s = []
+        # Get instruction list
+        code = self._code
+
+        # Get instruction count
+        code_len = len(code)
+
+        # Instruction index
+        index = 0
+
+        # While have instruction
+        while index < code_len:
+            # Get instruction
+            instr = code[index]
+
+            # Get instruction type
+            op = instr[0]
+
+            # If the instruction requires argument names
+            if op == _OP_REQUIRE:
+                # Get the required bits
+                required_mask = instr[1]
+
+                # If not all of the required bits are set
+                if mask & required_mask != required_mask:
+                    # For each requirement entry, in spec order
+                    for bit, violation in instr[2]:
+                        # If the bit is not set
+                        if not mask & bit:
+                            # Raise error
+                            raise SpecViolationError.from_violation(
+                                violation
+                            )
 
-        # This loop aims to collect the AllOf spec's all argument names.
-        #
-        # For this AllOf spec's each sub spec.
-        for sub_spec in self._sub_specs:
-            # If the sub spec is string
-            if isinstance(sub_spec, str):
-                # Use the string as argument name
-                arg_name = sub_spec
+                # Go to next instruction
+                index += 1
 
-            # If the sub spec is Argument spec
-            elif isinstance(sub_spec, Argument):
-                # Get the Argument spec's argument name
-                arg_name = sub_spec.arg_name
+            # If the instruction is Option spec's skip instruction
+            elif op == _OP_SKIP_IF_ABSENT:
+                # If the argument name exists
+                if mask & instr[1]:
+                    # Go to next instruction
+                    index += 1
+
+                # If the argument name not exists
+                else:
+                    # Jump over the Option spec's sub spec
+                    index = instr[2]
+
+            # If the instruction is OneOf instruction
+            elif op == _OP_ONE_OF:
+                # Get the OneOf spec's set bits
+                one_of_mask = mask & instr[1]
+
+                # If exact one bit is set, and the bit's argument name does
+                # not appear more than once
+                if one_of_mask and not one_of_mask & (one_of_mask - 1) \
+                        and not one_of_mask & instr[2]:
+                    # Jump to the found argument's sub spec
+                    index = instr[3][one_of_mask]
+
+                # If no bit is set
+                elif not one_of_mask:
+                    # Raise error
+                    raise SpecViolationError.from_violation(instr[7])
+
+                # If more than one arguments are found
+                else:
+                    # Found argument names
+                    found_arg_name_s = []
+
+                    # For the OneOf spec's each argument name
+                    for bit, arg_name in zip(instr[4], instr[5]):
+                        # If the bit is set
+                        if mask & bit:
+                            # Add the argument name
+                            found_arg_name_s.append(arg_name)
+
+                    # Create violation record
+                    violation = SpecViolation(
+                        SpecViolation.ONE_OF,
+                        instr[8],
+                        instr[6],
+                        found_arg_names=tuple(found_arg_name_s[:2]),
+                    )
+
+                    # Raise error
+                    raise SpecViolationError.from_violation(violation)
+
+            # If the instruction is jump instruction
+            elif op == _OP_JUMP:
+                # Jump to the target
+                index = instr[1]
 
-            # If the sub spec is not string or Argument spec
+            # If the instruction calls custom spec
             else:
-                # Get error message
-                msg = 'Expected string or Argument object. Got {0}.'.format(
-                    repr(sub_spec)
-                )
+                # Ensure the custom spec
+                _ensure_custom_spec(instr[1], args, instr[2], instr[3])
 
-                # Raise error
-                raise TypeError(msg)
+                # Go to next instruction
+                index += 1
 
-            # Add the argument name to the argument name list
-            arg_name_s.append(arg_name)
 
-        # For this AllOf spec's each sub spec
-        for sub_spec in self._sub_specs:
-            try:
-                # Ensure the sub spec
-                ensure_spec(spec=sub_spec, args=args, depending=depending)
+# Maximum count of compiled specs cached
+_COMPILED_SPEC_CACHE_SIZE = 1024
 
-            # If have error
-            except SpecViolationError as exc:
-                # Get violated spec
-                violated_spec = exc.args[1]
-
-                # If the violated spec is string or Argument spec
-                if isinstance(violated_spec, (str, Argument)):
-                    # For given AllOf spec's each sub spec
-                    for sub_spec in self._sub_specs:
-                        # If the sub spec is the violated spec
-                        if sub_spec is violated_spec:
-                            # If depending argument name is given
-                            if depending:
-                                # Get error message
-                                msg = (
-                                    'Argument {0} requires all of arguments'
-                                    ' {1}.'
-                                ).format(
-                                    repr(depending),
-                                    repr(arg_name_s),
-                                )
-
-                            # If depending argument name is not given
-                            else:
-                                # Get error message
-                                msg = (
-                                    'Require all of arguments {0}.'
-                                ).format(
-                                    repr(arg_name_s),
-                                )
 
-                            # Raise error
-                            raise SpecViolationError(msg, self)
+# Spec object and depending argument name pair to compiled spec mapping
+# used by `ensure_spec`'s bitmask engine.
+#
+# Each compiled spec references its spec, so a weak key mapping would never
+# drop it. The cache is bounded instead, and a spec is released when its
+# compiled specs are evicted.
+_compiled_spec_cache = _LruCache(_COMPILED_SPEC_CACHE_SIZE)
 
-                # Raise original error
-                raise
 
+# Maximum count of compiled argument name specs cached
+_COMPILED_NAME_CACHE_SIZE = 1024
 
-class SpecViolationError(Exception):
-    """
-    Error raised when an argument spec violation is detected.
-    """
 
+# Argument name spec and depending argument name pair to compiled spec
+# mapping used by `ensure_spec`'s bitmask engine.
+_compiled_name_cache = _LruCache(_COMPILED_NAME_CACHE_SIZE)
 
-def argument_exists(arg_name, args):
+
+def _get_compiled_spec(spec, depending):
     """
-    Test whether given argument name exists in given argument list.
+    Get given spec's cached compiled spec. Compile if not cached.
 
-    :param arg_name: Argument name.
+    :param spec: Spec.
 
-    :param args: Argument list.
+    :param depending: Depending argument name.
 
-    :return: Whether given argument name exists in given argument list.
+    :return: CompiledSpec object.
     """
-    # Create regular expression object that matches `^_ARG_$` or `^_ARG_=`
-    re_obj = re.compile('^%s(?:$|=)' % arg_name)
+    # If given spec is argument name string
+    if isinstance(spec, str):
+        # Use argument name spec cache
+        cache = _compiled_name_cache
 
-    # For given argument list's each argument
-    for arg in args:
-        # If the argument matches the regular expression
-        if re_obj.search(arg):
-            # Return True
-            return True
+    # If given spec is BaseSpec instance
+    elif isinstance(spec, BaseSpec):
+        # Use spec object cache
+        cache = _compiled_spec_cache
 
-    # If none of the arguments matches the regular expression.
+    # If given spec is none of above
     else:
-        # Return False
-        return False
+        # Compile the spec, which raises error
+        return CompiledSpec(spec, depending=depending)
 
+    # Get cache key.
+    #
+    # Spec objects are compared by identity.
+    key = (spec, depending)
 
-def ensure_argument_name(arg_name, args, depending=None):
+    # Get compiled spec
+    compiled_spec = cache.get(key)
+
+    # If the spec is not compiled for the depending argument name
+    if compiled_spec is _MISSING:
+        # Compile the spec
+        compiled_spec = CompiledSpec(spec, depending=depending)
+
+        # Cache the compiled spec
+        cache.set(key, compiled_spec)
+
+    # Return the compiled spec
+    return compiled_spec
+
+
+def name_cache_info():
     """
-    Ensure given argument name exists in given argument list. Raise \
-        SpecViolationError if violated.
+    Get statistics of the cache of compiled argument name specs, used by \
+        `ensure_spec`'s bitmask engine for string specs.
 
-    :param arg_name: Argument name.
+    :return: CacheInfo namedtuple of hits, misses, maxsize, currsize.
+    """
+    # Return cache statistics
+    return _compiled_name_cache.info()
 
-    :param args: Argument list.
 
-    :param depending: Depending argument name.
+def clear_caches():
+    """
+    Clear this module's caches of compiled specs, used by `ensure_spec`'s \
+        bitmask engine, and their statistics.
+
+    Caches owned by objects, e.g. `CompiledSpec` verdict caches and \
+        `cached_converter` caches, are not affected.
 
     :return: None.
     """
-    # If given argument name not exists in given argument list
-    if not argument_exists(arg_name, args):
-        # If depending argument name is given
-        if depending:
-            # Get error message
-            msg = 'Argument {0} requires argument {1}.'.format(
-                repr(depending), repr(arg_name)
-            )
+    # Clear compiled argument name specs
+    _compiled_name_cache.clear()
 
-        # If depending argument name is not given
-        else:
-            # Get error message
-            msg = 'Require argument {0}.'.format(repr(arg_name))
+    # Clear compiled specs
+    _compiled_spec_cache.clear()
 
-        # Raise error
-        raise SpecViolationError(msg, arg_name)
 
+def compile_spec(spec, depending=None, cache_size=None):
+    """
+    Compile given spec into a reusable validator.
+
+    The spec tree is validated and its argument name tables and error \
+        messages are precomputed once, so that repeated validations only pay \
+        for mapping the argument list to a bitmask and a few integer \
+        operations.
+
+    :param spec: Spec. Same as `ensure_spec`'s `spec` argument.
 
-def ensure_spec(spec, args, depending=None):
+    :param depending: Depending argument name.
+
+    :param cache_size: If given, cache up to this many verdicts keyed by \
+        the set of existing argument names. See `CompiledSpec`.
+
+    :return: CompiledSpec object. Call it with an argument list to ensure \
+        the spec.
     """
-    Ensure given spec. Raise SpecViolationError if violated.
+    # Return compiled spec
+    return CompiledSpec(spec, depending=depending, cache_size=cache_size)
 
-    :param spec: Spec.
 
-    Can be:
-        - String
-        - Argument spec
-        - Option spec
-        - OneOf spec
-        - AllOf spec
+def ensure_spec_many(spec, argv_iterable, depending=None):
+    """
+    Ensure given spec against each of given argument lists, without raising \
+        SpecViolationError.
 
-    :param args: Argument list.
+    Each argument list is mapped to a bitmask, i.e. a row of the presence \
+        matrix of the spec's argument names. The spec is evaluated once per \
+        distinct bitmask, so a batch with few distinct argument combinations \
+        costs little more than mapping the rows.
+
+    :param spec: Spec. Same as `ensure_spec`'s `spec` argument.
+
+    :param argv_iterable: Iterable of argument lists.
 
     :param depending: Depending argument name.
 
-    :return: None.
+    :return: A tuple of verdict array and violation dict. The verdict array \
+        is `array.array('B')` containing 1 for each passing row and 0 for \
+        each failing row. The violation dict maps each failing row's index \
+        to its SpecViolation record. Rows with the same violation share one \
+        record. Call the record's `to_error` to get a new SpecViolationError \
+        to raise, so that raising does not change other rows' outcomes.
     """
-    # If given spec is None
-    if spec is None:
-        # Return
-        return
+    # Get compiled spec
+    compiled_spec = _get_compiled_spec(spec, depending)
 
-    # If given argument list is None
-    if args is None:
-        # Get error message
-        msg = 'Expected argument list. Got None.'
+    # Verdict array
+    verdict_s = array('B')
 
-        # Raise error
-        raise TypeError(msg)
+    # Row index to violation record mapping
+    violation_d = {}
 
-    # If given spec is string
-    if isinstance(spec, str):
-        # Ensure argument name
-        ensure_argument_name(arg_name=spec, args=args, depending=depending)
+    # Bitmask to violation record mapping. None means passing.
+    outcome_d = {}
 
-    # If given spec is BaseSpec instance
-    elif isinstance(spec, BaseSpec):
-        # Ensure the spec
-        spec.ensure_spec(args=args, depending=depending)
+    # Whether outcome depends only on the bitmask.
+    #
+    # Custom specs may test anything in the argument list.
+    use_outcome_d = not compiled_spec._has_call
 
-    # If given spec is none of above
-    else:
-        # Get error message
-        msg = (
-            'Expected string, Argument, Option, OneOf, or AllOf.'
-            ' Got {0}.'
-        ).format(repr(spec))
+    # For each argument list
+    for row_index, args in enumerate(argv_iterable):
+        # If the spec is None
+        if spec is None:
+            # Set the row passing
+            verdict_s.append(1)
 
-        # Raise error
-        raise TypeError(msg)
+            # Go to next row
+            continue
+
+        # If the argument list is None
+        if args is None:
+            # Get error message
+            msg = 'Expected argument list. Got None.'
+
+            # Raise error
+            raise TypeError(msg)
+
+        # If have custom spec instruction
+        if not use_outcome_d:
+            # Get argument list that the custom specs can iterate again
+            args = _reiterable_args(args)
+
+        # Map the argument list to bitmask
+        mask = compiled_spec.mask_of(args)
+
+        # If the bitmask's outcome is known
+        if use_outcome_d and mask in outcome_d:
+            # Get the outcome
+            violation = outcome_d[mask]
+
+        # If the bitmask's outcome is not known
+        else:
+            try:
+                # Ensure the spec
+                compiled_spec._run(mask, args)
+
+            # If have error
+            except SpecViolationError as exc:
+                # Use the error's violation record as outcome
+                violation = exc.violation
+
+            # If not have error
+            else:
+                # Use None as outcome
+                violation = None
+
+            # If outcome depends only on the bitmask
+            if use_outcome_d:
+                # Store the outcome
+                outcome_d[mask] = violation
+
+        # If the row passes
+        if violation is None:
+            # Set the row passing
+            verdict_s.append(1)
+
+        # If the row fails
+        else:
+            # Set the row failing
+            verdict_s.append(0)
+
+            # Store the violation
+            violation_d[row_index] = violation
+
+    # Return the verdict array and the violation dict
+    return verdict_s, violation_d
@@ -0,0 +1,828 @@
+# coding: utf-8
+"""
+This module contains benchmarks.
+
+Run all benchmarks:
+    python -m aoikargutil.aoikargutil_benchmarks
+
+Run given benchmarks:
+    python -m aoikargutil.aoikargutil_benchmarks ensure_spec_depth
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+
+# Standard imports
+from argparse import ArgumentParser
+from argparse import ArgumentTypeError
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+# Local imports
+from .aoikargutil import AllOf
+from .aoikargutil import ArgIndex
+from .aoikargutil import argument_exists
+from .aoikargutil import Argument
+from .aoikargutil import bool_0or1
+from .aoikargutil import bool_yes_no
+from .aoikargutil import cached_converter
+from .aoikargutil import chain
+from .aoikargutil import choice_of
+from .aoikargutil import clear_caches
+from .aoikargutil import duration_seconds_gt0
+from .aoikargutil import ensure_spec
+from .aoikargutil import float_gt0
+from .aoikargutil import int_ge0
+from .aoikargutil import int_gt0
+from .aoikargutil import int_list_ge0
+from .aoikargutil import name_cache_info
+from .aoikargutil import NameTrie
+from .aoikargutil import OneOf
+from .aoikargutil import size_bytes_ge0
+from .aoikargutil import SpecViolationError
+from .aoikargutil import str_list_strip_nonempty
+from .aoikargutil import str_nonempty
+from .aoikargutil import str_strip_nonempty
+from .aoikargutil import validate
+
+
+def _time_per_call(func, number):
+    """
+    Get the best time per call of given function, in microseconds.
+
+    :param func: Function that takes no arguments.
+
+    :param number: Call count of each timing round.
+
+    :return: Microseconds per call.
+    """
+    # Get the best total time of 3 timing rounds
+    total_time = min(timeit.repeat(func, number=number, repeat=3))
+
+    # Return microseconds per call
+    return total_time / number * 1e6
+
+
+def _legacy_bool_0or1(text):
+    """
+    Copy of `bool_0or1` before `bool_converter`, used as benchmark baseline.
+
+    :param text: Argument text.
+
+    :return: False for '0', True for '1'.
+    """
+    # If given argument text is '0'
+    if text == '0':
+        # Return False
+        return False
+
+    # If given argument text is '1'
+    elif text == '1':
+        # Return True
+        return True
+
+    # If given argument text is not '0' or '1'
+    else:
+        # Get error message
+        error_msg = "Expected '0' or '1'. Got: {0}.".format(repr(text))
+
+        # Raise error
+        raise ArgumentTypeError(error_msg)
+
+
+def _legacy_int_ge0(text):
+    """
+    Copy of `int_ge0` before `int_range`, used as benchmark baseline.
+
+    :param text: Argument text.
+
+    :return: Integer >=0.
+    """
+    try:
+        # Convert given argument text to integer.
+        # May raise error.
+        value = int(text)
+
+        # Assert the value is >=0.
+        # May raise error.
+        assert value >= 0
+
+    # If have error
+    except Exception:
+        # Get error message
+        error_msg = 'Expected an integer >=0. Got: {0}.'.format(repr(text))
+
+        # Raise error
+        raise ArgumentTypeError(error_msg)
+
+    # If not have error
+    else:
+        # Return the value
+        return value
+
+
+def _legacy_float_gt0(text):
+    """
+    Copy of `float_gt0` before `float_range`, used as benchmark baseline.
+
+    :param text: Argument text.
+
+    :return: Float >0.
+    """
+    try:
+        # Convert given argument text to float.
+        # May raise error.
+        value = float(text)
+
+        # Assert the value is >0.
+        # May raise error.
+        assert value > 0
+
+    # If have error
+    except Exception:
+        # Get error message
+        error_msg = 'Expected a float >0. Got: {0}.'.format(repr(text))
+
+        # Raise error
+        raise ArgumentTypeError(error_msg)
+
+    # If not have error
+    else:
+        # Return the value
+        return value
+
+
+def benchmark_range_converter():
+    """
+    Benchmark range converters against their `assert`-based predecessors, \
+        on the accept and reject paths.
+
+    :return: None.
+    """
+    # Print header
+    print('converters: range check')
+
+    # For each converter's description, the converter, and argument texts
+    for desc, converter, text_s in (
+        ('int_ge0', int_ge0, ('123', '-1', 'x')),
+        ('legacy int_ge0', _legacy_int_ge0, ('123', '-1', 'x')),
+        ('float_gt0', float_gt0, ('0.5', '-0.5', 'x')),
+        ('legacy float_gt0', _legacy_float_gt0, ('0.5', '-0.5', 'x')),
+    ):
+        # For each path's description and the argument text
+        for path, text in zip(('accept', 'out of range', 'invalid'), text_s):
+            def convert():
+                try:
+                    converter(text)
+                except ArgumentTypeError:
+                    pass
+
+            # Get microseconds per call
+            usec = _time_per_call(convert, number=100000)
+
+            # Print result
+            print('  {0:<17} {1:<13} {2:>8.3f} us/call'.format(
+                desc, path, usec
+            ))
+
+
+def benchmark_range_converter_many():
+    """
+    Benchmark range converters' bulk variant `many` against converting \
+        argument texts one by one.
+
+    :return: None.
+    """
+    # Print header
+    print('converters: bulk range check')
+
+    # For each converter's description, the converter, and argument texts
+    for desc, converter, text_s in (
+        ('int_ge0', int_ge0, [str(x) for x in range(100000)]),
+        ('float_gt0', float_gt0, [str(x + 0.5) for x in range(100000)]),
+    ):
+        # For each way's description and the function
+        for way, func in (
+            ('one by one', lambda: [converter(x) for x in text_s]),
+            ('many', lambda: converter.many(text_s)),
+        ):
+            # Get microseconds per call
+            usec = _time_per_call(func, number=10)
+
+            # Print result
+            print('  {0:<9} {1:<10} {2:>10.0f} us/100000 tokens'.format(
+                desc, way, usec
+            ))
+
+
+def benchmark_list_converter():
+    """
+    Benchmark list converters against splitting and converting items by \
+        hand.
+
+    :return: None.
+    """
+    # Print header
+    print('converters: delimited list of 100000 items')
+
+    # Get argument texts
+    int_text = ','.join(str(x) for x in range(100000))
+
+    str_text = ','.join('item{0}'.format(x) for x in range(100000))
+
+    # For each way's description and the function
+    for desc, func in (
+        (
+            'by hand int_ge0',
+            lambda: [int_ge0(x) for x in str_nonempty(int_text).split(',')],
+        ),
+        ('int_list_ge0', lambda: int_list_ge0(int_text)),
+        (
+            'by hand str_strip_nonempty',
+            lambda: [
+                str_strip_nonempty(x)
+                for x in str_nonempty(str_text).split(',')
+            ],
+        ),
+        ('str_list_strip_nonempty', lambda: str_list_strip_nonempty(str_text)),
+    ):
+        # Get microseconds per call
+        usec = _time_per_call(func, number=10)
+
+        # Print result
+        print('  {0:<26} {1:>10.0f} us/call'.format(desc, usec))
+
+
+def benchmark_bool_converter():
+    """
+    Benchmark bool converters against the `if/elif`-based `bool_0or1`.
+
+    :return: None.
+    """
+    # Print header
+    print('converters: bool')
+
+    # For each converter's description, the converter, and argument texts
+    for desc, converter, text_s in (
+        ('legacy bool_0or1', _legacy_bool_0or1, ('0', '1', 'x')),
+        ('bool_0or1', bool_0or1, ('0', '1', 'x')),
+        ('bool_yes_no', bool_yes_no, ('no', 'YES', 'x')),
+    ):
+        # For each argument text
+        for text in text_s:
+            def convert():
+                try:
+                    converter(text)
+                except ArgumentTypeError:
+                    pass
+
+            # Get microseconds per call
+            usec = _time_per_call(convert, number=200000)
+
+            # Print result
+            print('  {0:<17} {1:<6} {2:>8.3f} us/call'.format(
+                desc, repr(text), usec
+            ))
+
+
+def benchmark_cached_converter():
+    """
+    Benchmark `cached_converter` against the uncached converters, with the \
+        same argument text repeated.
+
+    :return: None.
+    """
+    # Print header
+    print('converters: cached_converter, same argument text repeated')
+
+    # For each converter and argument texts
+    for converter, text_s, number in (
+        (bool_0or1, ('1', 'x'), 100000),
+        (str_strip_nonempty, (' value ', ' '), 100000),
+        (int_ge0, ('123', '-1'), 100000),
+        (int_list_ge0, (','.join(str(x) for x in range(100)), '1,-1'), 10000),
+    ):
+        # For each way's description and the converter
+        for way, func in (
+            ('uncached', converter),
+            ('cached', cached_converter(converter)),
+        ):
+            # For each path's description and the argument text
+            for path, text in zip(('accept', 'reject'), text_s):
+                def convert():
+                    try:
+                        func(text)
+                    except ArgumentTypeError:
+                        pass
+
+                # Get microseconds per call
+                usec = _time_per_call(convert, number=number)
+
+                # Print result
+                print('  {0:<18} {1:<8} {2:<6} {3:>8.3f} us/call'.format(
+                    converter.__name__, way, path, usec
+                ))
+
+
+def benchmark_chain():
+    """
+    Benchmark `chain` against nested lambdas.
+
+    :return: None.
+    """
+    # Print header
+    print('converters: chain of str_strip_nonempty, int_gt0, check')
+
+    def check(value):
+        if value > 1000:
+            raise ArgumentTypeError('Expected an integer <=1000.')
+
+        return value
+
+    # Create nested lambdas, one per step, as written by hand
+    strip_step = lambda text: str_strip_nonempty(text)  # noqa: E731
+
+    int_step = lambda text: int_gt0(strip_step(text))  # noqa: E731
+
+    nested = lambda text: check(int_step(text))  # noqa: E731
+
+    # For each way's description and the converter
+    for desc, converter in (
+        ('nested lambdas', nested),
+        ('chain', chain(str_strip_nonempty, int_gt0, check)),
+    ):
+        # For each argument text
+        for text in (' 42 ', ' 0 '):
+            def convert():
+                try:
+                    converter(text)
+                except ArgumentTypeError:
+                    pass
+
+            # Get microseconds per call
+            usec = _time_per_call(convert, number=100000)
+
+            # Print result
+            print('  {0:<15} {1:<7} {2:>8.3f} us/call'.format(
+                desc, repr(text), usec
+            ))
+
+
+def benchmark_choice_of():
+    """
+    Benchmark `choice_of` against `in` test over a list, as done by \
+        `argparse` `choices` argument.
+
+    :return: None.
+    """
+    # Print header
+    print('converters: choice_of')
+
+    # For each value count
+    for count in (100, 10000, 100000):
+        # Get values
+        value_s = ['model-{0:06d}'.format(x) for x in range(count)]
+
+        # Create converter
+        converter = choice_of(value_s)
+
+        # Get the last value
+        last_value = value_s[-1]
+
+        # Get microseconds per call of accepting
+        in_list_usec = _time_per_call(
+            lambda: last_value in value_s, number=max(1, 1000000 // count)
+        )
+
+        # Get microseconds per call of accepting
+        accept_usec = _time_per_call(
+            lambda: converter(last_value), number=100000
+        )
+
+        # Get microseconds of the first rejection, which builds the index
+        def reject():
+            try:
+                converter('model-x{0:05d}'.format(count - 1))
+            except ArgumentTypeError:
+                pass
+
+        first_reject_usec = timeit.timeit(reject, number=1) * 1e6
+
+        # Get microseconds per call of rejecting
+        reject_usec = _time_per_call(reject, number=10)
+
+        # Print result
+        print(
+            '  count={0:<7} in list {1:>9.2f} us  accept {2:>6.2f} us'
+            '  first reject {3:>9.0f} us  reject {4:>7.0f} us'.format(
+                count, in_list_usec, accept_usec, first_reject_usec,
+                reject_usec,
+            )
+        )
+
+
+def benchmark_unit_converter():
+    """
+    Benchmark `size_bytes_ge0` and `duration_seconds_gt0`.
+
+    :return: None.
+    """
+    # Print header
+    print('converters: size and duration')
+
+    # For each converter and argument texts
+    for converter, text_s in (
+        (size_bytes_ge0, ('4096', '512MiB', '1.5G', 'x')),
+        (duration_seconds_gt0, ('90', '1h30m', '1w2d3h4m5s', 'x')),
+    ):
+        # For each argument text
+        for text in text_s:
+            def convert():
+                try:
+                    converter(text)
+                except ArgumentTypeError:
+                    pass
+
+            # Get microseconds per call
+            usec = _time_per_call(convert, number=100000)
+
+            # Print result
+            print('  {0:<20} {1:<13} {2:>8.3f} us/call'.format(
+                converter.__name__, repr(text), usec
+            ))
+
+
+def benchmark_ensure_spec_depth():
+    """
+    Benchmark `ensure_spec` with specs of increasing nesting depth.
+
+    The time per node should stay flat regardless of depth.
+
+    :return: None.
+    """
+    # Print header
+    print('ensure_spec: nested Argument/AllOf spec')
+
+    # For each depth
+    for depth in (1, 10, 100, 1000, 10000):
+        # Create the innermost spec
+        spec = '-{0}'.format(depth)
+
+        # For each level, from inner to outer
+        for index in reversed(range(depth)):
+            # Wrap the spec
+            spec = Argument('-{0}'.format(index), AllOf(spec))
+
+        # Create argument list
+        args = ['-{0}'.format(index) for index in range(depth + 1)]
+
+        # Get microseconds per call
+        usec = _time_per_call(
+            lambda: ensure_spec(spec=spec, args=args),
+            number=max(1, 10000 // depth),
+        )
+
+        # Print result.
+        #
+        # Each level has two nodes, Argument and AllOf.
+        print('  depth={0:<6} {1:>12.2f} us/call {2:>8.3f} us/node'.format(
+            depth, usec, usec / (depth * 2 + 1)
+        ))
+
+
+def benchmark_name_cache():
+    """
+    Benchmark `ensure_spec`'s bitmask engine with string specs of many \
+        distinct argument names, cycled in order.
+
+    With more names than the cache size, cycling evicts every name before \
+        its next use, so every call compiles.
+
+    :return: None.
+    """
+    # Print header
+    print('ensure_spec: bitmask engine, distinct string specs cycled')
+
+    # Get cache size
+    maxsize = name_cache_info().maxsize
+
+    # For each distinct name count
+    for count in (10, 100, maxsize, maxsize + 1, 10000):
+        # Get argument names
+        arg_name_s = ['--name-{0}'.format(x) for x in range(count)]
+
+        # Create argument list
+        args = ['--name-0', 'input']
+
+        def ensure_all():
+            for arg_name in arg_name_s:
+                try:
+                    ensure_spec(arg_name, args, engine='bitmask')
+                except SpecViolationError:
+                    pass
+
+        # Clear caches
+        clear_caches()
+
+        # Get microseconds per call
+        usec = _time_per_call(ensure_all, number=max(1, 10000 // count))
+
+        # Get cache statistics
+        info = name_cache_info()
+
+        # Print result
+        print('  names={0:<6} {1:>8.2f} us/call  hit rate {2:>6.1%}'.format(
+            count, usec / count, info.hits / float(info.hits + info.misses)
+        ))
+
+
+def benchmark_name_trie():
+    """
+    Benchmark finding which of a spec's argument names exist in an argument \
+        list, by testing each name, by ArgIndex, and by NameTrie.
+
+    :return: None.
+    """
+    # Print header
+    print('presence: all existing names of a spec')
+
+    # For each name count and argument count
+    for name_count, arg_count in ((10, 100), (100, 1000), (1000, 1000)):
+        # Get argument names
+        name_s = ['--option-{0}'.format(x) for x in range(name_count)]
+
+        # Get argument list, with every other name given a value
+        args = [
+            '--option-{0}=value'.format(x) if x % 2 else 'input-{0}'.format(x)
+            for x in range(arg_count)
+        ]
+
+        # Create NameTrie object
+        trie = NameTrie(name_s)
+
+        def find_by_arg_index(name_s, args):
+            arg_index = ArgIndex(args)
+
+            return [x for x in name_s if x in arg_index]
+
+        # For each way's description and the function
+        for desc, func in (
+            (
+                'argument_exists each',
+                lambda: [x for x in name_s if argument_exists(x, args)],
+            ),
+            ('ArgIndex', lambda: find_by_arg_index(name_s, args)),
+            ('NameTrie.find', lambda: trie.find(args)),
+        ):
+            # Get microseconds per call
+            usec = _time_per_call(func, number=max(1, 100000 // (
+                name_count * arg_count // 10
+            )))
+
+            # Print result
+            print('  names={0:<5} args={1:<5} {2:<21} {3:>10.1f} us'.format(
+                name_count, arg_count, desc, usec
+            ))
+
+
+def benchmark_response_file():
+    """
+    Benchmark indexing arguments of a response file with large argument \
+        values, by `ArgIndex.from_args`, and by expanding the file as \
+        `argparse` does then creating ArgIndex.
+
+    :return: None.
+    """
+    # Print header
+    print('ArgIndex: response file with large argument values')
+
+    # Create temporary directory
+    dir_path = tempfile.mkdtemp()
+
+    try:
+        # For each value size in megabytes
+        for value_mb in (1, 10, 50):
+            # Get response file path
+            path = os.path.join(dir_path, 'args.txt')
+
+            # Write response file of options and large values
+            with open(path, 'wb') as file_obj:
+                for index in range(10):
+                    file_obj.write('--option-{0}\n'.format(index).encode())
+
+                    file_obj.write(b'x' * (value_mb * 100000) + b'\n')
+
+                    file_obj.write('--data-{0}='.format(index).encode())
+
+                    file_obj.write(b'y' * (value_mb * 100000) + b'\n')
+
+            # Get argument list
+            args = ['@' + path]
+
+            # Create parser that expands response files
+            parser = ArgumentParser(fromfile_prefix_chars='@')
+
+            # For each way's description and the function
+            for desc, func in (
+                ('argparse + ArgIndex', lambda: ArgIndex(
+                    parser._read_args_from_files(args)
+                )),
+                ('ArgIndex.from_args', lambda: ArgIndex.from_args(args)),
+            ):
+                # Start tracing memory allocation
+                tracemalloc.start()
+
+                # Get microseconds per call
+                usec = _time_per_call(func, number=1)
+
+                # Get peak memory
+                peak = tracemalloc.get_traced_memory()[1]
+
+                # Stop tracing memory allocation
+                tracemalloc.stop()
+
+                # Print result
+                print(
+                    '  values={0:>3} MB {1:<20} {2:>10.0f} us'
+                    ' peak {3:>8.1f} MB'.format(
+                        value_mb * 2, desc, usec, peak / 1e6
+                    )
+                )
+
+    # Delete temporary directory
+    finally:
+        shutil.rmtree(dir_path)
+
+
+def benchmark_one_shot_args():
+    """
+    Benchmark `ensure_spec` with arguments from a generator, passed as is, \
+        and collected into a list first.
+
+    :return: None.
+    """
+    # Print header
+    print('ensure_spec: arguments from generator')
+
+    # Create spec
+    spec = Argument('-a', OneOf('-b', '--c=1'))
+
+    # For each argument count
+    for count in (1000, 100000):
+        # Create argument generator factory
+        def iter_args():
+            yield '-a'
+
+            for index in range(count):
+                yield '--value={0}'.format(index)
+
+            yield '--c=1'
+
+        # For each way's description and the function
+        for desc, func in (
+            ('list, walk', lambda: ensure_spec(spec, list(iter_args()))),
+            ('generator, walk', lambda: ensure_spec(spec, iter_args())),
+            ('generator, bitmask', lambda: ensure_spec(
+                spec, iter_args(), engine='bitmask'
+            )),
+        ):
+            # Start tracing memory allocation
+            tracemalloc.start()
+
+            # Get microseconds per call
+            usec = _time_per_call(func, number=3)
+
+            # Get peak memory
+            peak = tracemalloc.get_traced_memory()[1]
+
+            # Stop tracing memory allocation
+            tracemalloc.stop()
+
+            # Print result
+            print(
+                '  args={0:<7} {1:<19} {2:>10.0f} us'
+                ' peak {3:>8.3f} MB'.format(count, desc, usec, peak / 1e6)
+            )
+
+
+def benchmark_one_of_wide():
+    """
+    Benchmark `ensure_spec` with OneOf specs of many sub specs.
+
+    :return: None.
+    """
+    # Print header
+    print('ensure_spec: wide OneOf spec')
+
+    # For each sub spec count
+    for count in (2, 10, 50, 200):
+        # Create spec
+        spec = OneOf(*['--format-{0}'.format(x) for x in range(count)])
+
+        # For each argument list's description and the argument list
+        for desc, args in (
+            ('first found', ['--format-0', 'input']),
+            ('last found', ['--format-{0}'.format(count - 1), 'input']),
+        ):
+            # Get microseconds per call
+            usec = _time_per_call(
+                lambda: ensure_spec(spec=spec, args=args), number=20000
+            )
+
+            # Print result
+            print('  count={0:<4} {1:<12} {2:>8.2f} us/call'.format(
+                count, desc, usec
+            ))
+
+
+def benchmark_violation_error():
+    """
+    Benchmark the cost of spec violation errors, with and without reading \
+        the error message.
+
+    :return: None.
+    """
+    # Print header
+    print('ensure_spec: violation error message cost')
+
+    # For each spec's description and the spec
+    for desc, spec in (
+        ('Argument', Argument('-f', '-g')),
+        ('OneOf', OneOf(*['--format-{0}'.format(x) for x in range(10)])),
+        ('AllOf', AllOf(*['--input-{0}'.format(x) for x in range(10)])),
+    ):
+        # Create argument list that violates the spec
+        args = ['-f']
+
+        def catch_only():
+            try:
+                ensure_spec(spec=spec, args=args)
+            except SpecViolationError:
+                pass
+
+        def catch_and_read():
+            try:
+                ensure_spec(spec=spec, args=args)
+            except SpecViolationError as e:
+                return e.args[0]
+
+        # For each way's description and the function
+        for way, func in (
+            ('catch only', catch_only),
+            ('read args[0]', catch_and_read),
+            ('validate', lambda: validate(spec=spec, args=args)),
+        ):
+            # Get microseconds per call
+            usec = _time_per_call(func, number=20000)
+
+            # Print result
+            print('  {0:<9} {1:<13} {2:>8.2f} us/call'.format(
+                desc, way, usec
+            ))
+
+
+def main(args=None):
+    """
+    Run benchmarks.
+
+    :param args: Benchmark names. Default is command line arguments. Run all \
+        benchmarks if empty.
+
+    :return: None.
+    """
+    # If benchmark names are not given
+    if args is None:
+        # Use command line arguments
+        args = sys.argv[1:]
+
+    # Get benchmark name prefix
+    prefix = 'benchmark_'
+
+    # Get all benchmark names
+    all_name_s = sorted(
+        key[len(prefix):] for key in globals() if key.startswith(prefix)
+    )
+
+    # For each benchmark name
+    for name in args or all_name_s:
+        # If the benchmark name is not valid
+        if name not in all_name_s:
+            # Get error message
+            msg = 'Unknown benchmark {0}. Expected one of {1}.'.format(
+                repr(name), repr(all_name_s)
+            )
+
+            # Raise error
+            raise ValueError(msg)
+
+        # Run the benchmark
+        globals()[prefix + name]()
+
+
+# If this module is run as script
+if __name__ == '__main__':
+    # Run benchmarks
+    main()
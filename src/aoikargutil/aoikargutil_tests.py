@@ -5,31 +5,73 @@ This module contains tests.
 from __future__ import absolute_import
 
 # Standard imports
+from argparse import ArgumentParser
 from argparse import ArgumentTypeError
+from array import array
+import gc
+from itertools import combinations
+import mmap
+import pickle
+import random
+import sys
+import weakref
 
 # External imports
 import pytest
 
 # Local imports
+from . import aoikargutil as aoikargutil_module
 from .aoikargutil import AllOf
+from .aoikargutil import ArgIndex
 from .aoikargutil import Argument
+from .aoikargutil import BaseSpec
+from .aoikargutil import NameTrie
 from .aoikargutil import OneOf
 from .aoikargutil import Option
+from .aoikargutil import RangeSet
+from .aoikargutil import SpecViolation
 from .aoikargutil import SpecViolationError
+from .aoikargutil import _compiled_spec_cache
+from .aoikargutil import _index_known_names
+from .aoikargutil import _index_response_file_args
+from .aoikargutil import _spec_tree_arg_names
 from .aoikargutil import argument_exists
 from .aoikargutil import bool_0or1
+from .aoikargutil import bool_converter
+from .aoikargutil import bool_on_off
+from .aoikargutil import bool_true_false
+from .aoikargutil import bool_yes_no
+from .aoikargutil import cached_converter
+from .aoikargutil import chain
+from .aoikargutil import check_spec
+from .aoikargutil import choice_of
+from .aoikargutil import clear_caches
+from .aoikargutil import compile_spec
 from .aoikargutil import ensure_argument_name
 from .aoikargutil import ensure_spec
+from .aoikargutil import duration_seconds_gt0
+from .aoikargutil import ensure_spec_many
 from .aoikargutil import float_ge0
 from .aoikargutil import float_gt0
 from .aoikargutil import float_le0
+from .aoikargutil import float_list_gt0
 from .aoikargutil import float_lt0
+from .aoikargutil import float_range
 from .aoikargutil import int_ge0
 from .aoikargutil import int_gt0
 from .aoikargutil import int_le0
+from .aoikargutil import int_list_ge0
 from .aoikargutil import int_lt0
+from .aoikargutil import int_range
+from .aoikargutil import int_ranges_ge0
+from .aoikargutil import iter_violations
+from .aoikargutil import list_of
+from .aoikargutil import name_cache_info
+from .aoikargutil import size_bytes_ge0
+from .aoikargutil import str_list_strip_nonempty
 from .aoikargutil import str_nonempty
 from .aoikargutil import str_strip_nonempty
+from .aoikargutil import validate
 
 
 def test_str_nonempty():
@@ -133,6 +175,146 @@ def test_bool_0or1():
     assert exc_info.value.args[0] == "Expected '0' or '1'. Got: 'False'."
 
 
+def test_bool_converter():
+    """
+    Test `bool_converter`.
+    """
+    #
+    for text in ('yes', 'YES', 'Yes'):
+        assert bool_yes_no(text) is True
+
+    for text in ('no', 'NO', 'nO'):
+        assert bool_yes_no(text) is False
+
+    for text in ('y', ' yes', '', None):
+        with pytest.raises(ArgumentTypeError) as exc_info:
+            bool_yes_no(text)
+
+        assert exc_info.value.args[0] == \
+            "Expected 'no' or 'yes'. Got: {0}.".format(repr(text))
+
+    #
+    assert bool_true_false('True') is True
+
+    assert bool_true_false('FALSE') is False
+
+    assert bool_on_off('On') is True
+
+    assert bool_on_off('off') is False
+
+    #
+    converter = bool_converter(['1', 'y', 'Yes'], ['0', 'n', 'No'])
+
+    assert converter('YES') is True
+
+    assert converter('N') is False
+
+    with pytest.raises(ArgumentTypeError) as exc_info:
+        converter('2')
+
+    assert exc_info.value.args[0] == \
+        "Expected '0', '1', 'No', 'Yes', 'n' or 'y'. Got: '2'."
+
+    #
+    converter = bool_converter(['Y'], ['N'], casefold=False)
+
+    assert converter('Y') is True
+
+    with pytest.raises(ArgumentTypeError) as exc_info:
+        converter('y')
+
+    assert exc_info.value.args[0] == "Expected 'N' or 'Y'. Got: 'y'."
+
+    #
+    for true_set, false_set in ((['y'], ['y']), (['y'], ['Y'])):
+        with pytest.raises(ValueError):
+            bool_converter(true_set, false_set)
+
+    #
+    assert bool_converter(['y'], ['Y'], casefold=False)('Y') is False
+
+    #
+    assert bool_0or1.__name__ == 'bool_0or1'
+
+    with pytest.raises(ArgumentTypeError) as exc_info:
+        bool_0or1(None)
+
+    assert exc_info.value.args[0] == "Expected '0' or '1'. Got: None."
+
+
+def test_choice_of():
+    """
+    Test `choice_of`.
+    """
+    #
+    converter = choice_of(['json', 'yaml', 'toml'])
+
+    assert converter('yaml') == 'yaml'
+
+    #
+    for text in ('YAML', '', None):
+        with pytest.raises(ArgumentTypeError) as exc_info:
+            converter(text)
+
+        assert exc_info.value.args[0] == \
+            "Expected 'json', 'yaml' or 'toml'. Got: {0}.".format(repr(text))
+
+    #
+    converter = choice_of(['Json', 'YAML', 'json'], casefold=True)
+
+    assert converter('JSON') == 'Json'
+
+    assert converter('yaml') == 'YAML'
+
+    #
+    region_s = [
+        '{0}-{1}-{2}'.format(area, direction, number)
+        for area in ('us', 'eu', 'ap', 'sa')
+        for direction in ('east', 'west', 'north', 'south', 'central')
+        for number in range(1, 6)
+    ]
+
+    converter = choice_of(region_s)
+
+    assert converter('eu-west-3') == 'eu-west-3'
+
+    #
+    with pytest.raises(ArgumentTypeError) as exc_info:
+        converter('eu-wst-3')
+
+    assert exc_info.value.args[0].startswith(
+        "Expected one of 100 values. Got: 'eu-wst-3'."
+        " Did you mean 'eu-west-3', "
+    )
+
+    #
+    with pytest.raises(ArgumentTypeError) as exc_info:
+        converter('###')
+
+    assert exc_info.value.args[0] == "Expected one of 100 values. Got: '###'."
+
+    #
+    with pytest.raises(ArgumentTypeError) as exc_info:
+        converter(None)
+
+    assert exc_info.value.args[0] == "Expected one of 100 values. Got: None."
+
+    #
+    converter = choice_of([x.upper() for x in region_s], casefold=True)
+
+    with pytest.raises(ArgumentTypeError) as exc_info:
+        converter('us-centrl-1')
+
+    assert exc_info.value.args[0].startswith(
+        "Expected one of 100 values. Got: 'us-centrl-1'."
+        " Did you mean 'US-CENTRAL-1', "
+    )
+
+    #
+    with pytest.raises(ValueError):
+        choice_of([])
+
+
 def test_int_lt0():
     """
     Test `int_lt0`.
@@ -365,221 +547,2386 @@ def test_float_ge0():
     assert exc_info.value.args[0] == "Expected a float >=0. Got: 'NaN'."
 
 
-def test_argument_exists():
+def test_int_range():
     """
-    Test `argument_exists`.
+    Test `int_range`.
     """
-    assert argument_exists('-a', []) is False
+    #
+    port = int_range(lo=1, hi=65535)
 
-    assert argument_exists('-a', ['-b']) is False
+    assert port.__name__ == 'int_range(lo=1, hi=65535)'
 
-    assert argument_exists('-a', ['--a']) is False
+    assert port('1') == 1
 
-    assert argument_exists('--a', ['-a']) is False
+    assert port('65535') == 65535
 
-    assert argument_exists('-a', ['-a']) is True
+    #
+    for text in ('0', '65536', '1.5', '', None):
+        with pytest.raises(ArgumentTypeError) as exc_info:
+            port(text)
 
-    assert argument_exists('--a', ['--a']) is True
+        assert exc_info.value.args[0] == (
+            'Expected an integer >=1 and <=65535. Got: {0}.'
+        ).format(repr(text))
 
+    #
+    percent = int_range(lo=0, hi=100, lo_incl=False, hi_incl=False)
+
+    assert percent('1') == 1
+
+    assert percent('99') == 99
+
+    for text in ('0', '100'):
+        with pytest.raises(ArgumentTypeError) as exc_info:
+            percent(text)
+
+        assert exc_info.value.args[0] == \
+            'Expected an integer >0 and <100. Got: {0}.'.format(repr(text))
 
-def test_ensure_argument_name():
-    """
-    Test `ensure_argument_name`.
-    """
     #
-    ensure_argument_name(arg_name='-a', args=['-a'])
+    assert int_range()('-123') == -123
+
+    with pytest.raises(ArgumentTypeError) as exc_info:
+        int_range()('x')
+
+    assert exc_info.value.args[0] == "Expected an integer. Got: 'x'."
 
     #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_argument_name(arg_name='-a', args=[])
+    assert int_ge0.__name__ == 'int_ge0'
 
-    assert exc_info.value.args[0] == "Require argument '-a'."
+    assert int_ge0.__doc__.startswith(
+        'Convert given argument text to integer and ensure the integer is >=0.'
+    )
 
     #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_argument_name(arg_name='-a', args=[], depending='-b')
+    with pytest.raises(ValueError) as exc_info:
+        int_range(lo=1, hi=0)
 
-    assert exc_info.value.args[0] == "Argument '-b' requires argument '-a'."
+    assert exc_info.value.args[0] == 'Expected lo <= hi. Got: lo=1, hi=0.'
 
 
-def test_ensure_string_spec():
+def test_float_range():
     """
-    Test ensure string spec.
+    Test `float_range`.
     """
     #
-    ensure_spec(spec='-a', args=['-a'])
+    ratio = float_range(lo=0, hi=1, hi_incl=False)
+
+    assert ratio.__name__ == 'float_range(lo=0, hi=1, hi_incl=False)'
+
+    assert ratio('0') == 0
+
+    assert ratio('0.5') == 0.5
 
     #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_spec(spec='-a', args=[])
+    for text in ('1', '-0.1', 'NaN', 'inf', 'x'):
+        with pytest.raises(ArgumentTypeError) as exc_info:
+            ratio(text)
 
-    assert exc_info.value.args[0] == "Require argument '-a'."
+        assert exc_info.value.args[0] == \
+            'Expected a float >=0 and <1. Got: {0}.'.format(repr(text))
 
     #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_spec(spec='-a', args=[], depending='-b')
+    for converter in (
+        float_range(lo=0),
+        float_range(lo=0, lo_incl=False),
+        float_range(hi=0),
+        float_range(hi=0, hi_incl=False),
+        float_range(lo=0, hi=1, lo_incl=False),
+        float_range(lo=0, hi=1, lo_incl=False, hi_incl=False),
+    ):
+        with pytest.raises(ArgumentTypeError):
+            converter('NaN')
 
-    assert exc_info.value.args[0] == "Argument '-b' requires argument '-a'."
+    #
+    assert float_range()('NaN') != float_range()('NaN')
 
 
-def test_ensure_argument_spec():
+def test_range_converter_many():
     """
-    Test ensure Argument spec.
+    Test range converters' bulk variant `many`.
     """
     #
-    ensure_spec(spec=Argument('-a'), args=['-a'])
+    value_s = int_ge0.many(['0', '1', '2'])
 
-    ensure_spec(spec=Argument('-a', '-b'), args=['-a', '-b'])
+    assert isinstance(value_s, array)
 
-    #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_spec(spec=Argument('-a'), args=[])
+    assert value_s.tolist() == [0, 1, 2]
 
-    assert exc_info.value.args[0] == "Require argument '-a'."
+    assert value_s.itemsize == 8
 
     #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_spec(spec=Argument('-a', '-b'), args=['-a'])
+    assert int_ge0.many(iter(['3', '4'])).tolist() == [3, 4]
 
-    assert exc_info.value.args[0] == "Argument '-a' requires argument '-b'."
+    assert int_ge0.many([]).tolist() == []
 
     #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_spec(
-            spec=Argument('-a', Argument('-b', '-c')), args=['-a', '-b']
-        )
+    for text_s, bad_text in (
+        (['5', 'x', '-1'], 'x'),
+        (['5', '-1', 'x'], '-1'),
+        (['5', '6', '-7'], '-7'),
+    ):
+        with pytest.raises(ArgumentTypeError) as exc_info:
+            int_ge0.many(text_s)
 
-    assert exc_info.value.args[0] == "Argument '-b' requires argument '-c'."
+        assert exc_info.value.args[0] == \
+            'Expected an integer >=0. Got: {0}.'.format(repr(bad_text))
 
     #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_spec(spec=Argument('-a', OneOf('-b', '-c')), args=['-a'])
+    with pytest.raises(ArgumentTypeError) as exc_info:
+        int_range(lo=0, hi=10).many(['5', '11', '-1'])
 
     assert exc_info.value.args[0] == \
-        "Argument '-a' requires exact one of arguments ['-b', '-c']. Got none."
+        "Expected an integer >=0 and <=10. Got: '11'."
 
     #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_spec(spec=Argument('-a', AllOf('-b', '-c')), args=['-a'])
+    with pytest.raises(ArgumentTypeError) as exc_info:
+        int_ge0.many(['1', str(2 ** 64)])
 
     assert exc_info.value.args[0] == \
-        "Argument '-a' requires all of arguments ['-b', '-c']."
+        "Expected 64-bit integer. Got: '{0}'.".format(2 ** 64)
 
+    #
+    value_s = float_gt0.many(['0.5', '1', 'inf'])
+
+    assert value_s.typecode == 'd'
+
+    assert value_s.tolist() == [0.5, 1.0, float('inf')]
 
-def test_ensure_option_spec():
-    """
-    Test ensure Option spec.
-    """
     #
-    ensure_spec(spec=Option('-a'), args=[])
+    for text_s in (['1', 'NaN', '2'], ['NaN', '1'], ['1', 'NaN']):
+        with pytest.raises(ArgumentTypeError) as exc_info:
+            float_gt0.many(text_s)
+
+        assert exc_info.value.args[0] == "Expected a float >0. Got: 'NaN'."
 
     #
-    ensure_spec(spec=Option('-a'), args=['-a'])
+    with pytest.raises(ArgumentTypeError) as exc_info:
+        float_le0.many(['-1', '0', '0.1'])
+
+    assert exc_info.value.args[0] == "Expected a float <=0. Got: '0.1'."
 
     #
-    ensure_spec(spec=Option('-a', '-b'), args=[])
+    for converter in (int_lt0, int_le0, int_gt0, int_ge0):
+        for text_s in (['-2', '-1', '0', '1', '2'], ['-1', '1'], ['0']):
+            try:
+                expected = [converter(x) for x in text_s]
+            except ArgumentTypeError as e:
+                with pytest.raises(ArgumentTypeError) as exc_info:
+                    converter.many(text_s)
 
+                assert exc_info.value.args == e.args
+            else:
+                assert converter.many(text_s).tolist() == expected
+
+
+def test_list_of():
+    """
+    Test `list_of`.
+    """
     #
-    ensure_spec(spec=Option('-a', '-b'), args=['-a', '-b'])
+    value_s = int_list_ge0('3,1, 2,1')
+
+    assert value_s.typecode == array('q').typecode
+
+    assert value_s.tolist() == [3, 1, 2, 1]
 
     #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_spec(spec=Option('-a', '-b'), args=['-a'])
+    with pytest.raises(ArgumentTypeError) as exc_info:
+        int_list_ge0('1,-2,x')
 
-    assert exc_info.value.args[0] == "Argument '-a' requires argument '-b'."
+    assert exc_info.value.args[0] == "Expected an integer >=0. Got: '-2'."
 
     #
-    ensure_spec(spec=Option('-a', Option('-b', '-c')), args=['-a'])
+    with pytest.raises(ArgumentTypeError) as exc_info:
+        int_list_ge0('1,,2')
+
+    assert exc_info.value.args[0] == "Expected an integer >=0. Got: ''."
 
     #
-    ensure_spec(spec=Option('-a', Option('-b', '-c')), args=['-b'])
+    assert float_list_gt0('0.5,1').tolist() == [0.5, 1.0]
+
+    with pytest.raises(ArgumentTypeError) as exc_info:
+        float_list_gt0('0.5,0')
+
+    assert exc_info.value.args[0] == "Expected a float >0. Got: '0'."
 
     #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_spec(spec=Option('-a', Option('-b', '-c')), args=['-a', '-b'])
+    assert str_list_strip_nonempty(' a ,b,a') == ['a', 'b', 'a']
 
-    assert exc_info.value.args[0] == "Argument '-b' requires argument '-c'."
+    with pytest.raises(ArgumentTypeError) as exc_info:
+        str_list_strip_nonempty('a, ,b')
+
+    assert exc_info.value.args[0] == \
+        "Expected a non-empty and non-whitespace-only string. Got: ' '."
 
     #
-    ensure_spec(spec=Option('-a', OneOf('-b', '-c')), args=[])
+    converter = list_of(int_ge0, delimiter=':', dedupe=True)
+
+    assert converter.__name__ == "list_of(int_ge0, delimiter=':', dedupe=True)"
+
+    assert converter('3:1:3:2:1').tolist() == [3, 1, 2]
 
     #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_spec(spec=Option('-a', OneOf('-b', '-c')), args=['-a'])
+    converter = list_of(str_strip_nonempty, dedupe=True)
 
-    assert exc_info.value.args[0] == \
-        "Argument '-a' requires exact one of arguments ['-b', '-c']. Got none."
+    assert converter('b,a, b') == ['b', 'a']
 
     #
-    ensure_spec(spec=Option('-a', AllOf('-b', '-c')), args=[])
+    assert int_list_ge0.__name__ == 'int_list_ge0'
 
     #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_spec(spec=Option('-a', AllOf('-b', '-c')), args=['-a'])
+    with pytest.raises(ValueError) as exc_info:
+        list_of(int_ge0, delimiter='')
 
-    assert exc_info.value.args[0] == \
-        "Argument '-a' requires all of arguments ['-b', '-c']."
+    assert exc_info.value.args[0] == 'Expected a non-empty delimiter.'
 
+    # Texts longer than a split chunk, and delimiters whose occurrences may
+    # overlap
+    for delimiter in (',', ';:', ',,', 'aba'):
+        # Get items
+        item_s = [str(x) for x in range(20000)] + ['', 'a', 'ab', ',', ';']
 
-def test_ensure_oneof_spec():
+        # Get argument text
+        text = delimiter.join(item_s)
+
+        assert list_of(str, delimiter=delimiter)(text) == \
+            text.split(delimiter)
+
+    text = ','.join(str(x) for x in range(20000)) + ',-1,x'
+
+    with pytest.raises(ArgumentTypeError) as exc_info:
+        int_list_ge0(text)
+
+    assert exc_info.value.args[0] == "Expected an integer >=0. Got: '-1'."
+
+    #
+    for converter in (
+        int_list_ge0, str_list_strip_nonempty,
+        list_of(int_ge0, dedupe=True), list_of(str, dedupe=True),
+    ):
+        for text in (None, 12):
+            with pytest.raises(ArgumentTypeError) as exc_info:
+                converter(text)
+
+            assert exc_info.value.args[0] == (
+                "Expected a list delimited by ','. Got: {0}."
+            ).format(repr(text))
+
+
+def test_cached_converter():
     """
-    Test ensure OneOf spec.
+    Test `cached_converter`.
     """
+    # Argument texts passed to the converter
+    text_s = []
+
+    def int_ge0_spy(text):
+        text_s.append(text)
+
+        return int_ge0(text)
+
     #
-    ensure_spec(spec=OneOf('-a', Argument('-b')), args=['-a'])
+    converter = cached_converter(int_ge0_spy, maxsize=2)
 
-    ensure_spec(spec=OneOf('-a', Argument('-b')), args=['-b'])
+    assert converter.__name__ == 'int_ge0_spy'
+
+    assert converter('1') == 1
+
+    assert converter('1') == 1
+
+    assert text_s == ['1']
+
+    assert converter.cache_info() == (1, 1, 2, 1)
 
     #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_spec(spec=OneOf('-a', '-b'), args=['-c'])
+    for _ in range(2):
+        with pytest.raises(ArgumentTypeError) as exc_info:
+            converter('-1')
 
-    assert exc_info.value.args[0] == \
-        "Require exact one of arguments ['-a', '-b']. Got none."
+        assert exc_info.value.args[0] == "Expected an integer >=0. Got: '-1'."
+
+    assert text_s == ['1', '-1']
+
+    assert converter.cache_info() == (2, 2, 2, 2)
 
     #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_spec(spec=OneOf('-a', '-b'), args=['-a', '-b'])
+    assert converter('2') == 2
 
-    assert exc_info.value.args[0] == \
-        "Require exact one of arguments ['-a', '-b']. Got '-a' and '-b'."
+    assert converter('2') == 2
+
+    assert text_s == ['1', '-1', '2']
+
+    assert converter('1') == 1
+
+    assert text_s == ['1', '-1', '2', '1']
+
+    with pytest.raises(ArgumentTypeError):
+        converter('-1')
+
+    assert text_s == ['1', '-1', '2', '1', '-1']
 
     #
-    with pytest.raises(TypeError) as exc_info:
-        ensure_spec(spec=OneOf(OneOf('-a')), args=[])
+    converter.cache_clear()
 
-    assert exc_info.value.args[0] == \
-        "Expected string or Argument object. Got OneOf('-a')."
+    assert converter.cache_info() == (0, 0, 2, 0)
 
     #
-    with pytest.raises(TypeError) as exc_info:
-        ensure_spec(spec=OneOf(AllOf('-a')), args=[])
+    parser = ArgumentParser()
 
-    assert exc_info.value.args[0] == \
-        "Expected string or Argument object. Got AllOf('-a')."
+    parser.add_argument('-a', type=cached_converter(int))
 
+    def parser_error(msg):
+        raise RuntimeError(msg)
 
-def test_ensure_allof_spec():
+    parser.error = parser_error
+
+    with pytest.raises(RuntimeError) as exc_info:
+        parser.parse_args(['-a', 'x'])
+
+    assert exc_info.value.args[0] == "argument -a: invalid int value: 'x'"
+
+    #
+    with pytest.raises(ValueError):
+        cached_converter(int_ge0, maxsize=0)
+
+
+def test_size_bytes_ge0():
     """
-    Test ensure AllOf spec.
+    Test `size_bytes_ge0`.
     """
     #
-    ensure_spec(spec=AllOf('-a', '-b'), args=['-a', '-b'])
+    assert size_bytes_ge0('0') == 0
 
-    #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_spec(spec=AllOf('-a', '-b'), args=[])
+    assert size_bytes_ge0('512MiB') == 512 * 1024 ** 2
 
-    assert exc_info.value.args[0] == "Require all of arguments ['-a', '-b']."
+    assert size_bytes_ge0('1.5G') == 3 * 1024 ** 3 // 2
+
+    assert size_bytes_ge0(' 10 KB ') == 10000
+
+    assert size_bytes_ge0('2kB') == 2000
+
+    assert size_bytes_ge0('1EiB') == 1024 ** 6
+
+    assert size_bytes_ge0('0.001KB') == 1
 
     #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_spec(spec=AllOf('-a', '-b'), args=['-a'])
+    for text in (
+        '', '-1', '1.5B', '0.0001KB', '1e3', '1 MiBs', 'MiB', None,
+        '9' * 5000, '1.' + '0' * 5000 + 'K',
+    ):
+        with pytest.raises(ArgumentTypeError) as exc_info:
+            size_bytes_ge0(text)
 
-    assert exc_info.value.args[0] == "Require all of arguments ['-a', '-b']."
+        assert exc_info.value.args[0] == \
+            'Expected a size in bytes >=0. Got: {0}.'.format(repr(text))
 
     #
-    with pytest.raises(SpecViolationError) as exc_info:
-        ensure_spec(spec=AllOf('-a', '-b'), args=['-b'])
+    rand = random.Random(0)
+
+    for _ in range(1000):
+        # Get random byte count and unit
+        number = rand.randint(0, 10 ** rand.randint(0, 12))
+
+        unit, multiplier = rand.choice([
+            ('', 1), ('B', 1), ('K', 1024), ('KB', 1000), ('KiB', 1024),
+            ('m', 1024 ** 2), ('MB', 1000 ** 2), ('GiB', 1024 ** 3),
+            ('T', 1024 ** 4), ('PB', 1000 ** 5),
+        ])
+
+        assert size_bytes_ge0('{0}{1}'.format(number, unit)) == \
+            number * multiplier
+
+        # Get decimal text of the byte count in the unit, if exact
+        if unit and multiplier % 1000 == 0:
+            text = '{0}.{1:03d}{2}'.format(
+                number // 1000, number % 1000, unit
+            )
+
+            assert size_bytes_ge0(text) == number * multiplier // 1000
+
+
+def test_duration_seconds_gt0():
+    """
+    Test `duration_seconds_gt0`.
+    """
+    #
+    assert duration_seconds_gt0('1h30m') == 5400
+
+    assert duration_seconds_gt0('90') == 90
+
+    assert duration_seconds_gt0(' 90s ') == 90
+
+    assert duration_seconds_gt0('1.5d') == 129600
+
+    assert duration_seconds_gt0('500ms') == 0.5
+
+    assert duration_seconds_gt0('1w2d3h4m5s6ms') == \
+        604800 + 2 * 86400 + 3 * 3600 + 4 * 60 + 5 + 0.006
+
+    #
+    for text in (
+        '', '0', '0s', '-1s', '1h30', '1 h', 'h', '1.h', None, '9' * 400,
+        '1s' + '9' * 400 + 'w',
+    ):
+        with pytest.raises(ArgumentTypeError) as exc_info:
+            duration_seconds_gt0(text)
+
+        assert exc_info.value.args[0] == \
+            'Expected a duration in seconds >0. Got: {0}.'.format(repr(text))
+
+    #
+    rand = random.Random(0)
+
+    for _ in range(1000):
+        # Get random duration components
+        component_s = [
+            (rand.randint(0, 1000), unit)
+            for unit in ('w', 'd', 'h', 'm', 's', 'ms')
+            if rand.random() < 0.5
+        ] or [(1, 's')]
+
+        # Get argument text
+        text = ''.join('{0}{1}'.format(*x) for x in component_s)
+
+        # Get expected seconds
+        seconds = sum(
+            number * {
+                'w': 604800, 'd': 86400, 'h': 3600, 'm': 60, 's': 1,
+                'ms': 0.001,
+            }[unit]
+            for number, unit in component_s
+        )
+
+        # If the duration is >0
+        if seconds > 0:
+            assert duration_seconds_gt0(text) == pytest.approx(seconds)
+
+        # If the duration is 0
+        else:
+            with pytest.raises(ArgumentTypeError):
+                duration_seconds_gt0(text)
+
+
+def test_int_ranges_ge0():
+    """
+    Test `int_ranges_ge0` and `RangeSet`.
+    """
+    #
+    range_set = int_ranges_ge0('2048-4095, 0-1023,1024,5')
+
+    assert repr(range_set) == "RangeSet('0-1024,2048-4095')"
+
+    assert range_set.ranges == (range(0, 1025), range(2048, 4096))
+
+    assert len(range_set) == 1025 + 2048
+
+    #
+    for value in (0, 5, 1024, 2048, 3000, 4095):
+        assert value in range_set
+
+    for value in (-1, 1025, 2047, 4096, 1.5, '5', None):
+        assert value not in range_set
+
+    #
+    assert list(int_ranges_ge0('1,3,5-7,6')) == [1, 3, 5, 6, 7]
+
+    assert repr(int_ranges_ge0('3,1,2')) == "RangeSet('1-3')"
+
+    #
+    range_set = int_ranges_ge0('0-{0}'.format(10 ** 18 - 1))
+
+    assert len(range_set) == 10 ** 18
+
+    assert 10 ** 18 - 1 in range_set
+
+    assert 10 ** 18 not in range_set
+
+    #
+    assert int_ranges_ge0('0-9') == RangeSet([range(5, 10), range(0, 5)])
+
+    assert int_ranges_ge0('0-9') != RangeSet([range(0, 9)])
+
+    #
+    for text, item in (
+        ('', ''),
+        ('5-3', '5-3'),
+        ('1,,2', ''),
+        ('0--1', '0--1'),
+        ('-1', '-1'),
+        ('1,x', 'x'),
+        (None, None),
+    ):
+        with pytest.raises(ArgumentTypeError) as exc_info:
+            int_ranges_ge0(text)
+
+        assert exc_info.value.args[0] == \
+            'Expected an integer range >=0. Got: {0}.'.format(repr(item))
+
+    #
+    for range_obj in (
+        range(0, 10, 2), range(5, 0, -1), range(10 ** 20, 0, -1),
+    ):
+        with pytest.raises(ValueError) as exc_info:
+            RangeSet([range_obj])
+
+        assert exc_info.value.args[0] == \
+            'Expected range of step 1. Got: {0}.'.format(repr(range_obj))
+
+    assert len(RangeSet([range(5, 4, -1), range(7, 8)])) == 2
+
+    # Ranges of more integers than `len` supports
+    huge_range_s = [range(0, 10 ** 19), range(10 ** 20, 10 ** 20 + 1)]
+
+    huge_set = RangeSet(huge_range_s)
+
+    assert 10 ** 19 - 1 in huge_set
+
+    assert 10 ** 19 not in huge_set
+
+    assert repr(huge_set) == \
+        "RangeSet('0-{0},{1}')".format(10 ** 19 - 1, 10 ** 20)
+
+    assert huge_set == RangeSet(reversed(huge_range_s))
+
+    assert huge_set != RangeSet([range(0, 10 ** 19 + 1)])
+
+    with pytest.raises(OverflowError):
+        len(huge_set)
+
+    #
+    for text in (
+        '0-{0}'.format(sys.maxsize),
+        '0-10000000000000000000',
+        '0-{0},{1}'.format(sys.maxsize - 1, sys.maxsize + 1),
+    ):
+        with pytest.raises(ArgumentTypeError) as exc_info:
+            int_ranges_ge0(text)
+
+        assert exc_info.value.args[0] == (
+            'Expected integer ranges of at most {0} integers. Got: {1}.'
+        ).format(sys.maxsize, repr(text))
+
+    assert len(int_ranges_ge0('1-{0}'.format(sys.maxsize))) == sys.maxsize
+
+    # Integers of too many digits for `int`
+    text = '0-' + '9' * 5000
+
+    with pytest.raises(ArgumentTypeError) as exc_info:
+        int_ranges_ge0(text)
+
+    assert exc_info.value.args[0] == \
+        'Expected an integer range >=0. Got: {0}.'.format(repr(text))
+
+
+def test_chain():
+    """
+    Test `chain`.
+    """
+    def even(value):
+        if value % 2:
+            raise ArgumentTypeError(
+                'Expected an even integer. Got: {0}.'.format(value)
+            )
+
+        return value
+
+    #
+    converter = chain(str_strip_nonempty, int_gt0, even)
+
+    assert converter.__name__ == 'chain(str_strip_nonempty, int_gt0, even)'
+
+    assert converter(' 42 ') == 42
+
+    #
+    for text, msg in (
+        (
+            ' ',
+            "Expected a non-empty and non-whitespace-only string. Got: ' '.",
+        ),
+        (' 0 ', "Expected an integer >0. Got: '0'."),
+        (' 3 ', 'Expected an even integer. Got: 3.'),
+    ):
+        with pytest.raises(ArgumentTypeError) as exc_info:
+            converter(text)
+
+        assert exc_info.value.args[0] == msg
+
+    #
+    converter = chain(chain(str_strip_nonempty, int_gt0), chain(even))
+
+    assert converter.__name__ == 'chain(str_strip_nonempty, int_gt0, even)'
+
+    assert converter('8') == 8
+
+    #
+    parser = ArgumentParser()
+
+    parser.add_argument('-a', type=chain(str_strip_nonempty, int))
+
+    def parser_error(msg):
+        raise RuntimeError(msg)
+
+    parser.error = parser_error
+
+    with pytest.raises(RuntimeError) as exc_info:
+        parser.parse_args(['-a', 'x'])
+
+    assert exc_info.value.args[0] == \
+        "argument -a: invalid chain(str_strip_nonempty, int) value: 'x'"
+
+    #
+    with pytest.raises(ValueError):
+        chain()
+
+
+def test_arg_index_from_args(tmp_path, monkeypatch):
+    """
+    Test `ArgIndex.from_args` and `ensure_spec` with response files.
+    """
+    #
+    nested_path = tmp_path / 'nested.txt'
+
+    nested_path.write_text(u'-b\n')
+
+    empty_path = tmp_path / 'empty.txt'
+
+    empty_path.write_text(u'')
+
+    path = tmp_path / 'args.txt'
+
+    path.write_bytes(b''.join([
+        b'-a\r\n',
+        b'--data=' + b'x' * 100000 + b'\n',
+        b'y' * 100000 + b'\n',
+        b'@' + str(nested_path).encode('utf-8') + b'\n',
+        b'\n',
+        b'--k=v=w',
+    ]))
+
+    args = ['-c', '@' + str(path), '@' + str(empty_path), '--d=1']
+
+    #
+    arg_index = ArgIndex.from_args(args, max_name_len=100)
+
+    assert sorted(arg_index._names) == [
+        '', '--d', '--data', '--k', '-a', '-b', '-c',
+    ]
+
+    #
+    parser = ArgumentParser(fromfile_prefix_chars='@')
+
+    expanded_arg_s = parser._read_args_from_files(args)
+
+    for arg_name in (
+        '-a', '-b', '-c', '--d', '--data', '--k', '-', '--', '--dat', 'y',
+        '', '@',
+    ):
+        assert (arg_name in arg_index) is \
+            argument_exists(arg_name, expanded_arg_s)
+
+    # Argument names containing `=` are not indexed
+    for arg_name in ('--d=1', '--k=v', '='):
+        with pytest.raises(ValueError) as exc_info:
+            arg_name in arg_index
+
+        assert exc_info.value.args[0] == (
+            'Expected argument name without `=`. Got {0}.'
+        ).format(repr(arg_name))
+
+    #
+    with pytest.raises(ValueError) as exc_info:
+        'y' * 101 in arg_index
+
+    assert exc_info.value.args[0] == \
+        'Expected argument name of length <=100. Got length 101.'
+
+    #
+    spec = AllOf('-a', Argument('-b', '--data'), '--k=v')
+
+    for engine in ('walk', 'bitmask'):
+        ensure_spec(spec, args, fromfile_prefix_chars='@', engine=engine)
+
+        with pytest.raises(SpecViolationError) as exc_info:
+            ensure_spec(
+                Argument('-b', '-z'), args, fromfile_prefix_chars='@',
+                engine=engine,
+            )
+
+        assert exc_info.value.args[0] == \
+            "Argument '-b' requires argument '-z'."
+
+    #
+    with pytest.raises(SpecViolationError):
+        ensure_spec('-a', args)
+
+    #
+    loop_path = tmp_path / 'loop.txt'
+
+    loop_path.write_text(u'-a\n@' + str(loop_path))
+
+    with pytest.raises(ValueError) as exc_info:
+        ArgIndex.from_args(['@' + str(loop_path)])
+
+    assert exc_info.value.args[0] == \
+        'Response file {0} includes itself.'.format(repr(str(loop_path)))
+
+    #
+    with pytest.raises(IOError):
+        ArgIndex.from_args(['@' + str(tmp_path / 'missing.txt')])
+
+    #
+    arg_index = ArgIndex.from_args(
+        ['+' + str(nested_path), '@x'], fromfile_prefix_chars='+'
+    )
+
+    assert '-b' in arg_index
+
+    assert '@x' in arg_index
+
+    # Maximum argument name length counts characters, not bytes
+    name = u'--\u00e9' * 300
+
+    utf8_path = tmp_path / 'utf8.txt'
+
+    utf8_path.write_bytes((name + u'\n' + name + u'x=1\n').encode('utf-8'))
+
+    arg_index = ArgIndex.from_args(
+        ['@' + str(utf8_path)], encoding='utf-8', max_name_len=len(name)
+    )
+
+    assert name in arg_index
+
+    with pytest.raises(ValueError):
+        name + u'x' in arg_index
+
+    # Walk engine tests OneOf spec's argument names through the ArgIndex
+    # object, so the length limit applies
+    with pytest.raises(ValueError):
+        ensure_spec(OneOf('-a', '-b' * 60), ArgIndex.from_args(
+            ['-a'], max_name_len=100
+        ))
+
+    # `ensure_spec` stores only the spec's argument names
+    many_path = tmp_path / 'many.txt'
+
+    many_path.write_text(u'--ids\n' + u''.join(
+        u'{0}\n'.format(x) for x in range(1000)
+    ) + u''.join(u'--x{0}={1}\n'.format(x, u'=' * 1000) for x in range(20)))
+
+    arg_index = _index_response_file_args(
+        ['@' + str(many_path)], '@', None, 1024,
+        frozenset(_spec_tree_arg_names(Argument('--ids', '--x1='))),
+    )
+
+    assert arg_index._names == frozenset(['--ids', '--x1='])
+
+    for engine in ('walk', 'bitmask'):
+        ensure_spec(
+            Argument('--ids', OneOf('--x1=', '--y')), ['@' + str(many_path)],
+            fromfile_prefix_chars='@', engine=engine,
+        )
+
+        with pytest.raises(SpecViolationError):
+            ensure_spec(
+                Argument('--ids', '--x1=y'), ['@' + str(many_path)],
+                fromfile_prefix_chars='@', engine=engine,
+            )
+
+    # Lines are split at the line breaks `argparse` splits them at
+    break_path = tmp_path / 'break.txt'
+
+    break_path.write_bytes(u''.join([
+        u'-a\r-b\r\r-c\x0b-d\x0c-e\x1c-f\x1d-g\x1e-h\x85-i\u2028-j',
+        u'\u2029-k\r\n-l\n\n-m=1\r-n\t-o',
+    ]).encode(sys.getfilesystemencoding()))
+
+    args = ['@' + str(break_path)]
+
+    arg_index = ArgIndex.from_args(args)
+
+    expanded_arg_s = parser._read_args_from_files(args)
+
+    for arg_name in ['-' + x for x in 'abcdefghijklmn'] + ['-n\t-o', '']:
+        assert (arg_name in arg_index) is \
+            argument_exists(arg_name, expanded_arg_s)
+
+    # Response files are closed if mapping raises error
+    file_obj_s = []
+
+    def open_file(*args, **kwargs):
+        """
+        Open file and store the file object.
+
+        :param args: Positional arguments of `open`.
+
+        :param kwargs: Keyword arguments of `open`.
+
+        :return: File object.
+        """
+        # Open file
+        file_obj = open(*args, **kwargs)
+
+        # Store the file object
+        file_obj_s.append(file_obj)
+
+        # Return the file object
+        return file_obj
+
+    def map_file(*args, **kwargs):
+        """
+        Raise error as if mapping failed.
+
+        :param args: Positional arguments of `mmap.mmap`.
+
+        :param kwargs: Keyword arguments of `mmap.mmap`.
+
+        :return: None.
+        """
+        # Raise error
+        raise EnvironmentError('Cannot allocate memory')
+
+    monkeypatch.setattr(aoikargutil_module, 'open', open_file, raising=False)
+
+    monkeypatch.setattr(mmap, 'mmap', map_file)
+
+    with pytest.raises(EnvironmentError):
+        ArgIndex.from_args(['@' + str(path)])
+
+    assert len(file_obj_s) == 1
+
+    assert file_obj_s[0].closed
+
+
+def test_argument_exists():
+    """
+    Test `argument_exists`.
+    """
+    assert argument_exists('-a', []) is False
+
+    assert argument_exists('-a', ['-b']) is False
+
+    assert argument_exists('-a', ['--a']) is False
+
+    assert argument_exists('--a', ['-a']) is False
+
+    assert argument_exists('-a', ['-a']) is True
+
+    assert argument_exists('--a', ['--a']) is True
+
+    assert argument_exists('-a', ['-a=1']) is True
+
+    assert argument_exists('-a', ['-ab', '-a-', ' -a', '-a\n']) is False
+
+
+def test_argument_exists_literal():
+    """
+    Test `argument_exists` compares argument names literally.
+    """
+    # Argument names with regular expression metacharacters, and arguments
+    # a regular expression built from the name would wrongly match
+    for arg_name, wrong_arg_s in (
+        ('-a.b', ['-axb', '-a-b']),
+        ('-a*', ['-', '-aaa']),
+        ('-a+', ['-a', '-aa']),
+        ('-a?', ['-', '-a']),
+        ('-(a|b)', ['-a', '-b']),
+        ('-[ab]', ['-a', '-b']),
+        ('^-a', ['-a']),
+        ('-a$', ['-a']),
+        ('-a\\d', ['-a1', '-a\\1']),
+        ('', ['-a', 'x']),
+    ):
+        # For each argument list type
+        for wrap in (list, ArgIndex):
+            assert argument_exists(arg_name, wrap(wrong_arg_s)) is False
+
+            assert argument_exists(
+                arg_name, wrap(wrong_arg_s + [arg_name])
+            ) is True
+
+            assert argument_exists(
+                arg_name, wrap(wrong_arg_s + [arg_name + '=1'])
+            ) is True
+
+    #
+    for arg_name in ('[', '(', '-a\\', '*', '?', '+', ')', '{1,2}'):
+        assert argument_exists(arg_name, ['-a', arg_name]) is True
+
+        assert argument_exists(arg_name, ['-a']) is False
+
+    # Argument names that make catastrophic backtracking patterns, with
+    # multi-kilobyte arguments
+    for arg_name, arg in (
+        ('(a+)+b', 'a' * 10000),
+        ('(a|aa)+$', 'a' * 10000 + '!'),
+        ('(.*a){20}', 'a' * 5000),
+        ('-' + 'x' * 4096, '-' + 'x' * 4095 + 'y' + '=' * 4096),
+    ):
+        assert argument_exists(arg_name, [arg] * 10) is False
+
+        assert argument_exists(arg_name, [arg] * 10 + [arg_name]) is True
+
+        # For each engine
+        for engine in ('walk', 'bitmask'):
+            with pytest.raises(SpecViolationError):
+                ensure_spec(arg_name, [arg] * 10, engine=engine)
+
+            ensure_spec(
+                AllOf(arg_name, '-a'),
+                ['-a', arg, arg_name + '=' + arg],
+                engine=engine,
+            )
+
+    #
+    long_arg = '-a' * 2048
+
+    assert argument_exists(long_arg, [long_arg + '=' + long_arg]) is True
+
+    assert argument_exists(long_arg, [long_arg[:-1], long_arg + 'x']) \
+        is False
+
+
+def test_arg_index():
+    """
+    Test `ArgIndex`.
+    """
+    #
+    arg_index = ArgIndex(['-a', '--b=1', '--c=2=3', 'x'])
+
+    assert '-a' in arg_index
+
+    assert '--b' in arg_index
+
+    assert '--c' in arg_index
+
+    assert '--c=2' in arg_index
+
+    assert '--c=2=3' in arg_index
+
+    assert 'x' in arg_index
+
+    assert '--a' not in arg_index
+
+    assert '--b=' not in arg_index
+
+    assert '--c=3' not in arg_index
+
+    #
+    assert argument_exists('-a', arg_index) is True
+
+    assert argument_exists('-b', arg_index) is False
+
+    #
+    ensure_argument_name(arg_name='--b', args=arg_index)
+
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_argument_name(arg_name='-b', args=arg_index)
+
+    assert exc_info.value.args[0] == "Require argument '-b'."
+
+    #
+    ensure_spec(
+        spec=Argument('-a', AllOf('--b', Argument('--c', OneOf('x', '-y')))),
+        args=arg_index,
+    )
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec=Argument('-a', OneOf('x', '--b')), args=arg_index)
+
+    assert exc_info.value.args[0] == \
+        "Argument '-a' requires exact one of arguments ['x', '--b']." \
+        " Got 'x' and '--b'."
+
+
+def test_name_trie():
+    """
+    Test `NameTrie`.
+    """
+    #
+    name_s = ['-a', '--all', '--all=x', '-b', '', '--a.b', '-a', '-ab']
+
+    trie = NameTrie(name_s)
+
+    assert trie.names == ('-a', '--all', '--all=x', '-b', '', '--a.b', '-ab')
+
+    #
+    rand = random.Random(0)
+
+    for _ in range(2000):
+        # Get random argument list
+        args = [
+            ''.join(rand.choice('-ab=l.x') for _ in range(rand.randint(0, 8)))
+            for _ in range(rand.randint(0, 5))
+        ]
+
+        # Get expected existing argument names
+        expected = set(x for x in name_s if argument_exists(x, args))
+
+        assert trie.find(args) == expected
+
+        # Get ArgIndex object
+        arg_index = trie.index(args)
+
+        for name in name_s:
+            assert (name in arg_index) is (name in expected)
+
+    #
+    long_name = '-' + 'x' * 4096
+
+    trie = NameTrie([long_name, '-x'])
+
+    assert trie.find(['-' + 'x' * 8192, long_name[:-1]]) == set()
+
+    assert trie.find([long_name + '=' + 'x' * 4096]) == set([long_name])
+
+    #
+    spec = Argument('-f', OneOf('-a', Argument('-b', AllOf('-c', '-d'))))
+
+    trie = NameTrie.from_spec(spec)
+
+    assert trie.names == ('-f', '-a', '-b', '-c', '-d')
+
+    #
+    for args in (['-f', '-a'], ['-f', '-b=1', '-c'], ['-f', '-c', '-d']):
+        # Get expected outcome
+        outcome = _get_outcome(ensure_spec, spec, args)
+
+        for engine in ('walk', 'bitmask'):
+            assert _get_outcome(
+                ensure_spec, spec, trie.index(args), engine=engine
+            ) == outcome
+
+    #
+    with pytest.raises(ValueError) as exc_info:
+        '-z' in trie.index(['-z'])
+
+    assert exc_info.value.args[0] == \
+        "Argument name '-z' is not in the name trie."
+
+    #
+    class CustomSpec(BaseSpec):
+        def ensure_spec(self, args, depending=None):
+            pass
+
+    with pytest.raises(ValueError):
+        NameTrie.from_spec(Argument('-a', CustomSpec()))
+
+
+def test_ensure_argument_name():
+    """
+    Test `ensure_argument_name`.
+    """
+    #
+    ensure_argument_name(arg_name='-a', args=['-a'])
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_argument_name(arg_name='-a', args=[])
+
+    assert exc_info.value.args[0] == "Require argument '-a'."
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_argument_name(arg_name='-a', args=[], depending='-b')
+
+    assert exc_info.value.args[0] == "Argument '-b' requires argument '-a'."
+
+
+def test_ensure_string_spec():
+    """
+    Test ensure string spec.
+    """
+    #
+    ensure_spec(spec='-a', args=['-a'])
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec='-a', args=[])
+
+    assert exc_info.value.args[0] == "Require argument '-a'."
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec='-a', args=[], depending='-b')
+
+    assert exc_info.value.args[0] == "Argument '-b' requires argument '-a'."
+
+
+def test_ensure_argument_spec():
+    """
+    Test ensure Argument spec.
+    """
+    #
+    ensure_spec(spec=Argument('-a'), args=['-a'])
+
+    ensure_spec(spec=Argument('-a', '-b'), args=['-a', '-b'])
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec=Argument('-a'), args=[])
+
+    assert exc_info.value.args[0] == "Require argument '-a'."
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec=Argument('-a', '-b'), args=['-a'])
+
+    assert exc_info.value.args[0] == "Argument '-a' requires argument '-b'."
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(
+            spec=Argument('-a', Argument('-b', '-c')), args=['-a', '-b']
+        )
+
+    assert exc_info.value.args[0] == "Argument '-b' requires argument '-c'."
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec=Argument('-a', OneOf('-b', '-c')), args=['-a'])
+
+    assert exc_info.value.args[0] == \
+        "Argument '-a' requires exact one of arguments ['-b', '-c']. Got none."
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec=Argument('-a', AllOf('-b', '-c')), args=['-a'])
+
+    assert exc_info.value.args[0] == \
+        "Argument '-a' requires all of arguments ['-b', '-c']."
+
+
+def test_ensure_option_spec():
+    """
+    Test ensure Option spec.
+    """
+    #
+    ensure_spec(spec=Option('-a'), args=[])
+
+    #
+    ensure_spec(spec=Option('-a'), args=['-a'])
+
+    #
+    ensure_spec(spec=Option('-a', '-b'), args=[])
+
+    #
+    ensure_spec(spec=Option('-a', '-b'), args=['-a', '-b'])
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec=Option('-a', '-b'), args=['-a'])
+
+    assert exc_info.value.args[0] == "Argument '-a' requires argument '-b'."
+
+    #
+    ensure_spec(spec=Option('-a', Option('-b', '-c')), args=['-a'])
+
+    #
+    ensure_spec(spec=Option('-a', Option('-b', '-c')), args=['-b'])
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec=Option('-a', Option('-b', '-c')), args=['-a', '-b'])
+
+    assert exc_info.value.args[0] == "Argument '-b' requires argument '-c'."
+
+    #
+    ensure_spec(spec=Option('-a', OneOf('-b', '-c')), args=[])
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec=Option('-a', OneOf('-b', '-c')), args=['-a'])
+
+    assert exc_info.value.args[0] == \
+        "Argument '-a' requires exact one of arguments ['-b', '-c']. Got none."
+
+    #
+    ensure_spec(spec=Option('-a', AllOf('-b', '-c')), args=[])
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec=Option('-a', AllOf('-b', '-c')), args=['-a'])
+
+    assert exc_info.value.args[0] == \
+        "Argument '-a' requires all of arguments ['-b', '-c']."
+
+
+def test_ensure_oneof_spec():
+    """
+    Test ensure OneOf spec.
+    """
+    #
+    ensure_spec(spec=OneOf('-a', Argument('-b')), args=['-a'])
+
+    ensure_spec(spec=OneOf('-a', Argument('-b')), args=['-b'])
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec=OneOf('-a', '-b'), args=['-c'])
+
+    assert exc_info.value.args[0] == \
+        "Require exact one of arguments ['-a', '-b']. Got none."
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec=OneOf('-a', '-b'), args=['-a', '-b'])
+
+    assert exc_info.value.args[0] == \
+        "Require exact one of arguments ['-a', '-b']. Got '-a' and '-b'."
+
+    #
+    with pytest.raises(TypeError) as exc_info:
+        ensure_spec(spec=OneOf(OneOf('-a')), args=[])
+
+    assert exc_info.value.args[0] == \
+        "Expected string or Argument object. Got OneOf('-a')."
+
+    #
+    with pytest.raises(TypeError) as exc_info:
+        ensure_spec(spec=OneOf(AllOf('-a')), args=[])
+
+    assert exc_info.value.args[0] == \
+        "Expected string or Argument object. Got AllOf('-a')."
+
+
+def test_ensure_wide_oneof_spec():
+    """
+    Test ensure OneOf spec with many sub specs.
+    """
+    #
+    arg_name_s = ['--format-{0}'.format(x) for x in range(60)]
+
+    sub_spec_s = list(arg_name_s)
+
+    sub_spec_s[30] = Argument(arg_name_s[30], '-x')
+
+    spec = OneOf(*sub_spec_s)
+
+    assert spec._arg_names == tuple(arg_name_s)
+
+    #
+    ensure_spec(spec=spec, args=['--format-59=1'])
+
+    ensure_spec(spec=spec, args=['--format-30', '-x'])
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec=spec, args=['--format-30'])
+
+    assert exc_info.value.args[0] == "Argument '--format-30' requires" \
+        " argument '-x'."
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(
+            spec=spec, args=['--format-50', '--format-7', '--format-40']
+        )
+
+    assert exc_info.value.args[0] == \
+        'Require exact one of arguments {0}.' \
+        " Got '--format-7' and '--format-40'.".format(repr(arg_name_s))
+
+    assert exc_info.value.args[1] is spec
+
+
+def test_ensure_allof_spec():
+    """
+    Test ensure AllOf spec.
+    """
+    #
+    ensure_spec(spec=AllOf('-a', '-b'), args=['-a', '-b'])
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec=AllOf('-a', '-b'), args=[])
+
+    assert exc_info.value.args[0] == "Require all of arguments ['-a', '-b']."
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec=AllOf('-a', '-b'), args=['-a'])
+
+    assert exc_info.value.args[0] == "Require all of arguments ['-a', '-b']."
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec=AllOf('-a', '-b'), args=['-b'])
 
     assert exc_info.value.args[0] == "Require all of arguments ['-a', '-b']."
+
+
+# Specs used to test that alternative engines behave the same as
+# `ensure_spec`
+_ENGINE_TEST_SPECS = (
+    '-a',
+    Argument('-a', '-b'),
+    Argument('-a', Argument('-b', '-c')),
+    Argument('-a', OneOf('-b', '-c')),
+    Argument('-a', AllOf('-b', '-c')),
+    Option('-a'),
+    Option('-a', Option('-b', '-c')),
+    Option('-a', OneOf('-b', Argument('-c', '-d'))),
+    OneOf('-a', Argument('-b', AllOf('-c', Argument('-d', '-e')))),
+    AllOf('-a', '-b'),
+    AllOf('-a', Argument('-b', '-c')),
+    AllOf(Argument('-a', '-b'), '-b'),
+    AllOf('-a', Argument('-b', AllOf('-c', Argument('-d', '-a')))),
+    AllOf(Argument('-a', OneOf('-b', '-c')), Argument('-d', Option('-e'))),
+    Argument('-a', AllOf('-b', Argument('-c', OneOf('-d', '-e=1')))),
+    OneOf('-a', '-b', '-a'),
+    OneOf(*['-{0}'.format(x) for x in range(100)] + ['-a', '-b']),
+    AllOf(*['-{0}'.format(x) for x in range(100)] + ['-a', '-b']),
+)
+
+# Arguments used to test that alternative engines behave the same as
+# `ensure_spec`
+_ENGINE_TEST_ARGS = ('-a', '-b', '-c=1', '-d', '-e=1', '-f')
+
+
+def _iter_engine_test_cases():
+    """
+    Generate spec and argument list pairs covering all argument subsets.
+
+    :return: Generator of spec and argument list pairs.
+    """
+    # For each spec
+    for spec in _ENGINE_TEST_SPECS:
+        # For each argument subset size
+        for size in range(len(_ENGINE_TEST_ARGS) + 1):
+            # For each argument subset
+            for args in combinations(_ENGINE_TEST_ARGS, size):
+                # Yield the spec and argument list
+                yield spec, list(args)
+
+
+def _get_outcome(func, *args, **kwargs):
+    """
+    Call given function and get its outcome.
+
+    :param func: Function.
+
+    :return: None if succeeded, otherwise the SpecViolationError's message \
+        and violated spec.
+    """
+    try:
+        # Call the function
+        func(*args, **kwargs)
+
+    # If have error
+    except SpecViolationError as exc:
+        # Return the error's message and violated spec
+        return exc.args[0], exc.args[1]
+
+    # If not have error
+    else:
+        # Return None
+        return None
+
+
+def test_compile_spec():
+    """
+    Test `compile_spec`.
+    """
+    #
+    compiled_spec = compile_spec(Argument('-a', OneOf('-b', '-c')))
+
+    assert compiled_spec.arg_names == ('-a', '-b', '-c')
+
+    compiled_spec(['-a', '-b'])
+
+    compiled_spec(['-a', '-c=1'])
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        compiled_spec(['-a', '-b', '-c'])
+
+    assert exc_info.value.args[0] == \
+        "Argument '-a' requires exact one of arguments ['-b', '-c']." \
+        " Got '-b' and '-c'."
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        compile_spec('-a', depending='-b')([])
+
+    assert exc_info.value.args[0] == "Argument '-b' requires argument '-a'."
+
+    #
+    compile_spec(None)(None)
+
+    #
+    with pytest.raises(TypeError) as exc_info:
+        compile_spec('-a')(None)
+
+    assert exc_info.value.args[0] == 'Expected argument list. Got None.'
+
+    #
+    with pytest.raises(TypeError) as exc_info:
+        compile_spec(Option('-a', 1))
+
+    assert exc_info.value.args[0] == \
+        'Expected string, Argument, Option, OneOf, or AllOf. Got 1.'
+
+    #
+    with pytest.raises(TypeError) as exc_info:
+        compile_spec(AllOf('-a', Option('-b')))
+
+    assert exc_info.value.args[0] == \
+        "Expected string or Argument object. Got Option('-b', None)."
+
+    #
+    for spec, args in _iter_engine_test_cases():
+        assert _get_outcome(compile_spec(spec), args) == \
+            _get_outcome(ensure_spec, spec, args)
+
+
+def test_ensure_spec_bitmask_engine():
+    """
+    Test `ensure_spec`'s bitmask engine.
+    """
+    #
+    compiled_spec = compile_spec(OneOf('-a', Argument('-b', AllOf('-c'))))
+
+    assert compiled_spec.mask_of(['-a', '-b=1', '-d']) == 0b11
+
+    assert compiled_spec.mask_of(ArgIndex(['-c', '-b=1'])) == 0b110
+
+    #
+    ensure_spec(spec=AllOf('-a', '-b'), args=['-a', '-b'], engine='bitmask')
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(
+            spec=OneOf('-a', '-b', '-a'), args=['-a'], engine='bitmask'
+        )
+
+    assert exc_info.value.args[0] == \
+        "Require exact one of arguments ['-a', '-b', '-a']." \
+        " Got '-a' and '-a'."
+
+    #
+    with pytest.raises(ValueError) as exc_info:
+        ensure_spec(spec='-a', args=['-a'], engine='other')
+
+    assert exc_info.value.args[0] == \
+        "Expected engine 'walk' or 'bitmask'. Got 'other'."
+
+    #
+    for spec, args in _iter_engine_test_cases():
+        assert _get_outcome(ensure_spec, spec, args, engine='bitmask') == \
+            _get_outcome(ensure_spec, spec, args)
+
+
+def test_name_cache():
+    """
+    Test the bitmask engine's cache of compiled argument name specs.
+    """
+    #
+    clear_caches()
+
+    assert name_cache_info()[:2] == (0, 0)
+
+    #
+    for _ in range(3):
+        ensure_spec('-a', ['-a'], engine='bitmask')
+
+        with pytest.raises(SpecViolationError) as exc_info:
+            ensure_spec('-b', ['-a'], depending='-a', engine='bitmask')
+
+        assert exc_info.value.args[0] == \
+            "Argument '-a' requires argument '-b'."
+
+    assert name_cache_info()[:2] == (4, 2)
+
+    assert name_cache_info().currsize == 2
+
+    #
+    maxsize = name_cache_info().maxsize
+
+    for index in range(maxsize + 1):
+        arg_name = '-{0}'.format(index)
+
+        ensure_spec(arg_name, [arg_name], engine='bitmask')
+
+    assert name_cache_info().currsize == maxsize
+
+    #
+    spec = OneOf('-a', '-b')
+
+    ensure_spec(spec, ['-a'], engine='bitmask')
+
+    clear_caches()
+
+    assert name_cache_info() == (0, 0, maxsize, 0)
+
+    ensure_spec(spec, ['-a'], engine='bitmask')
+
+
+def test_compiled_spec_cache():
+    """
+    Test the bitmask engine's cache of compiled spec objects is bounded, \
+        and releases evicted specs.
+    """
+    #
+    clear_caches()
+
+    spec = Argument('-a', OneOf('-b', '-c'))
+
+    spec_ref = weakref.ref(spec)
+
+    for _ in range(3):
+        ensure_spec(spec, ['-a', '-b'], engine='bitmask')
+
+    assert _compiled_spec_cache.info()[:2] == (2, 1)
+
+    #
+    del spec
+
+    gc.collect()
+
+    assert spec_ref() is not None
+
+    # Evict the spec's compiled spec
+    maxsize = _compiled_spec_cache.info().maxsize
+
+    for _ in range(maxsize):
+        ensure_spec(OneOf('-a', '-b'), ['-a'], engine='bitmask')
+
+    assert _compiled_spec_cache.info().currsize == maxsize
+
+    gc.collect()
+
+    assert spec_ref() is None
+
+    #
+    clear_caches()
+
+    assert _compiled_spec_cache.info().currsize == 0
+
+
+def test_ensure_spec_many():
+    """
+    Test `ensure_spec_many`.
+    """
+    #
+    verdict_s, violation_d = ensure_spec_many(
+        spec=Argument('-a', OneOf('-b', '-c')),
+        argv_iterable=iter([
+            ['-a', '-b'],
+            [],
+            ['-a', '-c=1'],
+            ['-a', '-b', '-c'],
+            ['-a', '-b', '-c'],
+        ]),
+    )
+
+    assert list(verdict_s) == [1, 0, 1, 0, 0]
+
+    assert sorted(violation_d) == [1, 3, 4]
+
+    assert violation_d[1].msg == "Require argument '-a'."
+
+    assert violation_d[3].msg == \
+        "Argument '-a' requires exact one of arguments ['-b', '-c']." \
+        " Got '-b' and '-c'."
+
+    # Rows with the same violation share one record
+    assert violation_d[4] is violation_d[3]
+
+    # Each raised error is new, so raising does not change other rows
+    error = violation_d[3].to_error()
+
+    assert error is not violation_d[4].to_error()
+
+    assert error.violation is violation_d[4]
+
+    assert error.args[0] == violation_d[4].msg
+
+    #
+    verdict_s, violation_d = ensure_spec_many(spec=None, argv_iterable=[[]])
+
+    assert list(verdict_s) == [1]
+
+    assert violation_d == {}
+
+    #
+    for spec in _ENGINE_TEST_SPECS:
+        # Get argument lists
+        argv_s = [args for x, args in _iter_engine_test_cases() if x is spec]
+
+        # Ensure the spec against the argument lists
+        verdict_s, violation_d = ensure_spec_many(spec, argv_s)
+
+        # For each argument list
+        for row_index, args in enumerate(argv_s):
+            # Get expected outcome
+            outcome = _get_outcome(ensure_spec, spec, args)
+
+            # If expect passing
+            if outcome is None:
+                assert verdict_s[row_index] == 1
+
+                assert row_index not in violation_d
+
+            # If expect failing
+            else:
+                assert verdict_s[row_index] == 0
+
+                assert violation_d[row_index].to_error().args == outcome
+
+
+def test_compile_spec_cache():
+    """
+    Test `compile_spec`'s verdict cache.
+    """
+    #
+    compiled_spec = compile_spec(OneOf('-a', '-b'), cache_size=2)
+
+    assert compiled_spec.cache_info() == (0, 0, 2, 0)
+
+    #
+    compiled_spec(['-a'])
+
+    compiled_spec(['-a', '-c'])
+
+    assert compiled_spec.cache_info() == (1, 1, 2, 1)
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        compiled_spec(['-a', '-b'])
+
+    error = exc_info.value
+
+    with pytest.raises(SpecViolationError) as exc_info:
+        compiled_spec(['-b', '-a'])
+
+    # Each hit raises a new error of the cached violation record
+    assert exc_info.value is not error
+
+    assert exc_info.value.violation is error.violation
+
+    assert exc_info.value.__traceback__ is not error.__traceback__
+
+    assert error.args[0] == exc_info.value.args[0] == \
+        "Require exact one of arguments ['-a', '-b']. Got '-a' and '-b'."
+
+    # Raising in one handler does not change another caller's error
+    try:
+        raise KeyError('caller-1')
+    except KeyError:
+        with pytest.raises(SpecViolationError) as exc_info:
+            compiled_spec(['-a', '-b'])
+
+    error = exc_info.value
+
+    try:
+        raise KeyError('caller-2')
+    except KeyError:
+        with pytest.raises(SpecViolationError):
+            compiled_spec(['-a', '-b'])
+
+    assert error.__context__.args == ('caller-1',)
+
+    assert compiled_spec.cache_info() == (4, 2, 2, 2)
+
+    #
+    with pytest.raises(SpecViolationError):
+        compiled_spec([])
+
+    assert compiled_spec.cache_info() == (4, 3, 2, 2)
+
+    compiled_spec(['-a'])
+
+    assert compiled_spec.cache_info() == (4, 4, 2, 2)
+
+    #
+    compiled_spec.cache_clear()
+
+    assert compiled_spec.cache_info() == (0, 0, 2, 0)
+
+    #
+    assert compile_spec('-a').cache_info() is None
+
+    #
+    with pytest.raises(ValueError) as exc_info:
+        compile_spec('-a', cache_size=0)
+
+    assert exc_info.value.args[0] == 'Expected cache size >0. Got 0.'
+
+
+def test_ensure_spec_deep_nesting():
+    """
+    Test `ensure_spec`, `ensure_spec_many` and `NameTrie.from_spec` with \
+        deeply nested specs.
+    """
+    #
+    depth = 10000
+
+    #
+    spec = '-{0}'.format(depth)
+
+    for index in reversed(range(depth)):
+        spec = Argument('-{0}'.format(index), AllOf(spec))
+
+    args = ['-{0}'.format(index) for index in range(depth + 1)]
+
+    message = "Argument '-{0}' requires all of arguments ['-{1}'].".format(
+        depth - 1, depth
+    )
+
+    for engine in ('walk', 'bitmask'):
+        ensure_spec(spec=spec, args=args, engine=engine)
+
+        with pytest.raises(SpecViolationError) as exc_info:
+            ensure_spec(spec=spec, args=args[:-1], engine=engine)
+
+        assert exc_info.value.args[0] == message
+
+    spec.ensure_spec(args=args, depending=None)
+
+    verdict_s, violation_d = ensure_spec_many(
+        spec=spec, argv_iterable=[args, args[:-1]]
+    )
+
+    assert list(verdict_s) == [1, 0]
+
+    assert violation_d[1].msg == message
+
+    assert NameTrie.from_spec(spec).names == tuple(args)
+
+    #
+    spec = None
+
+    for index in reversed(range(depth)):
+        spec = Option('-{0}'.format(index), OneOf('-x', Argument('-y', spec)))
+
+    for engine in ('walk', 'bitmask'):
+        ensure_spec(spec=spec, args=['-0', '-y'], engine=engine)
+
+        with pytest.raises(SpecViolationError) as exc_info:
+            ensure_spec(
+                spec=spec, args=['-0', '-1', '-x', '-y'], engine=engine
+            )
+
+        assert exc_info.value.args[0] == \
+            "Argument '-0' requires exact one of arguments ['-x', '-y']." \
+            " Got '-x' and '-y'."
+
+    assert len(NameTrie.from_spec(spec).names) == depth + 2
+
+
+def test_ensure_spec_custom_spec():
+    """
+    Test `ensure_spec` with custom BaseSpec subclasses.
+    """
+    #
+    class NotSpec(BaseSpec):
+        """
+        Spec that requires given argument name not exists.
+        """
+
+        def __init__(self, arg_name):
+            """
+            Constructor.
+
+            :param arg_name: Argument name.
+
+            :return: None.
+            """
+            self.arg_name = arg_name
+
+        def ensure_spec(self, args, depending):
+            """
+            Ensure this spec. Raise SpecViolationError if violated.
+
+            :param args: Argument list.
+
+            :param depending: Depending argument name.
+
+            :return: None.
+            """
+            if argument_exists(self.arg_name, args):
+                raise SpecViolationError(
+                    'Forbid argument {0}.'.format(repr(self.arg_name)),
+                    self,
+                )
+
+    #
+    class LoggedArgument(Argument):
+        """
+        Argument spec that logs each ensuring.
+        """
+
+        log_s = []
+
+        def ensure_spec(self, args, depending):
+            """
+            Ensure this spec. Raise SpecViolationError if violated.
+
+            :param args: Argument list.
+
+            :param depending: Depending argument name.
+
+            :return: None.
+            """
+            self.log_s.append(depending)
+
+            Argument.ensure_spec(self, args, depending)
+
+    #
+    spec = Argument('-a', OneOf(LoggedArgument('-b', NotSpec('-c')), '-d'))
+
+    for engine in (None, 'bitmask'):
+        ensure_spec(spec=spec, args=['-a', '-b'], engine=engine)
+
+        ensure_spec(spec=spec, args=['-a', '-d', '-c'], engine=engine)
+
+        with pytest.raises(SpecViolationError) as exc_info:
+            ensure_spec(spec=spec, args=['-a', '-b', '-c'], engine=engine)
+
+        assert exc_info.value.args[0] == "Forbid argument '-c'."
+
+    assert LoggedArgument.log_s == ['-a', '-a'] * 2
+
+    #
+    class MaxPositional(BaseSpec):
+        """
+        Spec that limits positional argument count, by iterating the \
+            argument list.
+        """
+
+        def __init__(self, count):
+            """
+            Constructor.
+
+            :param count: Maximum positional argument count.
+
+            :return: None.
+            """
+            self.count = count
+
+        def ensure_spec(self, args, depending):
+            """
+            Ensure this spec. Raise SpecViolationError if violated.
+
+            :param args: Argument list.
+
+            :param depending: Depending argument name.
+
+            :return: None.
+            """
+            if len([x for x in args if not x.startswith('-')]) > self.count:
+                raise SpecViolationError('Too many files.', self)
+
+    # Custom specs receive the caller's argument list
+    for spec in (MaxPositional(1), Argument('-a', MaxPositional(1))):
+        for engine in (None, 'bitmask'):
+            for wrap in (list, tuple, iter):
+                ensure_spec(spec, wrap(['-a', 'file']), engine=engine)
+
+                with pytest.raises(SpecViolationError) as exc_info:
+                    ensure_spec(spec, wrap(['-a', 'x', 'y']), engine=engine)
+
+                assert exc_info.value.args[0] == 'Too many files.'
+
+        assert [x.msg for x in check_spec(spec, iter(['-a', 'x', 'y']))] \
+            == ['Too many files.']
+
+        verdict_s, _ = ensure_spec_many(
+            spec, [iter(['-a', 'x']), ('-a', 'x', 'y')]
+        )
+
+        assert list(verdict_s) == [1, 0]
+
+
+class _OneShotArgs(object):
+    """
+    Iterable of arguments that can be iterated only once, like a generator \
+        reading a socket.
+    """
+
+    def __init__(self, args):
+        """
+        Constructor.
+
+        :param args: Argument list.
+
+        :return: None.
+        """
+        self.args = args
+
+        self.iterated = False
+
+    def __iter__(self):
+        """
+        Get argument iterator. Fail if called twice.
+
+        :return: Argument iterator.
+        """
+        assert not self.iterated
+
+        self.iterated = True
+
+        return iter(self.args)
+
+
+def test_ensure_spec_one_shot_args():
+    """
+    Test `ensure_spec` and related functions iterate given arguments once.
+    """
+    # For each spec and argument list
+    for spec, args in _iter_engine_test_cases():
+        # Get the outcome of the argument list
+        outcome = _get_outcome(ensure_spec, spec, args)
+
+        # For each engine
+        for engine in ('walk', 'bitmask'):
+            assert _get_outcome(
+                ensure_spec, spec, _OneShotArgs(args), engine=engine
+            ) == outcome
+
+        assert _get_outcome(
+            compile_spec(spec, cache_size=8), _OneShotArgs(args)
+        ) == outcome
+
+        assert [x.msg for x in check_spec(spec, _OneShotArgs(args))] == \
+            [x.msg for x in check_spec(spec, args)]
+
+        assert repr(validate(spec, _OneShotArgs(args))) == \
+            repr(validate(spec, args))
+
+    #
+    assert argument_exists('-b', _OneShotArgs(['-a', '-b=1'])) is True
+
+    assert argument_exists('-c', _OneShotArgs(['-a', '-b=1'])) is False
+
+    #
+    verdict_s, violation_d = ensure_spec_many(
+        OneOf('-a', '-b'),
+        (_OneShotArgs(x) for x in (['-a'], ['-a', '-b'], ['-b=1'])),
+    )
+
+    assert list(verdict_s) == [1, 0, 1]
+
+    assert list(violation_d) == [1]
+
+    # Arguments in `/proc/<pid>/cmdline` format
+    cmdline = b'prog\0-a\0--k=v=w\0--data=' + b'x' * 1000 + b'\0'
+
+    spec = Argument('--data', AllOf('-a', Argument('--k', '--k=v')))
+
+    for engine in ('walk', 'bitmask'):
+        ensure_spec(
+            spec,
+            (x.decode('utf-8') for x in cmdline.split(b'\0')[:-1]),
+            engine=engine,
+        )
+
+        with pytest.raises(SpecViolationError) as exc_info:
+            ensure_spec(
+                spec,
+                (x.decode('utf-8') for x in cmdline.split(b'\0')[1:4:2]),
+                engine=engine,
+            )
+
+        assert exc_info.value.args[0] == \
+            "Argument '--data' requires argument '--k'."
+
+    #
+    class NoneOf(BaseSpec):
+        """
+        Spec that requires given argument names not exist.
+        """
+
+        def __init__(self, *arg_names):
+            """
+            Constructor.
+
+            :param arg_names: Argument names.
+
+            :return: None.
+            """
+            self.arg_names = arg_names
+
+        def ensure_spec(self, args, depending):
+            """
+            Ensure this spec. Raise SpecViolationError if violated.
+
+            :param args: Argument list.
+
+            :param depending: Depending argument name.
+
+            :return: None.
+            """
+            for arg_name in self.arg_names:
+                if argument_exists(arg_name, args):
+                    raise SpecViolationError(
+                        'Forbid argument {0}.'.format(repr(arg_name)), self
+                    )
+
+    # The custom spec tests argument names not in the spec tree
+    spec = Argument('-a', NoneOf('-b', '-c=1'))
+
+    assert _spec_tree_arg_names(spec) is None
+
+    for engine in ('walk', 'bitmask'):
+        ensure_spec(spec, _OneShotArgs(['-a', '-c=2']), engine=engine)
+
+        with pytest.raises(SpecViolationError) as exc_info:
+            ensure_spec(spec, _OneShotArgs(['-a', '-c=1=2']), engine=engine)
+
+        assert exc_info.value.args[0] == "Forbid argument '-c=1'."
+
+    #
+    spec = Argument('-a', Option('-c=1', OneOf('-b', Argument('-d'))))
+
+    assert _spec_tree_arg_names(spec) == [
+        '-a', '-c=1', '-b', '-d', '-b', '-d'
+    ]
+
+    known_name_s = frozenset(_spec_tree_arg_names(spec))
+
+    # Only the spec tree's argument names are stored
+    arg_index = _index_known_names(
+        ('--x={0}'.format(x) for x in range(10000)), known_name_s
+    )
+
+    assert arg_index._names == frozenset()
+
+    assert arg_index._eq_args == ()
+
+    arg_index = _index_known_names(
+        iter(['-a=1', '-c=1=2', '-c', '-d=', 'x']), known_name_s
+    )
+
+    assert arg_index._names == frozenset(['-a', '-c=1', '-d'])
+
+    with pytest.raises(ValueError) as exc_info:
+        'x' in arg_index
+
+    assert exc_info.value.args[0] == \
+        "Argument name 'x' is not a known argument name."
+
+
+def test_check_spec():
+    """
+    Test `check_spec`.
+    """
+    #
+    assert check_spec(spec=AllOf('-a', '-b'), args=['-a', '-b']) == []
+
+    assert check_spec(spec=None, args=None) == []
+
+    #
+    spec_b = Argument('-b', OneOf('-c', '-d'))
+
+    all_of_spec = AllOf('-a', spec_b, '-e', Argument('-f', '-g'))
+
+    spec = Option('-x', all_of_spec)
+
+    violation_s = check_spec(spec=spec, args=['-x', '-b', '-f'])
+
+    assert [(x.msg, x.spec, x.depending) for x in violation_s] == [
+        (
+            "Argument '-x' requires all of arguments"
+            " ['-a', '-b', '-e', '-f'].",
+            all_of_spec,
+            '-x',
+        ),
+        (
+            "Argument '-b' requires exact one of arguments ['-c', '-d']."
+            ' Got none.',
+            spec_b.sub_spec,
+            '-b',
+        ),
+        ("Argument '-f' requires argument '-g'.", '-g', '-f'),
+    ]
+
+    assert repr(violation_s[2]) == "SpecViolation('argument', '-g', '-f')"
+
+    #
+    error = violation_s[0].to_error()
+
+    assert isinstance(error, SpecViolationError)
+
+    assert error.args == (violation_s[0].msg, all_of_spec)
+
+    #
+    class ForbidSpec(BaseSpec):
+        """
+        Spec that forbids any argument.
+        """
+
+        def ensure_spec(self, args, depending):
+            """
+            Ensure this spec. Raise SpecViolationError if violated.
+
+            :param args: Argument list.
+
+            :param depending: Depending argument name.
+
+            :return: None.
+            """
+            raise SpecViolationError('Forbidden.', self)
+
+    #
+    forbid_spec = ForbidSpec()
+
+    violation_s = check_spec(
+        spec=Option('-a', Argument('-b', forbid_spec)), args=['-a', '-b']
+    )
+
+    assert [(x.msg, x.spec, x.depending) for x in violation_s] == [
+        ('Forbidden.', forbid_spec, '-b'),
+    ]
+
+    #
+    for spec, args in _iter_engine_test_cases():
+        # Get violations
+        violation_s = check_spec(spec, args)
+
+        # Get expected first violation
+        outcome = _get_outcome(ensure_spec, spec, args)
+
+        # If expect passing
+        if outcome is None:
+            assert violation_s == []
+
+        # If expect failing
+        else:
+            assert (violation_s[0].msg, violation_s[0].spec) == outcome
+
+
+def test_iter_violations():
+    """
+    Test `iter_violations`.
+    """
+    #
+    walked_s = []
+
+    class LoggedSpec(BaseSpec):
+        """
+        Spec that logs each ensuring and requires its argument name.
+        """
+
+        def __init__(self, arg_name):
+            """
+            Constructor.
+
+            :param arg_name: Argument name.
+
+            :return: None.
+            """
+            self.arg_name = arg_name
+
+        def ensure_spec(self, args, depending):
+            """
+            Ensure this spec. Raise SpecViolationError if violated.
+
+            :param args: Argument list.
+
+            :param depending: Depending argument name.
+
+            :return: None.
+            """
+            walked_s.append(self.arg_name)
+
+            ensure_spec(self.arg_name, args, depending=depending)
+
+    #
+    spec = Argument('-x', AllOf(*[
+        Argument('-{0}'.format(x), LoggedSpec('-{0}'.format(x)))
+        for x in 'abcd'
+    ]))
+
+    #
+    violation_iter = iter_violations(spec=spec, args=['-x', '-a', '-c'])
+
+    assert walked_s == []
+
+    violation = next(violation_iter)
+
+    assert violation.msg == "Argument '-x' requires argument '-b'."
+
+    assert walked_s == ['-a']
+
+    #
+    del walked_s[:]
+
+    violation_s = list(iter_violations(spec=spec, args=['-x'], limit=2))
+
+    assert [x.msg for x in violation_s] == [
+        "Argument '-x' requires argument '-a'.",
+        "Argument '-x' requires argument '-b'.",
+    ]
+
+    assert walked_s == []
+
+    #
+    violation_s = [
+        x for x in iter_violations(spec=spec, args=['-y'])
+        if isinstance(x.spec, str)
+    ]
+
+    assert [x.msg for x in violation_s] == ["Require argument '-x'."]
+
+    #
+    assert list(iter_violations(spec=None, args=None)) == []
+
+    #
+    with pytest.raises(TypeError) as exc_info:
+        iter_violations(spec='-a', args=None)
+
+    assert exc_info.value.args[0] == 'Expected argument list. Got None.'
+
+
+def test_validate():
+    """
+    Test `validate`.
+    """
+    #
+    assert validate(spec=Argument('-a', '-b'), args=['-a', '-b']) is None
+
+    assert validate(spec=None, args=None) is None
+
+    #
+    one_of_spec = OneOf('-b', '-c')
+
+    violation = validate(
+        spec=Argument('-a', one_of_spec), args=['-a', '-b', '-c']
+    )
+
+    assert violation.kind == SpecViolation.ONE_OF
+
+    assert violation.spec is one_of_spec
+
+    assert violation.depending == '-a'
+
+    assert violation.arg_names == ('-b', '-c')
+
+    assert violation.found_arg_names == ('-b', '-c')
+
+    assert violation._msg is None
+
+    assert violation.msg == \
+        "Argument '-a' requires exact one of arguments ['-b', '-c']." \
+        " Got '-b' and '-c'."
+
+    #
+    all_of_spec = AllOf('-a', '-b')
+
+    violation = validate(spec=all_of_spec, args=['-a'])
+
+    assert violation.kind == SpecViolation.ALL_OF
+
+    assert violation.arg_names == ('-a', '-b')
+
+    assert violation.msg == "Require all of arguments ['-a', '-b']."
+
+    #
+    violation = validate(spec='-a', args=[])
+
+    assert violation.kind == SpecViolation.ARGUMENT
+
+    assert violation.arg_names == ('-a',)
+
+    assert violation.found_arg_names == ()
+
+    assert violation.msg == "Require argument '-a'."
+
+    #
+    assert not hasattr(violation, '__dict__')
+
+    #
+    for spec, args in _iter_engine_test_cases():
+        # Get violation
+        violation = validate(spec, args)
+
+        # Get expected outcome
+        outcome = _get_outcome(ensure_spec, spec, args)
+
+        # If expect passing
+        if outcome is None:
+            assert violation is None
+
+        # If expect failing
+        else:
+            assert (violation.msg, violation.spec) == outcome
+
+
+def test_spec_violation_error():
+    """
+    Test `SpecViolationError` structured fields.
+    """
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec=Argument('-f', '-g'), args=['-f'])
+
+    error = exc_info.value
+
+    assert error.kind == SpecViolation.ARGUMENT
+
+    assert error.spec == '-g'
+
+    assert error.depending == '-f'
+
+    assert error.arg_names == ('-g',)
+
+    assert error.found_arg_names == ()
+
+    #
+    assert BaseException.args.__get__(error) == ()
+
+    assert error.args[0] == "Argument '-f' requires argument '-g'."
+
+    assert error.args[1] == '-g'
+
+    assert BaseException.args.__get__(error) == error.args
+
+    #
+    with pytest.raises(SpecViolationError) as exc_info:
+        ensure_spec(spec=OneOf('-a', '-b', '-c'), args=['-c', '-a'])
+
+    error = exc_info.value
+
+    assert error.kind == SpecViolation.ONE_OF
+
+    assert error.found_arg_names == ('-a', '-c')
+
+    assert str(error) == str(error.args)
+
+    assert repr(error).startswith('SpecViolationError(')
+
+    #
+    copy = pickle.loads(pickle.dumps(error))
+
+    assert copy.args[0] == error.args[0]
+
+    assert repr(copy.args[1]) == repr(error.args[1])
+
+    assert copy.kind == SpecViolation.CUSTOM
+
+    #
+    error = SpecViolationError('Custom message.', '-x')
+
+    assert error.args == ('Custom message.', '-x')
+
+    assert str(error) == "('Custom message.', '-x')"
+
+    assert error.kind == SpecViolation.CUSTOM
+
+    assert error.spec == '-x'
+
+    assert error.violation.msg == 'Custom message.'
+
+    #
+    for spec, args in _iter_engine_test_cases():
+        # For each engine
+        for engine in ('walk', 'bitmask'):
+            try:
+                ensure_spec(spec, args, engine=engine)
+            except SpecViolationError as e:
+                assert e.violation.msg == e.args[0]
+
+                assert e.spec is e.args[1]